@@ -1,6 +1,9 @@
-from .connection import get_db_connection
+from .connection import get_db_connection, queue_change
+from .ledger import record_balance_event
 from app.models import Account
 
+ACCOUNT_COLUMNS_SQL = "id, name, type, notes"
+
 
 def add_account(name, type, notes=""):
     conn = get_db_connection()
@@ -8,6 +11,7 @@ def add_account(name, type, notes=""):
         "INSERT INTO accounts (name, type, notes) VALUES (?, ?, ?)", (name, type, notes)
     )
     account_id = cursor.lastrowid
+    queue_change(conn, "accounts", "insert", (account_id,))
     conn.commit()
     conn.close()
     return account_id
@@ -30,6 +34,7 @@ def update_account(account_id, name=None, type=None, notes=None):
     query += " WHERE id=?"
     params.append(account_id)
     conn.execute(query, tuple(params))
+    queue_change(conn, "accounts", "update", (account_id,))
     conn.commit()
     conn.close()
 
@@ -38,27 +43,27 @@ def delete_account(account_id):
     conn = get_db_connection()
     conn.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
     conn.execute("DELETE FROM account_balances WHERE account_id = ?", (account_id,))
+    queue_change(conn, "accounts", "delete", (account_id,))
     conn.commit()
     conn.close()
 
 
-def add_account_balance(account_id, currency, delta):
+def add_account_balance(
+    account_id, currency, delta, kind="adjustment", effective_date=None
+):
+    """
+    Moves a balance by delta, creating the (account, currency) row if needed.
+    """
     conn = get_db_connection()
-    # Check if exists
-    row = conn.execute(
-        "SELECT balance FROM account_balances WHERE account_id=? AND currency=?",
-        (account_id, currency),
-    ).fetchone()
-    current = row["balance"] if row else 0.0
-    new_balance = current + delta
     conn.execute(
         """
         INSERT INTO account_balances (account_id, currency, balance)
         VALUES (?, ?, ?)
-        ON CONFLICT(account_id, currency) DO UPDATE SET balance=excluded.balance
+        ON CONFLICT(account_id, currency) DO UPDATE SET balance = balance + excluded.balance
         """,
-        (account_id, currency, new_balance),
+        (account_id, currency, delta),
     )
+    record_balance_event(conn, account_id, currency, delta, kind, effective_date)
     conn.commit()
     conn.close()
 
@@ -76,12 +81,20 @@ def set_account_balance_threshold(account_id, currency, threshold: float | None)
         """,
         (threshold, account_id, currency),
     )
+    queue_change(conn, "balances", "update", ((account_id, currency),))
     conn.commit()
     conn.close()
 
 
 def update_account_balance(account_id, currency, balance):
     conn = get_db_connection()
+    row = conn.execute(
+        "SELECT balance FROM account_balances WHERE account_id=? AND currency=?",
+        (account_id, currency),
+    ).fetchone()
+    if row is None:
+        conn.close()
+        return
     conn.execute(
         """
         UPDATE account_balances
@@ -90,6 +103,7 @@ def update_account_balance(account_id, currency, balance):
     """,
         (balance, account_id, currency),
     )
+    record_balance_event(conn, account_id, currency, balance - (row["balance"] or 0.0))
     conn.commit()
     conn.close()
 
@@ -106,24 +120,38 @@ def get_account_balances(account_id):
 
 def delete_account_balance(account_id, currency):
     conn = get_db_connection()
+    row = conn.execute(
+        "SELECT balance FROM account_balances WHERE account_id=? AND currency=?",
+        (account_id, currency),
+    ).fetchone()
+    if row is not None:
+        record_balance_event(
+            conn, account_id, currency, -(row["balance"] or 0.0), "close"
+        )
     conn.execute(
         "DELETE FROM account_balances WHERE account_id=? AND currency=?",
         (account_id, currency),
     )
+    queue_change(conn, "balances", "delete", ((account_id, currency),))
     conn.commit()
     conn.close()
 
 
 def get_accounts():
     conn = get_db_connection()
-    accounts = conn.execute("SELECT * FROM accounts").fetchall()
-    results = []
-    for acc in accounts:
-        balances = conn.execute(
-            "SELECT currency, balance, balance_threshold FROM account_balances WHERE account_id=?",
-            (acc["id"],),
-        ).fetchall()
-        results.append(Account.from_row(acc, balances=[dict(b) for b in balances]))
+    balances = {}
+    cur = conn.execute(
+        "SELECT account_id, currency, balance, balance_threshold "
+        "FROM account_balances ORDER BY account_id, id"
+    )
+    cur.row_factory = None
+    for account_id, currency, balance, threshold in cur:
+        balances.setdefault(account_id, []).append(
+            {"currency": currency, "balance": balance, "balance_threshold": threshold}
+        )
+    cur = conn.execute(f"SELECT {ACCOUNT_COLUMNS_SQL} FROM accounts ORDER BY id")
+    cur.row_factory = None
+    results = [Account(*row, balances.get(row[0], [])) for row in cur]
     conn.close()
     return results
 
@@ -152,9 +180,20 @@ def get_low_balance_alerts():
     return [dict(r) for r in rows]
 
 
-def increment_account_balance(account_id, currency, delta):
+def increment_account_balance(
+    account_id,
+    currency,
+    delta,
+    kind="adjustment",
+    effective_date=None,
+    transaction_id=None,
+):
+    """
+    Moves an existing balance by delta. Does nothing if the account has no
+    balance row for that currency.
+    """
     conn = get_db_connection()
-    conn.execute(
+    cur = conn.execute(
         """
         UPDATE account_balances
         SET balance = balance + ?
@@ -162,5 +201,9 @@ def increment_account_balance(account_id, currency, delta):
         """,
         (delta, account_id, currency),
     )
+    if cur.rowcount:
+        record_balance_event(
+            conn, account_id, currency, delta, kind, effective_date, transaction_id
+        )
     conn.commit()
     conn.close()
@@ -1,12 +1,13 @@
-from .connection import get_db_connection
+from .connection import get_db_connection, queue_change
 
 
 def add_budget(category_id, period, amount, start_date, end_date):
     conn = get_db_connection()
-    conn.execute(
+    cur = conn.execute(
         "INSERT INTO budgets (category_id, period, amount, start_date, end_date) VALUES (?, ?, ?, ?, ?)",
         (category_id, period, amount, start_date, end_date),
     )
+    queue_change(conn, "budgets", "insert", (cur.lastrowid,))
     conn.commit()
     conn.close()
 
@@ -21,6 +22,7 @@ def get_budgets():
 def delete_budget(budget_id):
     conn = get_db_connection()
     conn.execute("DELETE FROM budgets WHERE id=?", (budget_id,))
+    queue_change(conn, "budgets", "delete", (budget_id,))
     conn.commit()
     conn.close()
 
@@ -55,5 +57,6 @@ def update_budget(
     query += " WHERE id=?"
     params.append(budget_id)
     conn.execute(query, tuple(params))
+    queue_change(conn, "budgets", "update", (budget_id,))
     conn.commit()
     conn.close()
@@ -1,4 +1,4 @@
-from .connection import get_db_connection
+from .connection import get_db_connection, queue_change
 
 
 def add_category(name, icon="Other", type="expense"):
@@ -6,9 +6,10 @@ def add_category(name, icon="Other", type="expense"):
     Add a new category, specifying its type ('expense' or 'income').
     """
     conn = get_db_connection()
-    conn.execute(
+    cur = conn.execute(
         "INSERT INTO categories (name, icon, type) VALUES (?, ?, ?)", (name, icon, type)
     )
+    queue_change(conn, "categories", "insert", (cur.lastrowid,))
     conn.commit()
     conn.close()
 
@@ -28,6 +29,7 @@ def get_categories():
 def delete_category(category_id):
     conn = get_db_connection()
     conn.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+    queue_change(conn, "categories", "delete", (category_id,))
     conn.commit()
     conn.close()
 
@@ -41,6 +43,7 @@ def update_category(category_id, name, icon="Other", type="expense"):
         "UPDATE categories SET name = ?, icon = ?, type = ? WHERE id = ?",
         (name, icon, type, category_id),
     )
+    queue_change(conn, "categories", "update", (category_id,))
     conn.commit()
     conn.close()
 
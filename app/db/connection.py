@@ -1,9 +1,179 @@
 import sqlite3
 import datetime
+import threading
+from contextlib import contextmanager
+from app.events import TOPICS, Change, coalesce, publish
 from app.services.currency_info import PREDEFINED_CURRENCIES
 
 _DB_PATH = None
 
+POOL_MAX_IDLE = 8
+
+_pool_lock = threading.Lock()
+_pool_idle: list = []
+_pool_epoch = 0
+
+_local = threading.local()
+
+_STATS = {"connections_opened": 0, "commits": 0}
+
+# Bumped on every commit that wrote something and whenever the database is
+# swapped out, so read-side caches can key on it.
+_data_generation = 0
+
+# QueryProfiler installed by app.db.profiling, or None.
+_profiler = None
+
+
+def _count(key: str, n: int = 1):
+    with _pool_lock:
+        _STATS[key] = _STATS.get(key, 0) + n
+
+
+def get_connection_stats() -> dict:
+    """
+    Returns a copy of the connection layer counters.
+    """
+    with _pool_lock:
+        return dict(_STATS, pool_idle=len(_pool_idle))
+
+
+def get_data_generation() -> int:
+    """
+    Returns a counter that changes whenever committed data may have changed.
+    """
+    return _data_generation
+
+
+def bump_data_generation():
+    global _data_generation
+    with _pool_lock:
+        _data_generation += 1
+
+
+def set_profiler(profiler):
+    """
+    Routes statements through profiler (see app.db.profiling); None turns
+    profiling off. Idle connections switch over on their next checkout.
+    """
+    global _profiler
+    _profiler = profiler
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that goes back to the pool on close() instead of
+    being torn down, so DAO helpers can keep their open/close pattern.
+    While it backs a unit of work, commit() and close() are deferred and
+    rollback() fails the unit of work.
+    """
+
+    _pool_epoch = -1
+    _in_uow = False
+    _uow_failed = False
+    _traced_by = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending_changes = []
+
+    def execute(self, sql, parameters=()):
+        if _profiler is None:
+            return super().execute(sql, parameters)
+        return _profiler.execute(self, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if _profiler is None:
+            return super().executemany(sql, seq_of_parameters)
+        return _profiler.executemany(self, sql, seq_of_parameters)
+
+    def commit(self):
+        if self._in_uow:
+            return
+        self.commit_now()
+
+    def commit_now(self):
+        wrote = self.in_transaction
+        if _profiler is not None and wrote:
+            _profiler.time_commit(super().commit)
+        else:
+            super().commit()
+        if wrote:
+            _count("commits")
+            bump_data_generation()
+        changes, self._pending_changes = self._pending_changes, []
+        if changes:
+            publish(coalesce(changes))
+
+    def rollback(self):
+        if self._in_uow:
+            # Rolling back here would undo the unit of work so far and let
+            # the rest of it autocommit; fail the whole unit instead.
+            self._uow_failed = True
+            return
+        self.rollback_now()
+
+    def rollback_now(self):
+        self._pending_changes = []
+        super().rollback()
+
+    def close(self):
+        if self._in_uow:
+            return
+        _release_connection(self)
+
+    def close_for_real(self):
+        super().close()
+
+
+def queue_change(conn, topic: str, op: str, keys=()):
+    """
+    Records a change made on conn; it is published on the event bus when
+    conn commits and discarded if it rolls back.
+    """
+    conn._pending_changes.append(Change(topic, op, tuple(keys)))
+
+
+def _open_connection():
+    conn = sqlite3.connect(_DB_PATH, factory=PooledConnection, check_same_thread=False)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn._pool_epoch = _pool_epoch
+    _count("connections_opened")
+    return conn
+
+
+def _release_connection(conn):
+    try:
+        conn.rollback()
+        conn.row_factory = sqlite3.Row
+    except sqlite3.ProgrammingError:
+        # Already closed for real.
+        return
+
+    with _pool_lock:
+        if conn._pool_epoch == _pool_epoch and len(_pool_idle) < POOL_MAX_IDLE:
+            _pool_idle.append(conn)
+            return
+    conn.close_for_real()
+
+
+def reset_pool():
+    """
+    Closes all idle pooled connections. Connections that are checked out
+    are closed when they are returned. Call this after the database file
+    has been replaced (e.g. restore) or the path changed.
+    """
+    global _pool_epoch, _data_generation
+    with _pool_lock:
+        _pool_epoch += 1
+        _data_generation += 1
+        idle = list(_pool_idle)
+        _pool_idle.clear()
+    for conn in idle:
+        conn.close_for_real()
+    # A different database file: every cached view is stale.
+    publish(Change(topic, "reset") for topic in TOPICS)
+
 
 def get_db_path():
     """
@@ -19,20 +189,89 @@ def get_db_path():
 
 def get_db_connection():
     """
-    Gets a new database connection using the path
-    set by init_db().
+    Gets a database connection for the path set by init_db().
+    Connections are pooled: close() hands the connection back to the pool,
+    rolling back anything left uncommitted.
     """
     if _DB_PATH is None:
         raise ValueError(
             "Database path has not been initialized. Call init_db() from main.py first."
         )
 
-    conn = sqlite3.connect(_DB_PATH)
+    uow = getattr(_local, "uow", None)
+    if uow is not None:
+        uow.conn.row_factory = sqlite3.Row
+        return uow.conn
+
+    with _pool_lock:
+        conn = _pool_idle.pop() if _pool_idle else None
+    if conn is None:
+        conn = _open_connection()
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
+    if conn._traced_by is not _profiler:
+        if _profiler is None:
+            conn.set_trace_callback(None)
+        else:
+            _profiler.attach(conn)
+        conn._traced_by = _profiler
     return conn
 
 
+class UnitOfWork:
+    """
+    Handle returned by unit_of_work(). DAO functions pick up its connection
+    automatically; conn is exposed for ad-hoc statements.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params=()):
+        return self.conn.execute(sql, params)
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Runs several DAO calls as one transaction with a single commit:
+
+        with unit_of_work():
+            add_transaction(...)
+            increment_account_balance(...)
+
+    Inside the block every get_db_connection() on this thread returns the
+    same connection and its commit()/close() calls are deferred. The work
+    is committed when the block exits and rolled back if it raises.
+    Nested blocks join the outer one. A rollback() inside the block (e.g.
+    a DAO handling its own IntegrityError) marks the unit failed: it is
+    rolled back on exit, raising RuntimeError if nothing else was raised.
+    """
+    outer = getattr(_local, "uow", None)
+    if outer is not None:
+        yield outer
+        return
+
+    conn = get_db_connection()
+    uow = UnitOfWork(conn)
+    conn._in_uow = True
+    _local.uow = uow
+    try:
+        yield uow
+        if conn._uow_failed:
+            raise RuntimeError(
+                "A call inside the unit of work rolled back; nothing was committed."
+            )
+        conn.commit_now()
+    except BaseException:
+        conn.rollback_now()
+        raise
+    finally:
+        _local.uow = None
+        conn._in_uow = False
+        conn._uow_failed = False
+        conn.close()
+
+
 def init_db(database_path: str):
     """
     Initializes the database path and creates/upgrades all tables.
@@ -40,11 +279,13 @@ def init_db(database_path: str):
     """
     global _DB_PATH
     _DB_PATH = database_path
+    reset_pool()
 
     print(f"[DB] Database path set to: {_DB_PATH}")
 
     try:
-        with get_db_connection() as conn:
+        conn = get_db_connection()
+        try:
             print("[DB] Database connection verified. Initializing schema...")
 
             _create_base_tables(conn)
@@ -55,8 +296,14 @@ def init_db(database_path: str):
             _ensure_recurring_table(conn)
             _ensure_recurring_columns(conn)
             _ensure_transactions_indexes(conn)
+            _ensure_balance_ledger(conn)
+            _ensure_rate_history(conn)
+            _ensure_ledger_meta(conn)
+            _ensure_export_cursors(conn)
 
             conn.commit()
+        finally:
+            conn.close()
 
         print(
             "[schema] Database initialized / upgraded at",
@@ -291,7 +538,174 @@ def _ensure_transactions_indexes(conn):
         ON transactions(recurring_id, occurrence_date)
         WHERE recurring_id IS NOT NULL
     """)
+    # Lookups by recurring_id use the partial index above; a full index on
+    # the column only cost every insert an entry, mostly for NULLs.
+    conn.execute("DROP INDEX IF EXISTS idx_transactions_recurring")
+
+
+def _ensure_balance_ledger(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS balance_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id INTEGER NOT NULL,
+            currency TEXT NOT NULL,
+            delta REAL NOT NULL,
+            kind TEXT NOT NULL,
+            transaction_id INTEGER,
+            effective_date TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_balance_events_key_id
+        ON balance_events(account_id, currency, id)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_balance_events_key_date
+        ON balance_events(account_id, currency, effective_date)
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS balance_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account_id INTEGER NOT NULL,
+            currency TEXT NOT NULL,
+            as_of_date TEXT NOT NULL,
+            last_event_id INTEGER NOT NULL,
+            balance REAL NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_balance_snapshots_key
+        ON balance_snapshots(account_id, currency, as_of_date)
+    """)
+    _seed_balance_ledger(conn)
+
+
+def _ensure_rate_history(conn):
+    # Daily rates as published by a source: 1 base = rate currency.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_history (
+            base TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            date TEXT NOT NULL,
+            rate REAL NOT NULL,
+            source TEXT NOT NULL,
+            PRIMARY KEY (base, currency, date)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_backfill_jobs (
+            job TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            done_through TEXT,
+            rows_written INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+
+def _ensure_ledger_meta(conn):
+    # Identity of this ledger and a counter bumped whenever existing
+    # transaction rows are deleted or have a cached column rewritten, so
+    # caches kept outside the database (app.services.column_cache) can tell
+    # whether they are still valid. Triggers catch every writer.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ledger_meta (
+            key TEXT PRIMARY KEY,
+            value NOT NULL
+        )
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO ledger_meta (key, value)
+        VALUES ('ledger_id', lower(hex(randomblob(16)))), ('tx_generation', 0)
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_delete_generation
+        AFTER DELETE ON transactions
+        BEGIN
+            UPDATE ledger_meta SET value = value + 1 WHERE key = 'tx_generation';
+        END
+    """)
     conn.execute("""
-        CREATE INDEX IF NOT EXISTS idx_transactions_recurring
-        ON transactions(recurring_id)
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_update_generation
+        AFTER UPDATE OF date, amount_converted, category_id, account_id
+        ON transactions
+        WHEN OLD.date IS NOT NEW.date
+          OR OLD.amount_converted IS NOT NEW.amount_converted
+          OR OLD.category_id IS NOT NEW.category_id
+          OR OLD.account_id IS NOT NEW.account_id
+        BEGIN
+            UPDATE ledger_meta SET value = value + 1 WHERE key = 'tx_generation';
+        END
     """)
+
+
+def _ensure_export_cursors(conn):
+    # Where each named incremental export (app.utils.export) stopped.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS export_cursors (
+            name TEXT PRIMARY KEY,
+            format TEXT NOT NULL,
+            last_id INTEGER NOT NULL,
+            tx_generation INTEGER NOT NULL,
+            rows_exported INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+
+def _seed_balance_ledger(conn):
+    """
+    Gives balances that predate the ledger a history: one event per
+    (account, currency, day) of transactions, plus an opening event so the
+    ledger sums to the stored balance.
+    """
+    missing = """
+        SELECT ab.account_id, ab.currency FROM account_balances ab
+        WHERE NOT EXISTS (
+            SELECT 1 FROM balance_events e
+            WHERE e.account_id = ab.account_id AND e.currency = ab.currency
+        )
+    """
+    if conn.execute(missing + " LIMIT 1").fetchone() is None:
+        return
+
+    now_iso = datetime.datetime.utcnow().isoformat()
+    conn.execute("CREATE TEMP TABLE _ledger_seed AS " + missing)
+    conn.execute(
+        """
+        INSERT INTO balance_events
+            (account_id, currency, delta, kind, effective_date, created_at)
+        SELECT ab.account_id, ab.currency,
+               ab.balance - COALESCE(SUM(t.amount), 0),
+               'opening',
+               COALESCE(MIN(t.date), date('now')),
+               ?
+        FROM account_balances ab
+        JOIN _ledger_seed s
+          ON s.account_id = ab.account_id AND s.currency = ab.currency
+        LEFT JOIN transactions t
+          ON t.account_id = ab.account_id AND t.currency = ab.currency
+        GROUP BY ab.account_id, ab.currency
+        """,
+        (now_iso,),
+    )
+    conn.execute(
+        """
+        INSERT INTO balance_events
+            (account_id, currency, delta, kind, effective_date, created_at)
+        SELECT t.account_id, t.currency, SUM(t.amount), 'transaction',
+               substr(t.date, 1, 10), ?
+        FROM transactions t
+        JOIN _ledger_seed s
+          ON s.account_id = t.account_id AND s.currency = t.currency
+        GROUP BY t.account_id, t.currency, substr(t.date, 1, 10)
+        """,
+        (now_iso,),
+    )
+    conn.execute("DROP TABLE _ledger_seed")
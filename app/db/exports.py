@@ -0,0 +1,72 @@
+"""
+Export cursors.
+
+Each named incremental export remembers the highest transaction id it has
+written and ledger_meta's tx_generation at that moment, so the next run
+can export only newer rows and tell when older ones were rewritten since.
+"""
+
+import datetime
+from typing import List, Optional
+
+from .connection import get_db_connection
+
+
+def get_tx_generation(conn) -> int:
+    row = conn.execute(
+        "SELECT value FROM ledger_meta WHERE key = 'tx_generation'"
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def get_export_cursor(name: str) -> Optional[dict]:
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT * FROM export_cursors WHERE name = ?", (name,)
+    ).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def list_export_cursors() -> List[dict]:
+    conn = get_db_connection()
+    rows = conn.execute("SELECT * FROM export_cursors ORDER BY name").fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+def save_export_cursor(
+    name: str, fmt: str, last_id: int, tx_generation: int, rows_exported: int
+):
+    conn = get_db_connection()
+    conn.execute(
+        """
+        INSERT INTO export_cursors
+            (name, format, last_id, tx_generation, rows_exported, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            format = excluded.format,
+            last_id = excluded.last_id,
+            tx_generation = excluded.tx_generation,
+            rows_exported = export_cursors.rows_exported + excluded.rows_exported,
+            updated_at = excluded.updated_at
+        """,
+        (
+            name,
+            fmt,
+            last_id,
+            tx_generation,
+            rows_exported,
+            datetime.datetime.utcnow().isoformat(),
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def delete_export_cursor(name: str) -> bool:
+    conn = get_db_connection()
+    cur = conn.execute("DELETE FROM export_cursors WHERE name = ?", (name,))
+    conn.commit()
+    conn.close()
+    return cur.rowcount > 0
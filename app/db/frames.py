@@ -0,0 +1,225 @@
+"""
+DataFrame access to transactions, for analysis and bulk loads.
+
+read_transactions_df() builds typed columns straight from the cursor's
+tuples; write_transactions_df() converts a whole frame to the base
+currency in one vectorised step and inserts it through the same batched
+executemany path as add_transactions_bulk(). Neither builds a dict or
+model object per row.
+
+pandas is optional; both functions raise RuntimeError without it.
+"""
+
+from typing import Iterable, Optional
+
+from .connection import get_db_connection, queue_change
+from .transactions import BULK_BATCH_SIZE, _apply_balance_deltas, _insert_rows
+from app.services.converter import get_base_currency, get_conversion_rates
+
+try:
+    import pandas as pd
+except ImportError:  # optional: pip install finet[dataframe]
+    pd = None
+
+_READ_SQL = """
+    SELECT t.id, t.date, t.amount, t.amount_converted, t.currency,
+           t.category_id, c.name, t.account_id, t.notes,
+           t.recurring_id, t.occurrence_date
+    FROM transactions t
+    LEFT JOIN categories c ON t.category_id = c.id
+"""
+
+# Column name -> dtype of the frames read_transactions_df() returns. Dates
+# are datetime64; nullable ids use pandas' Int64.
+READ_DTYPES = {
+    "id": "int64",
+    "date": "datetime64[ns]",
+    "amount": "float64",
+    "amount_converted": "float64",
+    "currency": "category",
+    "category_id": "Int64",
+    "category_name": "category",
+    "account_id": "Int64",
+    "notes": "string",
+    "recurring_id": "Int64",
+    "occurrence_date": "datetime64[ns]",
+}
+
+_WRITE_REQUIRED = ("date", "amount", "currency")
+
+
+def _require_pandas():
+    if pd is None:
+        raise RuntimeError(
+            "pandas is not installed; install finet[dataframe] to use app.db.frames"
+        )
+
+
+def _in_clause(column: str, values: Iterable, where: list, params: list):
+    values = list(values)
+    where.append(f"{column} IN ({', '.join('?' * len(values))})")
+    params.extend(values)
+
+
+def read_transactions_df(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    category_ids: Optional[Iterable[int]] = None,
+    account_ids: Optional[Iterable[int]] = None,
+    currencies: Optional[Iterable[str]] = None,
+    dtype_backend: Optional[str] = None,
+):
+    """
+    Transactions as a DataFrame with READ_DTYPES columns, ordered by date
+    and id. start/end are inclusive ISO dates; the id and currency filters
+    keep rows matching any of the given values. dtype_backend="pyarrow"
+    returns Arrow-backed columns instead (needs pyarrow).
+    """
+    _require_pandas()
+    where, params = [], []
+    if start is not None:
+        where.append("t.date >= ?")
+        params.append(str(start))
+    if end is not None:
+        where.append("t.date <= ?")
+        params.append(str(end))
+    if category_ids is not None:
+        _in_clause("t.category_id", category_ids, where, params)
+    if account_ids is not None:
+        _in_clause("t.account_id", account_ids, where, params)
+    if currencies is not None:
+        _in_clause("t.currency", currencies, where, params)
+
+    sql = _READ_SQL
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY t.date, t.id"
+
+    conn = get_db_connection()
+    try:
+        cur = conn.execute(sql, params)
+        cur.row_factory = None
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+
+    columns = list(zip(*rows)) if rows else [()] * len(READ_DTYPES)
+    data = {}
+    for (name, dtype), values in zip(READ_DTYPES.items(), columns):
+        if dtype.startswith("datetime"):
+            data[name] = pd.to_datetime(
+                pd.Series(values, dtype=object), format="ISO8601", errors="coerce"
+            ).astype(dtype)
+        else:
+            data[name] = pd.Series(values, dtype=dtype)
+    df = pd.DataFrame(data)
+    if dtype_backend is not None:
+        df = df.convert_dtypes(dtype_backend=dtype_backend)
+    return df
+
+
+def convert_to_base_vectorized(amount, currency):
+    """
+    convert_to_base() over whole Series: amount / rate for each row's
+    currency, with one rates lookup. Currencies without a usable rate
+    convert to 0.0, with one warning per currency.
+    """
+    _require_pandas()
+    rates = get_conversion_rates()
+    rate = currency.map(rates).astype("float64")
+    rate[currency == get_base_currency()] = 1.0
+    missing = rate.isna() | (rate == 0)
+    for code in currency[missing].unique():
+        print(f"[Warning] No conversion rate for {code}. Returning 0.")
+    return (amount / rate.where(~missing, 1.0)).where(~missing, 0.0)
+
+
+def _nullable(series):
+    # Objects with None for missing values, which is what sqlite3 binds.
+    return series.astype(object).where(series.notna(), None)
+
+
+def _iso_dates(series):
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return _nullable(series.dt.strftime("%Y-%m-%d"))
+    return _nullable(series.astype("string").str.slice(0, 10))
+
+
+def write_transactions_df(
+    df, conn=None, adjust_balances: bool = False, batch_size: int = BULK_BATCH_SIZE
+) -> list:
+    """
+    Bulk-inserts a DataFrame of transactions and returns the new ids in
+    row order. Needs date, amount (signed) and currency columns; takes
+    category_id, account_id, notes, recurring_id and occurrence_date when
+    present. conn and adjust_balances work as in add_transactions_bulk().
+    """
+    _require_pandas()
+    missing = [c for c in _WRITE_REQUIRED if c not in df.columns]
+    if missing:
+        raise ValueError(f"DataFrame is missing columns: {', '.join(missing)}")
+    if df.empty:
+        return []
+
+    amount = pd.to_numeric(df["amount"]).astype("float64").reset_index(drop=True)
+    if amount.isna().any():
+        raise ValueError("amount must not contain missing values")
+    currency = df["currency"].astype(str).reset_index(drop=True)
+    converted = convert_to_base_vectorized(amount, currency)
+    dates = _iso_dates(df["date"]).reset_index(drop=True)
+
+    def optional(name, ids=False):
+        if name not in df.columns:
+            return [None] * len(df)
+        series = df[name].reset_index(drop=True)
+        if ids:
+            series = pd.to_numeric(series).astype("Int64")
+        return _nullable(series)
+
+    account = optional("account_id", ids=True)
+    rows = zip(
+        dates,
+        amount.tolist(),
+        converted.tolist(),
+        optional("category_id", ids=True),
+        account,
+        optional("notes"),
+        currency,
+        optional("recurring_id", ids=True),
+        (
+            _iso_dates(df["occurrence_date"]).reset_index(drop=True)
+            if "occurrence_date" in df.columns
+            else [None] * len(df)
+        ),
+    )
+
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+    try:
+        ids = _insert_rows(conn, rows, batch_size)
+        queue_change(conn, "transactions", "insert", ids)
+
+        if adjust_balances:
+            moves = pd.DataFrame(
+                {
+                    "account_id": account,
+                    "currency": currency,
+                    "day": dates,
+                    "amount": amount,
+                }
+            ).dropna(subset=["account_id"])
+            by_key = moves.groupby(["account_id", "currency"]).amount.sum()
+            by_day = moves.groupby(["account_id", "currency", "day"]).amount.sum()
+            _apply_balance_deltas(
+                conn,
+                {(int(a), c): float(v) for (a, c), v in by_key.items()},
+                {(int(a), c, d): float(v) for (a, c, d), v in by_day.items()},
+            )
+
+        if own_conn:
+            conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+    return ids
@@ -0,0 +1,390 @@
+"""
+Append-only balance ledger.
+
+Every change to an account balance is stored as a row in balance_events.
+account_balances remains the materialized "current balance" the UI reads,
+but the ledger is the source of truth:
+
+    balance(as_of) = snapshot + tail sum of events not covered by it
+
+A snapshot (as_of_date D, last_event_id N, balance S) holds the sum of all
+events with id <= N and effective_date <= D, so any later query only has to
+sum the events after D, plus back-dated events added after N.
+"""
+
+import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .connection import get_db_connection, queue_change
+from app.events import topic_generation
+
+SNAPSHOT_EVERY = 256
+
+FAR_FUTURE = "9999-12-31"
+
+
+def _today() -> str:
+    return datetime.date.today().isoformat()
+
+
+def record_balance_event(
+    conn,
+    account_id: int,
+    currency: str,
+    delta: float,
+    kind: str = "adjustment",
+    effective_date: Optional[str] = None,
+    transaction_id: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Appends one balance change on the caller's connection (no commit).
+    Takes a snapshot for the (account, currency) once its tail gets long.
+    """
+    if not delta:
+        return None
+    cur = conn.execute(
+        """
+        INSERT INTO balance_events
+            (account_id, currency, delta, kind, transaction_id, effective_date, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            account_id,
+            currency,
+            delta,
+            kind,
+            transaction_id,
+            (effective_date or _today())[:10],
+            datetime.datetime.utcnow().isoformat(),
+        ),
+    )
+    _maybe_snapshot(conn, account_id, currency)
+    queue_change(conn, "balances", "update", ((account_id, currency),))
+    return cur.lastrowid
+
+
+def record_balance_events(conn, events) -> None:
+    """
+    Appends many events at once. Each event is a tuple of
+    (account_id, currency, delta, kind, transaction_id, effective_date).
+    Events for (account, currency) pairs without an account_balances row
+    are skipped, matching increment semantics.
+    """
+    now_iso = datetime.datetime.utcnow().isoformat()
+    conn.executemany(
+        """
+        INSERT INTO balance_events
+            (account_id, currency, delta, kind, transaction_id, effective_date, created_at)
+        SELECT ?, ?, ?, ?, ?, ?, ?
+        WHERE EXISTS (
+            SELECT 1 FROM account_balances WHERE account_id = ? AND currency = ?
+        )
+        """,
+        [
+            (acc, ccy, delta, kind, tx_id, (date or _today())[:10], now_iso, acc, ccy)
+            for acc, ccy, delta, kind, tx_id, date in events
+            if delta
+        ],
+    )
+    pairs = list(dict.fromkeys((e[0], e[1]) for e in events))
+    for acc, ccy in pairs:
+        _maybe_snapshot(conn, acc, ccy)
+    queue_change(conn, "balances", "update", pairs)
+
+
+def _latest_snapshot(conn, account_id, currency, as_of: str):
+    return conn.execute(
+        """
+        SELECT as_of_date, last_event_id, balance
+        FROM balance_snapshots
+        WHERE account_id = ? AND currency = ? AND as_of_date <= ?
+        ORDER BY as_of_date DESC, last_event_id DESC
+        LIMIT 1
+        """,
+        (account_id, currency, as_of),
+    ).fetchone()
+
+
+def _balance_on(conn, account_id, currency, as_of: str) -> float:
+    snap = _latest_snapshot(conn, account_id, currency, as_of)
+    if snap is None:
+        row = conn.execute(
+            """
+            SELECT COALESCE(SUM(delta), 0) FROM balance_events
+            WHERE account_id = ? AND currency = ? AND effective_date <= ?
+            """,
+            (account_id, currency, as_of),
+        ).fetchone()
+        return float(row[0])
+
+    snap_date, snap_id, snap_balance = snap[0], snap[1], snap[2]
+    after = conn.execute(
+        """
+        SELECT COALESCE(SUM(delta), 0) FROM balance_events
+        WHERE account_id = ? AND currency = ?
+          AND effective_date > ? AND effective_date <= ?
+        """,
+        (account_id, currency, snap_date, as_of),
+    ).fetchone()[0]
+    late = conn.execute(
+        """
+        SELECT COALESCE(SUM(delta), 0) FROM balance_events
+        WHERE account_id = ? AND currency = ?
+          AND id > ? AND effective_date <= ?
+        """,
+        (account_id, currency, snap_id, snap_date),
+    ).fetchone()[0]
+    return float(snap_balance) + float(after) + float(late)
+
+
+def _maybe_snapshot(conn, account_id, currency):
+    snap = _latest_snapshot(conn, account_id, currency, FAR_FUTURE)
+    last_id = snap["last_event_id"] if snap else 0
+    tail = conn.execute(
+        """
+        SELECT COUNT(*) FROM (
+            SELECT 1 FROM balance_events
+            WHERE account_id = ? AND currency = ? AND id > ?
+            LIMIT ?
+        )
+        """,
+        (account_id, currency, last_id, SNAPSHOT_EVERY),
+    ).fetchone()[0]
+    if tail >= SNAPSHOT_EVERY:
+        _take_snapshot(conn, account_id, currency)
+
+
+def _take_snapshot(conn, account_id, currency, as_of: Optional[str] = None):
+    as_of = as_of or _today()
+    last_id = conn.execute(
+        "SELECT COALESCE(MAX(id), 0) FROM balance_events WHERE account_id = ? AND currency = ?",
+        (account_id, currency),
+    ).fetchone()[0]
+    balance = _balance_on(conn, account_id, currency, as_of)
+    conn.execute(
+        """
+        INSERT INTO balance_snapshots
+            (account_id, currency, as_of_date, last_event_id, balance, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        (
+            account_id,
+            currency,
+            as_of,
+            last_id,
+            balance,
+            datetime.datetime.utcnow().isoformat(),
+        ),
+    )
+
+
+# ---------- Public API ----------
+
+
+def get_balance(account_id: int, currency: str, as_of: Optional[str] = None) -> float:
+    """
+    Balance computed from the ledger. as_of is an inclusive YYYY-MM-DD date;
+    None means the current balance (every event, including future-dated ones).
+    """
+    conn = get_db_connection()
+    try:
+        return _balance_on(conn, account_id, currency, (as_of or FAR_FUTURE)[:10])
+    finally:
+        conn.close()
+
+
+def list_balance_events(
+    account_id: int, currency: Optional[str] = None, limit: int = 100
+) -> List[Dict[str, Any]]:
+    """
+    Most recent ledger entries for an account, newest first.
+    """
+    conn = get_db_connection()
+    if currency:
+        rows = conn.execute(
+            """
+            SELECT * FROM balance_events
+            WHERE account_id = ? AND currency = ?
+            ORDER BY id DESC LIMIT ?
+            """,
+            (account_id, currency, limit),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT * FROM balance_events WHERE account_id = ? ORDER BY id DESC LIMIT ?",
+            (account_id, limit),
+        ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+def take_snapshots(as_of: Optional[str] = None) -> int:
+    """
+    Snapshots every (account, currency) with events newer than its latest
+    snapshot. Returns the number of snapshots written.
+    """
+    conn = get_db_connection()
+    try:
+        keys = conn.execute("""
+            SELECT e.account_id, e.currency
+            FROM balance_events e
+            GROUP BY e.account_id, e.currency
+            HAVING MAX(e.id) > COALESCE((
+                SELECT MAX(s.last_event_id) FROM balance_snapshots s
+                WHERE s.account_id = e.account_id AND s.currency = e.currency
+            ), 0)
+            """).fetchall()
+        for k in keys:
+            _take_snapshot(conn, k["account_id"], k["currency"], as_of)
+        conn.commit()
+        return len(keys)
+    finally:
+        conn.close()
+
+
+def reconcile_balances(fix: bool = False) -> List[Dict[str, Any]]:
+    """
+    Compares account_balances with the ledger and returns the rows that
+    drifted. With fix=True the stored balances are reset to the ledger values.
+    """
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            "SELECT account_id, currency, balance FROM account_balances"
+        ).fetchall()
+        drift = []
+        for r in rows:
+            ledger = _balance_on(conn, r["account_id"], r["currency"], FAR_FUTURE)
+            if abs(ledger - (r["balance"] or 0.0)) > 1e-6:
+                drift.append(
+                    {
+                        "account_id": r["account_id"],
+                        "currency": r["currency"],
+                        "stored": r["balance"],
+                        "ledger": ledger,
+                    }
+                )
+        if fix and drift:
+            conn.executemany(
+                "UPDATE account_balances SET balance = ? WHERE account_id = ? AND currency = ?",
+                [(d["ledger"], d["account_id"], d["currency"]) for d in drift],
+            )
+            queue_change(
+                conn,
+                "balances",
+                "update",
+                [(d["account_id"], d["currency"]) for d in drift],
+            )
+            conn.commit()
+        return drift
+    finally:
+        conn.close()
+
+
+# ---------- Balance history ----------
+
+_HISTORY_SQL = """
+WITH RECURSIVE days(d) AS (
+    SELECT :start
+    UNION ALL
+    SELECT date(d, '+1 day') FROM days WHERE d < :end
+),
+keys AS (
+    SELECT account_id, currency FROM account_balances
+    WHERE (:account_id IS NULL OR account_id = :account_id)
+      AND (:currency IS NULL OR currency = :currency)
+),
+opening AS (
+    SELECT k.account_id, k.currency, COALESCE(SUM(e.delta), 0) AS balance
+    FROM keys k
+    LEFT JOIN balance_events e
+        ON e.account_id = k.account_id
+       AND e.currency = k.currency
+       AND e.effective_date < :start
+    GROUP BY k.account_id, k.currency
+),
+daily AS (
+    SELECT e.account_id, e.currency, e.effective_date AS d, SUM(e.delta) AS delta
+    FROM balance_events e
+    JOIN keys k ON k.account_id = e.account_id AND k.currency = e.currency
+    WHERE e.effective_date BETWEEN :start AND :end
+    GROUP BY e.account_id, e.currency, e.effective_date
+)
+SELECT
+    o.account_id,
+    o.currency,
+    days.d AS date,
+    o.balance + SUM(COALESCE(daily.delta, 0)) OVER (
+        PARTITION BY o.account_id, o.currency
+        ORDER BY days.d
+        ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+    ) AS balance
+FROM opening o
+CROSS JOIN days
+LEFT JOIN daily
+    ON daily.account_id = o.account_id
+   AND daily.currency = o.currency
+   AND daily.d = days.d
+ORDER BY o.account_id, o.currency, days.d
+"""
+
+
+@lru_cache(maxsize=32)
+def _balance_history_cached(
+    start: str,
+    end: str,
+    account_id: Optional[int],
+    currency: Optional[str],
+    generation: tuple,
+) -> Tuple[tuple, ...]:
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(
+            _HISTORY_SQL,
+            {
+                "start": start,
+                "end": end,
+                "account_id": account_id,
+                "currency": currency,
+            },
+        ).fetchall()
+    finally:
+        conn.close()
+    return tuple((r[0], r[1], r[2], float(r[3])) for r in rows)
+
+
+def get_first_event_date() -> Optional[str]:
+    """
+    Effective date of the oldest ledger entry, or None for an empty ledger.
+    """
+    conn = get_db_connection()
+    row = conn.execute("SELECT MIN(effective_date) FROM balance_events").fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def get_balance_history(
+    start: str,
+    end: Optional[str] = None,
+    account_id: Optional[int] = None,
+    currency: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Daily end-of-day balances per (account, currency) for start..end
+    (inclusive YYYY-MM-DD dates, end defaults to today), one row per day
+    even when nothing happened. The running sum is done by SQLite with a
+    window function; results are cached per range until the next balance
+    or account change.
+    """
+    start = start[:10]
+    end = (end or _today())[:10]
+    if end < start:
+        return []
+    rows = _balance_history_cached(
+        start, end, account_id, currency, topic_generation("balances", "accounts")
+    )
+    return [
+        {"account_id": r[0], "currency": r[1], "date": r[2], "balance": r[3]}
+        for r in rows
+    ]
@@ -0,0 +1,493 @@
+"""
+SQL profiling for the connection layer.
+
+While enabled, every pooled connection routes execute()/executemany()
+through ProfilingCursor, which times the statement and the fetches that
+follow it and counts the rows returned (or changed, for writes). A
+set_trace_callback hook picks up what bypasses the cursor: implicit
+BEGIN/COMMIT, executescript() and statements run by triggers, counted
+but not timed. Statements are grouped by their SQL text with whitespace
+collapsed and literals replaced by ?.
+
+Executions slower than slow_ms are appended to a slow-query log (one JSON
+object per line, with parameters). Off by default; turn it on with
+enable_profiling(), FINET_SQL_PROFILE=1 at startup (FINET_SQL_PROFILE_OUT
+saves the stats on exit) or the SQL profiling card in Settings.
+
+Usage (CLI):
+    python -m app.db.profiling run --db-path ./app/assets/finet.db --out profile.json
+    python -m app.db.profiling report profile.json --sort p95 --limit 15
+"""
+
+import argparse
+import atexit
+import datetime
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from . import connection
+
+DEFAULT_SLOW_MS = 50.0
+# Per-statement durations kept for the percentile.
+MAX_SAMPLES = 2000
+
+_WS = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_sql(sql: str, strip_literals: bool = False) -> str:
+    sql = _WS.sub(" ", sql).strip()
+    if strip_literals:
+        sql = _LITERALS.sub("?", sql)
+    return sql
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[k]
+
+
+class QueryStat:
+    __slots__ = ("calls", "traced", "total_ms", "max_ms", "rows", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.traced = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        # One-element lists, so fetches can add to the execution's sample.
+        self.samples: deque = deque(maxlen=MAX_SAMPLES)
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    """
+    Cursor that reports to the active profiler. Time spent in fetches is
+    added to the statement that produced the rows; the slow-query check
+    runs once the statement is done (rows exhausted, cursor re-executed,
+    closed or collected).
+    """
+
+    _stat: Optional[QueryStat] = None
+    _sample: Optional[list] = None
+    _sql = ""
+    _params = None
+
+    def _begin(self, sql, params):
+        self._finish()
+        profiler = _active
+        self._stat = profiler.stat(normalize_sql(sql)) if profiler else None
+        self._sql, self._params = sql, params
+        return profiler
+
+    def _finish(self):
+        sample, self._sample = self._sample, None
+        profiler = _active
+        if sample is not None and profiler and sample[0] >= profiler.slow_ms:
+            profiler.log_slow(self._sql, self._params, sample[0])
+
+    def _account(self, ms: float, rows: int):
+        stat = self._stat
+        if stat is None or self._sample is None:
+            return
+        _local.db_ms = getattr(_local, "db_ms", 0.0) + ms
+        with _stats_lock:
+            stat.total_ms += ms
+            stat.rows += rows
+            self._sample[0] += ms
+            if self._sample[0] > stat.max_ms:
+                stat.max_ms = self._sample[0]
+
+    def execute(self, sql, parameters=()):
+        profiler = self._begin(sql, parameters)
+        _local.wrapped = True
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            _local.wrapped = False
+            ms = (time.perf_counter() - start) * 1000
+            if profiler:
+                self._open_sample()
+                # rowcount is -1 for statements that report no count.
+                rows = max(self.rowcount, 0) if self.description is None else 0
+                self._account(ms, rows)
+                if self.description is None:
+                    self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        profiler = self._begin(sql, None)
+        _local.wrapped = True
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        finally:
+            _local.wrapped = False
+            ms = (time.perf_counter() - start) * 1000
+            if profiler:
+                self._open_sample()
+                self._account(ms, max(self.rowcount, 0))
+                self._finish()
+        return self
+
+    def _open_sample(self):
+        with _stats_lock:
+            self._stat.calls += 1
+            self._sample = [0.0]
+            self._stat.samples.append(self._sample)
+
+    def _timed_fetch(self, fetch, *args):
+        _local.wrapped = True
+        start = time.perf_counter()
+        try:
+            result = fetch(*args)
+        finally:
+            _local.wrapped = False
+        return result, (time.perf_counter() - start) * 1000
+
+    def fetchone(self):
+        row, ms = self._timed_fetch(super().fetchone)
+        self._account(ms, 0 if row is None else 1)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        rows, ms = self._timed_fetch(super().fetchmany, size)
+        self._account(ms, len(rows))
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows, ms = self._timed_fetch(super().fetchall)
+        self._account(ms, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        row, ms = self._timed_fetch(super().fetchone)
+        self._account(ms, 0 if row is None else 1)
+        if row is None:
+            self._finish()
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class QueryProfiler:
+    def __init__(
+        self, slow_ms: float = DEFAULT_SLOW_MS, log_path: Optional[str] = None
+    ):
+        self.slow_ms = slow_ms
+        self.log_path = log_path
+        self.started_at = datetime.datetime.now().isoformat(timespec="seconds")
+        self._stats: Dict[str, QueryStat] = {}
+        self.slow: deque = deque(maxlen=200)
+
+    # Called by PooledConnection while this profiler is installed.
+
+    def attach(self, conn):
+        conn.set_trace_callback(self.trace)
+
+    def execute(self, conn, sql, parameters=()):
+        return conn.cursor(ProfilingCursor).execute(sql, parameters)
+
+    def executemany(self, conn, sql, seq_of_parameters):
+        return conn.cursor(ProfilingCursor).executemany(sql, seq_of_parameters)
+
+    def time_commit(self, commit):
+        stat = self.stat("COMMIT")
+        _local.wrapped = True
+        start = time.perf_counter()
+        try:
+            commit()
+        finally:
+            _local.wrapped = False
+            ms = (time.perf_counter() - start) * 1000
+            _local.db_ms = getattr(_local, "db_ms", 0.0) + ms
+            with _stats_lock:
+                stat.calls += 1
+                stat.total_ms += ms
+                stat.max_ms = max(stat.max_ms, ms)
+                stat.samples.append([ms])
+            if ms >= self.slow_ms:
+                self.log_slow("COMMIT", None, ms)
+
+    def stat(self, key: str) -> QueryStat:
+        stat = self._stats.get(key)
+        if stat is None:
+            with _stats_lock:
+                stat = self._stats.setdefault(key, QueryStat())
+        return stat
+
+    def trace(self, sql: str):
+        if getattr(_local, "wrapped", False):
+            return
+        stat = self.stat(normalize_sql(sql, strip_literals=True))
+        with _stats_lock:
+            stat.traced += 1
+
+    def log_slow(self, sql: str, params, ms: float):
+        entry = {
+            "at": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "ms": round(ms, 3),
+            "sql": normalize_sql(sql),
+            "params": _jsonable_params(params),
+            "thread": threading.current_thread().name,
+        }
+        self.slow.append(entry)
+        print(f"[SQL] Slow query ({ms:.1f} ms): {entry['sql'][:120]}")
+        if self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError as ex:
+                print(f"[SQL] Could not write slow-query log: {ex}")
+
+    def reset(self):
+        with _stats_lock:
+            self._stats.clear()
+            self.slow.clear()
+
+    def snapshot(self) -> List[dict]:
+        """
+        One dict per statement: calls, traced (untimed executions seen by
+        the trace hook), total/mean/p95/max ms and rows.
+        """
+        with _stats_lock:
+            items = [
+                (
+                    sql,
+                    s.calls,
+                    s.traced,
+                    s.total_ms,
+                    s.max_ms,
+                    s.rows,
+                    [x[0] for x in s.samples],
+                )
+                for sql, s in self._stats.items()
+            ]
+        out = []
+        for sql, calls, traced, total, max_ms, rows, samples in items:
+            out.append(
+                {
+                    "sql": sql,
+                    "calls": calls,
+                    "traced": traced,
+                    "total_ms": round(total, 3),
+                    "mean_ms": round(total / calls, 3) if calls else 0.0,
+                    "p95_ms": round(_percentile(samples, 95), 3),
+                    "max_ms": round(max_ms, 3),
+                    "rows": rows,
+                }
+            )
+        return out
+
+    def save(self, path: str):
+        data = {
+            "started_at": self.started_at,
+            "saved_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "slow_ms": self.slow_ms,
+            "statements": self.snapshot(),
+            "slow": list(self.slow),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+def _jsonable_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {k: _jsonable_params(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_jsonable_params(v) for v in params]
+    if isinstance(params, (str, int, float)) or params is None:
+        return params
+    return repr(params)
+
+
+_active: Optional[QueryProfiler] = None
+_stats_lock = threading.Lock()
+_local = threading.local()
+
+
+def enable_profiling(
+    slow_ms: float = DEFAULT_SLOW_MS, log_path: Optional[str] = None
+) -> QueryProfiler:
+    """
+    Starts collecting (or keeps the running profiler, with the new
+    threshold and log path). Connections pick it up on their next checkout.
+    """
+    global _active
+    if _active is None:
+        _active = QueryProfiler(slow_ms, log_path)
+    else:
+        _active.slow_ms, _active.log_path = slow_ms, log_path
+    connection.set_profiler(_active)
+    return _active
+
+
+def disable_profiling() -> Optional[QueryProfiler]:
+    """
+    Stops collecting and returns the profiler with what it gathered.
+    """
+    global _active
+    profiler, _active = _active, None
+    connection.set_profiler(None)
+    return profiler
+
+
+def get_profiler() -> Optional[QueryProfiler]:
+    return _active
+
+
+def thread_db_ms() -> float:
+    """
+    Milliseconds this thread has spent in profiled statements so far
+    (a running total; callers take differences).
+    """
+    return getattr(_local, "db_ms", 0.0)
+
+
+# Report sort orders -> the statement field they rank by.
+SORT_KEYS = {
+    "total": "total_ms",
+    "p95": "p95_ms",
+    "mean": "mean_ms",
+    "calls": "calls",
+    "rows": "rows",
+}
+
+
+def rank(statements: List[dict], sort: str = "total", limit: int = 20) -> List[dict]:
+    key = SORT_KEYS[sort]
+    ranked = sorted(statements, key=lambda s: s[key], reverse=True)[:limit]
+    grand = sum(s["total_ms"] for s in statements) or 1.0
+    return [dict(s, share=round(100 * s["total_ms"] / grand, 1)) for s in ranked]
+
+
+def format_report(statements: List[dict], sort: str = "total", limit: int = 20) -> str:
+    lines = [
+        f"{'total ms':>10} {'share':>6} {'calls':>7} {'mean':>8} {'p95':>8} "
+        f"{'max':>8} {'rows':>9}  sql"
+    ]
+    for s in rank(statements, sort, limit):
+        calls = f"{s['calls']}" + (f"+{s['traced']}" if s["traced"] else "")
+        lines.append(
+            f"{s['total_ms']:>10.1f} {s['share']:>5.1f}% {calls:>7} "
+            f"{s['mean_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['max_ms']:>8.2f} "
+            f"{s['rows']:>9}  {s['sql'][:100]}"
+        )
+    return "\n".join(lines)
+
+
+def enable_from_env():
+    """
+    Turns profiling on when FINET_SQL_PROFILE is set (startup calls this).
+    FINET_SQL_SLOW_MS and FINET_SQL_SLOW_LOG set the slow-query threshold
+    and log file.
+    """
+    if os.getenv("FINET_SQL_PROFILE", "") in ("", "0"):
+        return
+    profiler = enable_profiling(
+        float(os.getenv("FINET_SQL_SLOW_MS", DEFAULT_SLOW_MS)),
+        os.getenv("FINET_SQL_SLOW_LOG") or None,
+    )
+    out = os.getenv("FINET_SQL_PROFILE_OUT")
+    if out:
+        atexit.register(profiler.save, out)
+
+
+def _profile_workload(db_path: str, repeat: int):
+    """
+    Runs the reads behind a dashboard render and a Transactions tab
+    refresh, with caches dropped before each round.
+    """
+    from app.db.accounts import get_accounts, get_low_balance_alerts
+    from app.db.budgets import get_budgets
+    from app.db.categories import get_categories
+    from app.db.recurring import get_upcoming_recurring
+    from app.db.transactions import get_recent_transactions
+    from app.services.analytics import (
+        balance_series_for_timeframe,
+        get_timeframe_dataset,
+    )
+
+    connection.init_db(db_path)
+    for _ in range(repeat):
+        connection.reset_pool()
+        for code in ("30D", "90D", "YTD", "ALL"):
+            get_timeframe_dataset(code)
+            balance_series_for_timeframe(code, max_points=500)
+        get_accounts()
+        get_low_balance_alerts()
+        get_budgets()
+        get_upcoming_recurring(days_ahead=30)
+        get_recent_transactions(8)
+        get_categories()
+        get_recent_transactions(limit=100)
+
+
+def _cli():
+    parser = argparse.ArgumentParser(
+        prog="finet-sqlprofile", description="SQL statement profiling"
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="Profile the dashboard/transactions reads")
+    p_run.add_argument("--db-path", required=True)
+    p_run.add_argument("--repeat", type=int, default=3)
+    p_run.add_argument("--slow-ms", type=float, default=DEFAULT_SLOW_MS)
+    p_run.add_argument("--slow-log", default=None)
+    p_run.add_argument("--out", default=None, help="Save the profile as JSON")
+    p_run.add_argument("--sort", choices=list(SORT_KEYS), default="total")
+    p_run.add_argument("--limit", type=int, default=20)
+
+    p_rep = sub.add_parser("report", help="Rank statements from a saved profile")
+    p_rep.add_argument("path")
+    p_rep.add_argument("--sort", choices=list(SORT_KEYS), default="total")
+    p_rep.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.cmd == "run":
+        profiler = enable_profiling(args.slow_ms, args.slow_log)
+        _profile_workload(args.db_path, args.repeat)
+        disable_profiling()
+        if args.out:
+            profiler.save(args.out)
+            print(f"Profile saved: {args.out}")
+        print(format_report(profiler.snapshot(), args.sort, args.limit))
+    elif args.cmd == "report":
+        with open(args.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        print(format_report(data["statements"], args.sort, args.limit))
+        if data.get("slow"):
+            print(f"\n{len(data['slow'])} slow executions (>= {data['slow_ms']} ms)")
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,177 @@
+"""
+Historical exchange rates.
+
+rate_history keeps one row per (base, currency, date) exactly as a source
+published it ("1 base = rate currency"). Rows from sources with a
+different base are not rewritten; RateSeries crosses them through the
+shared base when asked for another one. Days without a row (weekends,
+holidays) use the closest earlier date.
+"""
+
+import bisect
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .connection import get_db_connection, queue_change
+
+RateRow = Tuple[str, str, str, float, str]  # (base, currency, date, rate, source)
+
+
+def store_rate_history(conn, rows: Iterable[RateRow]) -> int:
+    """
+    Upserts rows on the caller's connection (no commit). Rows already
+    stored with the same rate are left alone. Returns the number of rows
+    inserted or changed.
+    """
+    before = conn.total_changes
+    conn.executemany(
+        """
+        INSERT INTO rate_history (base, currency, date, rate, source)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(base, currency, date) DO UPDATE
+            SET rate = excluded.rate, source = excluded.source
+            WHERE rate != excluded.rate
+        """,
+        rows,
+    )
+    written = conn.total_changes - before
+    if written:
+        queue_change(conn, "rate_history", "insert")
+    return written
+
+
+def get_rate_history_range() -> Optional[Tuple[str, str]]:
+    """
+    (first_date, last_date) of the stored history, or None if it is empty.
+    """
+    conn = get_db_connection()
+    row = conn.execute("SELECT MIN(date), MAX(date) FROM rate_history").fetchone()
+    conn.close()
+    return (row[0], row[1]) if row and row[0] else None
+
+
+def count_rate_history() -> int:
+    conn = get_db_connection()
+    row = conn.execute("SELECT COUNT(*) FROM rate_history").fetchone()
+    conn.close()
+    return row[0]
+
+
+# ---------- Backfill jobs ----------
+
+
+def get_backfill_job(job: str) -> Optional[dict]:
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT * FROM rate_backfill_jobs WHERE job = ?", (job,)
+    ).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def save_backfill_progress(
+    conn,
+    job: str,
+    source: str,
+    start_date: str,
+    end_date: str,
+    done_through: Optional[str],
+    rows_written: int,
+):
+    """
+    Records how far a job got, on the caller's connection so it commits
+    together with the rows it describes.
+    """
+    conn.execute(
+        """
+        INSERT INTO rate_backfill_jobs
+            (job, source, start_date, end_date, done_through, rows_written, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(job) DO UPDATE SET
+            source = excluded.source,
+            start_date = excluded.start_date,
+            end_date = excluded.end_date,
+            done_through = excluded.done_through,
+            rows_written = rate_backfill_jobs.rows_written + excluded.rows_written,
+            updated_at = excluded.updated_at
+        """,
+        (
+            job,
+            source,
+            start_date,
+            end_date,
+            done_through,
+            rows_written,
+            datetime.datetime.utcnow().isoformat(),
+        ),
+    )
+
+
+def list_backfill_jobs() -> List[dict]:
+    conn = get_db_connection()
+    rows = conn.execute(
+        "SELECT * FROM rate_backfill_jobs ORDER BY updated_at DESC"
+    ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+# ---------- Lookups ----------
+
+
+class RateSeries:
+    """
+    The whole history in memory, for converting many dated amounts at once
+    (one query instead of one per transaction).
+    """
+
+    def __init__(self, base: str, rows: Iterable[Tuple[str, str, str, float]]):
+        self.base = base
+        series: Dict[Tuple[str, str], Tuple[List[str], List[float]]] = {}
+        for src_base, currency, date, rate in rows:
+            dates, rates = series.setdefault((src_base, currency), ([], []))
+            dates.append(date)
+            rates.append(rate)
+        self._series = series
+        self._bases = sorted({b for b, _ in series})
+
+    def _on(self, src_base: str, currency: str, date: str) -> Optional[float]:
+        if currency == src_base:
+            return 1.0
+        found = self._series.get((src_base, currency))
+        if not found:
+            return None
+        dates, rates = found
+        i = bisect.bisect_right(dates, date) - 1
+        return rates[i] if i >= 0 else None
+
+    def rate_on(self, currency: str, date: str) -> Optional[float]:
+        """
+        1 base = rate currency on date (YYYY-MM-DD), or None when the
+        history has nothing on or before that date.
+        """
+        if currency == self.base:
+            return 1.0
+        date = date[:10]
+        direct = self._on(self.base, currency, date)
+        if direct is not None:
+            return direct
+        for src_base in self._bases:
+            to_base = self._on(src_base, self.base, date)
+            to_ccy = self._on(src_base, currency, date)
+            if to_base and to_ccy is not None:
+                return to_ccy / to_base
+        return None
+
+    def __bool__(self):
+        return bool(self._series)
+
+
+def load_rate_series(base: str) -> RateSeries:
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT base, currency, date, rate FROM rate_history
+        ORDER BY base, currency, date
+        """).fetchall()
+    conn.close()
+    return RateSeries(base, ((r[0], r[1], r[2], r[3]) for r in rows))
@@ -1,8 +1,10 @@
 import datetime
 import sqlite3
+import threading
+import time
 from typing import Optional, Dict, Any, List
 
-from .connection import get_db_connection
+from .connection import get_db_connection, queue_change, unit_of_work
 from .transactions import add_transaction
 from app.db.accounts import increment_account_balance
 from app.db.categories import get_categories
@@ -12,6 +14,18 @@ FREQUENCIES = {"daily", "weekly", "monthly", "yearly", "custom_interval", "once"
 
 ADJUST_BALANCES = True
 
+_stats_lock = threading.Lock()
+_STATS = {"runs": 0, "generated": 0, "last_run_at": None, "last_run_ms": None}
+
+
+def get_recurring_stats() -> dict:
+    """
+    Returns a copy of the generation counters (runs, transactions generated,
+    when the last run finished as a Unix time, and how long it took).
+    """
+    with _stats_lock:
+        return dict(_STATS)
+
 
 def _category_map() -> Dict[int, str]:
     try:
@@ -71,7 +85,7 @@ def create_recurring(
         (account_id, category_id, amount, amount_converted, currency, frequency, interval,
          day_of_month, weekday, start_date, end_date, next_occurrence,
          last_generated_at, notes, active, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             account_id,
@@ -94,6 +108,7 @@ def create_recurring(
         ),
     )
     rid = cur.lastrowid
+    queue_change(conn, "recurring", "insert", (rid,))
     conn.commit()
     conn.close()
     return rid
@@ -144,6 +159,21 @@ def get_upcoming_recurring(
     return [dict(r) for r in rows]
 
 
+def count_due_recurring(today: Optional[datetime.date] = None) -> int:
+    """
+    Number of active patterns with an occurrence due on or before today,
+    i.e. what the next generate_due_transactions() run would catch up on.
+    """
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT COUNT(*) FROM recurring_transactions "
+        "WHERE active = 1 AND next_occurrence <= ?",
+        (_fmt(today or _today()),),
+    ).fetchone()
+    conn.close()
+    return row[0]
+
+
 def get_recurring(recurring_id: int) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     row = conn.execute(
@@ -185,6 +215,7 @@ def update_recurring(recurring_id: int, **fields):
         f"UPDATE recurring_transactions SET {', '.join(setters)}, updated_at=? WHERE id=?",
         values,
     )
+    queue_change(conn, "recurring", "update", (recurring_id,))
     conn.commit()
     conn.close()
 
@@ -257,14 +288,30 @@ def generate_due_transactions(today: Optional[datetime.date] = None) -> int:
     """
     Generates all occurrences whose next_occurrence <= today.
     Inserts signed amounts and optionally updates balances.
+
+    Each pattern commits on its own, so a long catch-up (it runs on a
+    worker thread at launch) never holds the write lock for all of them
+    and UI writes can get in between.
     """
     if today is None:
         today = _today()
 
-    recs = list_recurring(active_only=True)
-    if not recs:
-        return 0
+    started = time.perf_counter()
+    generated = 0
+    try:
+        for rec in list_recurring(active_only=True):
+            with unit_of_work():
+                generated += _generate_for([rec], today)
+    finally:
+        with _stats_lock:
+            _STATS["runs"] += 1
+            _STATS["generated"] += generated
+            _STATS["last_run_at"] = time.time()
+            _STATS["last_run_ms"] = (time.perf_counter() - started) * 1000
+    return generated
+
 
+def _generate_for(recs: List[Dict[str, Any]], today: datetime.date) -> int:
     generated = 0
 
     for rec in recs:
@@ -282,7 +329,7 @@ def generate_due_transactions(today: Optional[datetime.date] = None) -> int:
 
         while rec.get("active") and next_occ <= today:
             try:
-                add_transaction(
+                tx_id = add_transaction(
                     date=_fmt(next_occ),
                     amount=rec["amount"],
                     category_id=rec["category_id"],
@@ -296,7 +343,12 @@ def generate_due_transactions(today: Optional[datetime.date] = None) -> int:
 
                 if ADJUST_BALANCES:
                     increment_account_balance(
-                        rec["account_id"], rec["currency"], rec["amount"]
+                        rec["account_id"],
+                        rec["currency"],
+                        rec["amount"],
+                        kind="recurring",
+                        effective_date=_fmt(next_occ),
+                        transaction_id=tx_id,
                     )
             except sqlite3.IntegrityError:
                 pass
@@ -1,6 +1,6 @@
 import sqlite3
 from typing import List
-from .connection import get_db_connection
+from .connection import get_db_connection, queue_change
 
 DEFAULT_SETTINGS = {
     "base_currency": "EUR",
@@ -36,6 +36,7 @@ def set_base_currency(currency: str):
         "INSERT OR REPLACE INTO app_settings (key, value) VALUES ('base_currency', ?)",
         (currency,),
     )
+    queue_change(conn, "settings", "update", ("base_currency",))
     conn.commit()
     conn.close()
 
@@ -63,6 +64,7 @@ def set_exchange_rates(rates: dict[str, float]):
         "INSERT OR REPLACE INTO exchange_rates (currency, rate) VALUES (?, ?)",
         rate_list,
     )
+    queue_change(conn, "rates", "update", tuple(rates))
     conn.commit()
     conn.close()
 
@@ -91,6 +93,7 @@ def add_currency(code: str, name: str, symbol: str | None):
             "INSERT OR IGNORE INTO exchange_rates (currency, rate) VALUES (?, ?)",
             (code.upper(), default_rate),
         )
+        queue_change(conn, "currencies", "insert", (code.upper(),))
         conn.commit()
     except sqlite3.IntegrityError:
         conn.rollback()
@@ -118,6 +121,7 @@ def delete_currency(code: str):
 
     conn.execute("DELETE FROM currencies WHERE code = ?", (code.upper(),))
     conn.execute("DELETE FROM exchange_rates WHERE currency = ?", (code.upper(),))
+    queue_change(conn, "currencies", "delete", (code.upper(),))
     conn.commit()
     conn.close()
 
@@ -128,5 +132,6 @@ def update_currency_symbol(code: str, symbol: str | None):
     conn.execute(
         "UPDATE currencies SET symbol = ? WHERE code = ?", (symbol, code.upper())
     )
+    queue_change(conn, "currencies", "update", (code.upper(),))
     conn.commit()
     conn.close()
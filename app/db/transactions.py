@@ -1,6 +1,24 @@
-from .connection import get_db_connection
-from app.models import Transaction
-from app.services.converter import convert_to_base
+from .connection import get_db_connection, queue_change
+from .ledger import record_balance_event, record_balance_events
+from app.models import TRANSACTION_COLUMNS_SQL, Transaction
+from app.services.converter import (
+    convert_to_base,
+    get_base_currency,
+    get_conversion_rates,
+)
+
+BULK_BATCH_SIZE = 5000
+
+_BULK_FIELDS = (
+    "date",
+    "amount",
+    "category_id",
+    "account_id",
+    "notes",
+    "currency",
+    "recurring_id",
+    "occurrence_date",
+)
 
 
 def add_transaction(
@@ -19,12 +37,13 @@ def add_transaction(
     - Expense categories: negative amount
 
     Also stores the amount converted to the base currency.
+    Returns the new transaction id.
     """
 
     amount_converted = convert_to_base(amount, currency)
 
     conn = get_db_connection()
-    conn.execute(
+    cur = conn.execute(
         """
         INSERT INTO transactions
           (date, amount, amount_converted, category_id, account_id, notes, currency, recurring_id, occurrence_date)
@@ -42,43 +61,199 @@ def add_transaction(
             occurrence_date,
         ),
     )
+    tx_id = cur.lastrowid
+    queue_change(conn, "transactions", "insert", (tx_id,))
     conn.commit()
     conn.close()
+    return tx_id
+
+
+def _bulk_rows(records, rates):
+    """
+    Full insert rows (_INSERT_SQL order) for add_transactions_bulk()
+    records. Converts like convert_to_base() but inline, with the base
+    currency looked up once: per-row calls were a good part of a bulk
+    insert's Python time.
+    """
+    base = get_base_currency()
+    padding = (None,) * len(_BULK_FIELDS)
+    for record in records:
+        if isinstance(record, dict):
+            values = [record.get(f) for f in _BULK_FIELDS]
+        else:
+            values = tuple(record) + padding[len(record) :]
+        date, amount, category_id, account_id, notes, currency, rec_id, occ = values
+        if amount == 0:
+            converted = 0.0
+        elif currency == base:
+            converted = amount
+        else:
+            rate = rates.get(currency)
+            # No usable rate: convert_to_base() warns and returns 0.
+            converted = (
+                amount / rate if rate else convert_to_base(amount, currency, rates)
+            )
+        yield (
+            date,
+            amount,
+            converted,
+            category_id,
+            account_id,
+            notes,
+            currency,
+            rec_id,
+            occ,
+        )
+
+
+_INSERT_SQL = """
+    INSERT INTO transactions
+      (date, amount, amount_converted, category_id, account_id, notes, currency, recurring_id, occurrence_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _insert_rows(conn, rows, batch_size=BULK_BATCH_SIZE) -> list:
+    """
+    executemany()s full transaction rows (_INSERT_SQL order) in batches and
+    returns their ids in order.
+    """
+    ids = []
+    batch = []
+
+    def flush():
+        conn.executemany(_INSERT_SQL, batch)
+        # Inside one write transaction AUTOINCREMENT ids are consecutive.
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        ids.extend(range(last_id - len(batch) + 1, last_id + 1))
+        batch.clear()
+
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return ids
+
+
+def _apply_balance_deltas(conn, deltas: dict, daily: dict):
+    """
+    Moves account_balances by {(account, currency): delta} and records
+    one ledger event per {(account, currency, day): delta}.
+    """
+    if not deltas:
+        return
+    conn.executemany(
+        """
+        UPDATE account_balances
+        SET balance = balance + ?
+        WHERE account_id = ? AND currency = ?
+        """,
+        [(delta, acc, ccy) for (acc, ccy), delta in deltas.items()],
+    )
+    record_balance_events(
+        conn,
+        [
+            (acc, ccy, delta, "transaction", None, day)
+            for (acc, ccy, day), delta in daily.items()
+        ],
+    )
+
+
+def add_transactions_bulk(
+    records, conn=None, adjust_balances=False, batch_size=BULK_BATCH_SIZE
+):
+    """
+    Stores many transactions at once and returns their ids in input order.
+
+    Records are dicts with the add_transaction() argument names, or tuples
+    in the same order. Amounts must already be signed. All rows are converted
+    with one snapshot of the exchange rates and inserted with executemany in
+    batches of batch_size.
+
+    If conn is given the rows are written inside the caller's transaction and
+    nothing is committed here; otherwise a connection is opened and committed.
+    With adjust_balances, account_balances are moved once per
+    (account, currency) by the net of the inserted amounts.
+    """
+    rates = get_conversion_rates()
+    own_conn = conn is None
+    if own_conn:
+        conn = get_db_connection()
+
+    daily = {}
+
+    def rows():
+        for row in _bulk_rows(records, rates):
+            key = (row[4], row[6], str(row[0])[:10])
+            daily[key] = daily.get(key, 0.0) + row[1]
+            yield row
+
+    try:
+        ids = _insert_rows(
+            conn, rows() if adjust_balances else _bulk_rows(records, rates), batch_size
+        )
+        queue_change(conn, "transactions", "insert", ids)
+        if adjust_balances:
+            # The per-account deltas are the sums of the per-day ones.
+            deltas = {}
+            for (acc, ccy, _), delta in daily.items():
+                deltas[(acc, ccy)] = deltas.get((acc, ccy), 0.0) + delta
+            _apply_balance_deltas(conn, deltas, daily)
+
+        if own_conn:
+            conn.commit()
+    finally:
+        if own_conn:
+            conn.close()
+    return ids
 
 
 def get_recent_transactions(limit=10):
     conn = get_db_connection()
-    rows = conn.execute(
-        """
-        SELECT t.*,
-               c.name AS category_name,
-               c.icon AS category_icon
+    cur = conn.execute(
+        f"""
+        SELECT {TRANSACTION_COLUMNS_SQL}
         FROM transactions t
         LEFT JOIN categories c ON t.category_id = c.id
         ORDER BY t.date DESC, t.id DESC
         LIMIT ?
         """,
         (limit,),
-    ).fetchall()
+    )
+    cur.row_factory = Transaction.row_factory
+    txs = cur.fetchall()
     conn.close()
-    return [Transaction.from_row(r) for r in rows]
+    return txs
 
 
 def delete_transaction(transaction_id: int):
     conn = get_db_connection()
     tx = conn.execute(
-        "SELECT amount, account_id, currency FROM transactions WHERE id = ?",
+        "SELECT date, amount, account_id, currency FROM transactions WHERE id = ?",
         (transaction_id,),
     ).fetchone()
     if tx:
         amount = tx["amount"]
         account_id = tx["account_id"]
         currency = tx["currency"]
-        conn.execute(
+        cur = conn.execute(
             "UPDATE account_balances SET balance = balance - ? WHERE account_id = ? AND currency = ?",
             (amount, account_id, currency),
         )
+        if cur.rowcount:
+            record_balance_event(
+                conn,
+                account_id,
+                currency,
+                -amount,
+                "reversal",
+                tx["date"],
+                transaction_id,
+            )
     conn.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+    queue_change(conn, "transactions", "delete", (transaction_id,))
     conn.commit()
     conn.close()
 
@@ -100,18 +275,38 @@ def get_category_spend(category_id, start_date, end_date):
     return row["total"] if row and row["total"] else 0.0
 
 
-def get_transactions_for_analytics():
+ANALYTICS_COLUMNS = (
+    "id",
+    "date",
+    "amount",
+    "amount_converted",
+    "category_id",
+    "account_id",
+    "currency",
+    "recurring_id",
+    "occurrence_date",
+)
+
+
+def _analytics_dict(cursor, row):
+    return dict(zip(ANALYTICS_COLUMNS, row))
+
+
+def get_transactions_for_analytics(as_tuples: bool = False):
     """
-    Returns dict rows including pre-converted amounts.
+    Returns dict rows including pre-converted amounts. With as_tuples=True
+    the rows are the plain tuples sqlite3 produces, in ANALYTICS_COLUMNS
+    order, for callers that only aggregate.
     """
     conn = get_db_connection()
-    rows = conn.execute(
-        """
-        SELECT id, date, amount, amount_converted, category_id, account_id, currency,
-               recurring_id, occurrence_date
+    cur = conn.execute(
+        f"""
+        SELECT {", ".join(ANALYTICS_COLUMNS)}
         FROM transactions
         ORDER BY date ASC, id ASC
         """
-    ).fetchall()
+    )
+    cur.row_factory = None if as_tuples else _analytics_dict
+    rows = cur.fetchall()
     conn.close()
-    return [dict(r) for r in rows]
+    return rows
@@ -0,0 +1,131 @@
+"""
+In-process change events.
+
+DAO writes queue a Change on their connection; the connection publishes
+them once the transaction commits (and drops them on rollback), so
+subscribers never see writes that did not happen. Callbacks run on the
+committing thread and must be quick: invalidate, mark dirty, schedule.
+
+Topics:
+    accounts, balances, transactions, budgets, categories, recurring,
+    rates, rate_history, currencies, settings
+"""
+
+import threading
+import types
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+TOPICS = (
+    "accounts",
+    "balances",
+    "transactions",
+    "budgets",
+    "categories",
+    "recurring",
+    "rates",
+    "rate_history",
+    "currencies",
+    "settings",
+)
+
+
+@dataclass(frozen=True)
+class Change:
+    topic: str
+    op: str  # "insert", "update" or "delete"
+    keys: Tuple = ()
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, list] = {}
+        self._generations: Dict[str, int] = {t: 0 for t in TOPICS}
+
+    def subscribe(
+        self, topics: Union[str, Iterable[str]], callback: Callable[[Change], None]
+    ) -> Callable[[], None]:
+        """
+        Calls callback(change) for every committed change on the given
+        topic(s); "*" means all topics. Bound methods are held weakly, so a
+        subscriber object can be garbage-collected without unsubscribing.
+        Returns a function that removes the subscription.
+        """
+        if isinstance(topics, str):
+            topics = (topics,)
+        ref = (
+            weakref.WeakMethod(callback)
+            if isinstance(callback, types.MethodType)
+            else (lambda cb=callback: cb)
+        )
+        with self._lock:
+            for topic in topics:
+                self._subscribers.setdefault(topic, []).append(ref)
+
+        def unsubscribe():
+            with self._lock:
+                for topic in topics:
+                    refs = self._subscribers.get(topic, [])
+                    if ref in refs:
+                        refs.remove(ref)
+
+        return unsubscribe
+
+    def publish(self, changes: Iterable[Change]):
+        changes = list(changes)
+        with self._lock:
+            for change in changes:
+                self._generations[change.topic] = (
+                    self._generations.get(change.topic, 0) + 1
+                )
+            targets = []
+            for change in changes:
+                for ref in self._subscribers.get(
+                    change.topic, []
+                ) + self._subscribers.get("*", []):
+                    targets.append((ref, change))
+
+        dead = []
+        for ref, change in targets:
+            callback = ref()
+            if callback is None:
+                dead.append(ref)
+                continue
+            try:
+                callback(change)
+            except Exception as ex:
+                print(f"[Events] Subscriber for '{change.topic}' failed: {ex}")
+
+        if dead:
+            with self._lock:
+                for refs in self._subscribers.values():
+                    refs[:] = [r for r in refs if r not in dead]
+
+    def generation(self, *topics: str) -> Tuple[int, ...]:
+        """
+        Per-topic publish counters, usable as part of a cache key so that a
+        cache only invalidates on the topics it depends on.
+        """
+        with self._lock:
+            return tuple(self._generations.get(t, 0) for t in topics)
+
+
+def coalesce(changes: List[Change]) -> List[Change]:
+    """
+    Merges changes with the same topic and op, keeping key order.
+    """
+    merged: Dict[Tuple[str, str], dict] = {}
+    for change in changes:
+        merged.setdefault((change.topic, change.op), {}).update(
+            dict.fromkeys(change.keys)
+        )
+    return [Change(topic, op, tuple(keys)) for (topic, op), keys in merged.items()]
+
+
+bus = EventBus()
+
+subscribe = bus.subscribe
+publish = bus.publish
+topic_generation = bus.generation
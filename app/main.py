@@ -1,33 +1,44 @@
+import importlib
 import os
 import sys
+import time
 import flet as ft
-from app.startup import initialize
-from app.ui.dashboard import dashboard_page
+from app.startup import initialize, start_recurring_catch_up
+from app.db.connection import get_data_generation
+from app.ui.refresh import get_refresh_scheduler
+from app.utils.instrumentation import instrument, instrument_page
 
-from app.ui.transactions import (
-    transactions_page,
-    _handle_file_picker_result,
-    export_to_csv,
-    import_from_csv,
-)
-from app.ui.accounts import accounts_page
-from app.ui.budgets import budgets_page
-from app.ui.settings import settings_page
 
+def _lazy_page(module: str, name: str):
+    """
+    Page factory that imports its UI module the first time it is used, so
+    startup only pays for the tabs that are actually opened.
+    """
 
-def main(page: ft.Page):
-    db_name = "finet.db"
+    def build(page, *args):
+        return getattr(importlib.import_module(module), name)(page, *args)
 
-    base_dir = getattr(page, "app_directory", None) or os.getcwd()
+    return build
+
+
+def resolve_db_path(base_dir: str) -> str:
+    db_name = "finet.db"
 
     app_dir_relative_to_base = "app"
 
     assets_dir = os.path.join(base_dir, app_dir_relative_to_base, "assets")
     os.makedirs(assets_dir, exist_ok=True)
 
-    db_path = os.path.join(assets_dir, db_name)
+    return os.path.join(assets_dir, db_name)
 
-    initialize(db_path)
+
+def main(page: ft.Page):
+    started = time.perf_counter()
+    base_dir = getattr(page, "app_directory", None) or os.getcwd()
+    db_path = resolve_db_path(base_dir)
+
+    initialize(db_path, run_recurring=False)
+    instrument_page(page)
     page.title = "Finet - Personal Finance Tracker"
     page.bgcolor = ft.Colors.GREY_50
 
@@ -40,28 +51,71 @@ def main(page: ft.Page):
         sb.open = True
         page.update()
 
-    file_picker.on_result = lambda e: _handle_file_picker_result(
-        e, page, notify_main, export_to_csv, import_from_csv
-    )
+    def on_file_picker_result(e):
+        from app.ui.transactions import (
+            _handle_file_picker_result,
+            export_to_csv,
+            import_from_csv,
+        )
 
+        _handle_file_picker_result(e, page, notify_main, export_to_csv, import_from_csv)
+
+    file_picker.on_result = on_file_picker_result
+
+    transactions_page = _lazy_page("app.ui.transactions", "transactions_page")
     tab_content_generators = [
-        dashboard_page,
+        _lazy_page("app.ui.dashboard", "dashboard_page"),
         lambda p: transactions_page(p, file_picker),
-        accounts_page,
-        budgets_page,
-        settings_page,
+        _lazy_page("app.ui.accounts", "accounts_page"),
+        _lazy_page("app.ui.budgets", "budgets_page"),
+        _lazy_page("app.ui.settings", "settings_page"),
     ]
 
+    # Refresh-scheduler region shown by each tab (settings has none).
+    tab_regions = ["dashboard", "transactions", "accounts", "budgets", "settings"]
+    # Data generation each tab was last rendered against.
+    tab_generations = [None] * len(tab_content_generators)
+
+    def show_tab(idx: int):
+        """
+        Builds a tab on first use. Afterwards it is only refreshed when the
+        data generation moved since it was last rendered: through the
+        refresh callable the page stores in root.data if it has one,
+        otherwise by rebuilding it.
+        """
+        start = time.perf_counter()
+        get_refresh_scheduler(page).set_active(tab_regions[idx])
+        generation = get_data_generation()
+        tab = tabs.tabs[idx]
+        if tab.content is None:
+            tab.content = tab_content_generators[idx](page)
+            action = "built"
+        elif tab_generations[idx] != generation:
+            refresh = getattr(tab.content, "data", None)
+            if callable(refresh):
+                refresh()
+                action = "refreshed"
+            else:
+                tab.content = tab_content_generators[idx](page)
+                action = "rebuilt"
+        else:
+            action = "cached"
+        # Refreshing can itself write (e.g. recurring catch-up), so record the
+        # generation as of now rather than as of the check.
+        tab_generations[idx] = get_data_generation()
+        return action, (time.perf_counter() - start) * 1000
+
+    @instrument("tabs.on_tab_change")
     def on_tab_change(e):
         idx = tabs.selected_index
-        
-        tabs_to_refresh = [1, 2] 
-
-        if tabs.tabs[idx].content is None or idx in tabs_to_refresh:
-            print(f"[Tabs] Regenerating content for tab index {idx}")
-            tabs.tabs[idx].content = tab_content_generators[idx](page)
-        
+        action, ms = show_tab(idx)
+        update_start = time.perf_counter()
         page.update()
+        update_ms = (time.perf_counter() - update_start) * 1000
+        print(
+            f"[Tabs] {tabs.tabs[idx].text}: {action} in {ms:.1f} ms, "
+            f"page.update {update_ms:.1f} ms"
+        )
 
     tabs = ft.Tabs(
         selected_index=0,
@@ -80,8 +134,6 @@ def main(page: ft.Page):
         on_change=on_tab_change,
     )
 
-    tabs.tabs[0].content = tab_content_generators[0](page)
-
     header = ft.Container(
         ft.Text(
             "Finet",
@@ -107,12 +159,36 @@ def main(page: ft.Page):
         )
     )
     page.update()
+    print(
+        f"[Startup] Shell rendered in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+    action, ms = show_tab(0)
+    page.update()
+    print(f"[Tabs] {tabs.tabs[0].text}: {action} in {ms:.1f} ms")
+
+    def on_recurring_done(created: int):
+        if not created:
+            return
+        get_refresh_scheduler(page).notify(
+            f"Generated {created} recurring transaction{'s' if created != 1 else ''}",
+            ft.Colors.BLUE_400,
+        )
+
+    start_recurring_catch_up(on_recurring_done)
 
 
 if __name__ == "__main__":
     view = ft.FLET_APP
 
     args = sys.argv[1:]
+    if "--api" in args:
+        from app.services.server import run_api_server
+
+        initialize(resolve_db_path(os.getcwd()))
+        run_api_server()
+        sys.exit(0)
+
     if "--web" in args or os.getenv("FLET_VIEW") == "web":
         view = ft.WEB_BROWSER
     elif "--headless" in args:
@@ -1,7 +1,20 @@
-from dataclasses import dataclass
+"""
+Row models.
 
+The models are slotted dataclasses whose field order matches a fixed
+column list, so a cursor can build them straight from the row tuple:
 
-@dataclass
+    cur = conn.execute(f"SELECT {TRANSACTION_COLUMNS_SQL} ...")
+    cur.row_factory = Transaction.row_factory
+
+from_row() is kept for sqlite3.Row / dict input where the columns are not
+known up front.
+"""
+
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
 class Transaction:
     id: int
     date: str
@@ -15,47 +28,46 @@ class Transaction:
     recurring_id: int | None = None
     occurrence_date: str | None = None
 
+    @staticmethod
+    def row_factory(cursor, row):
+        return Transaction(*row)
+
     @classmethod
     def from_row(cls, row):
-        def _get(r, key):
-            try:
-                return r[key]
-            except Exception:
-                return None
-
-        return cls(
-            id=_get(row, "id"),
-            date=_get(row, "date"),
-            amount=_get(row, "amount"),
-            category_id=_get(row, "category_id"),
-            account_id=_get(row, "account_id"),
-            notes=_get(row, "notes"),
-            currency=_get(row, "currency"),
-            category_name=_get(row, "category_name"),
-            category_icon=_get(row, "category_icon"),
-            recurring_id=_get(row, "recurring_id"),
-            occurrence_date=_get(row, "occurrence_date"),
-        )
+        try:
+            return cls(*[row[k] for k in TRANSACTION_FIELDS])
+        except (IndexError, KeyError):
+            keys = set(row.keys())
+            return cls(*[row[k] if k in keys else None for k in TRANSACTION_FIELDS])
+
 
+TRANSACTION_FIELDS = Transaction.__match_args__
+# Select list for Transaction.row_factory, for "transactions t LEFT JOIN
+# categories c".
+TRANSACTION_COLUMNS_SQL = (
+    "t.id, t.date, t.amount, t.category_id, t.account_id, t.notes, t.currency, "
+    "c.name, c.icon, t.recurring_id, t.occurrence_date"
+)
 
+
+@dataclass(slots=True)
 class Account:
-    def __init__(self, id, name, type, notes, balances=None):
-        self.id = id
-        self.name = name
-        self.type = type
-        self.notes = notes
-        self.balances = balances or []
+    id: int
+    name: str
+    type: str
+    notes: str | None
+    balances: list = field(default_factory=list)
 
     @classmethod
     def from_row(cls, row, balances=None):
         return cls(row["id"], row["name"], row["type"], row["notes"], balances or [])
 
 
+@dataclass(slots=True)
 class Budget:
-    def __init__(self, id, category_id, period, amount, start_date, end_date):
-        self.id = id
-        self.category_id = category_id
-        self.period = period
-        self.amount = amount
-        self.start_date = start_date
-        self.end_date = end_date
+    id: int
+    category_id: int
+    period: str
+    amount: float
+    start_date: str
+    end_date: str
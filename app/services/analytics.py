@@ -0,0 +1,233 @@
+"""
+Dashboard datasets.
+
+Everything here is plain data (no Flet controls). The datasets are memoised
+per (timeframe, base currency, topic generations, day), so switching between
+timeframes only hits the database once per timeframe. Each dataset keys on
+the event-bus topics it reads, so e.g. editing a budget does not rebuild
+the balance series.
+
+With NumPy installed the timeframe datasets are computed from the columnar
+snapshot (app.services.snapshot); otherwise from the analytics rows.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from app.db.categories import get_categories
+from app.db.ledger import get_balance_history, get_first_event_date
+from app.db.transactions import get_transactions_for_analytics
+from app.events import topic_generation
+from app.services.converter import convert_to_base, get_base_currency
+from app.services.downsample import downsample
+from app.services import snapshot as columnar
+
+
+def _today():
+    """
+    The day "today" means for timeframes, the sparkline and the balance
+    series. The benchmark suite replaces it to pin a fixed date.
+    """
+    return datetime.today().date()
+
+
+def month_key(date_str: str) -> str:
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m")
+    except Exception:
+        return "0000-00"
+
+
+def timeframe_start_date(code: str):
+    """
+    First day covered by a timeframe code, or None for ALL / unknown codes.
+    """
+    today = _today()
+    if code == "30D":
+        return today - timedelta(days=30)
+    if code == "90D":
+        return today - timedelta(days=90)
+    if code == "YTD":
+        return datetime(today.year, 1, 1).date()
+    return None
+
+
+def filter_transactions_by_timeframe(transactions: list[dict], code: str) -> list[dict]:
+    if not transactions:
+        return []
+    start = timeframe_start_date(code)
+    if start is None:
+        return transactions
+    res = []
+    for t in transactions:
+        try:
+            d = datetime.strptime(t["date"], "%Y-%m-%d").date()
+            if d >= start:
+                res.append(t)
+        except Exception:
+            pass
+    return res
+
+
+# Event-bus topics each dataset is built from.
+DATASET_TOPICS = ("transactions", "categories", "rates", "currencies", "settings")
+BALANCE_TOPICS = ("balances", "accounts", "rates", "currencies", "settings")
+
+
+def _cache_key(code: str, topics: tuple) -> tuple:
+    return (
+        code,
+        get_base_currency(),
+        topic_generation(*topics),
+        _today().isoformat(),
+    )
+
+
+# Days shown by the dashboard's daily spend sparkline.
+SPARKLINE_DAYS = 14
+
+
+def _month_label(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _snapshot_dataset(cols, code: str, cat_map: dict) -> dict:
+    mask = columnar.since_mask(cols, timeframe_start_date(code))
+    amount, day, month = cols.amount[mask], cols.day[mask], cols.month[mask]
+
+    cat_amounts = defaultdict(float)
+    for cat_id, total in columnar.sum_by(cols.category[mask], amount).items():
+        cat_amounts[cat_map.get(cat_id, "Other")] += total
+    income = amount > 0
+    month_income = columnar.sum_by(month[income], amount[income])
+    month_expense = columnar.sum_by(month[~income], -amount[~income])
+
+    return {
+        "cat_map": cat_map,
+        "cat_amounts": dict(cat_amounts),
+        "income_series": [
+            (_month_label(m), v) for m, v in sorted(month_income.items())
+        ],
+        "expense_series": [
+            (_month_label(m), v) for m, v in sorted(month_expense.items())
+        ],
+        "kpis": columnar.kpis(amount, day),
+        "daily_spend": (
+            columnar.daily_spend(amount, day, _today(), SPARKLINE_DAYS)
+            if len(amount)
+            else None
+        ),
+    }
+
+
+def _row_kpis(txs: list[dict]) -> dict:
+    income = sum(t["amount_converted"] for t in txs if t["amount_converted"] > 0)
+    expense = sum(abs(t["amount_converted"]) for t in txs if t["amount_converted"] < 0)
+    days = len({t["date"] for t in txs})
+    return {
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "avg_daily_spend": expense / max(1, days) if txs else 0.0,
+        "count": len(txs),
+    }
+
+
+def _row_daily_spend(txs: list[dict], days: int) -> list:
+    today = _today()
+    start = today - timedelta(days=days - 1)
+    daily_exp = defaultdict(float)
+    for t in txs:
+        try:
+            d = datetime.strptime(t["date"], "%Y-%m-%d").date()
+        except Exception:
+            continue
+        if start <= d <= today:
+            amt_conv = float(t["amount_converted"])
+            if amt_conv < 0:
+                daily_exp[d] += abs(amt_conv)
+    return [
+        (start + timedelta(days=i), daily_exp.get(start + timedelta(days=i), 0.0))
+        for i in range(days)
+    ]
+
+
+@lru_cache(maxsize=16)
+def _timeframe_dataset(code: str, base_currency, generation, day) -> dict:
+    cat_map = {c["id"]: c["name"] for c in get_categories()}
+    snapshot = columnar.get_snapshot()
+    if snapshot is not None:
+        return _snapshot_dataset(snapshot.columns(), code, cat_map)
+
+    txs_all = get_transactions_for_analytics()
+    filtered = filter_transactions_by_timeframe(txs_all, code)
+
+    cat_amounts = defaultdict(float)
+    month_income = defaultdict(float)
+    month_expense = defaultdict(float)
+    for t in filtered:
+        amt_conv = float(t["amount_converted"])
+        cat_amounts[cat_map.get(t["category_id"], "Other")] += amt_conv
+        mk = month_key(t["date"])
+        if amt_conv > 0:
+            month_income[mk] += amt_conv
+        else:
+            month_expense[mk] += abs(amt_conv)
+
+    return {
+        "cat_map": cat_map,
+        "cat_amounts": dict(cat_amounts),
+        "income_series": sorted(month_income.items()),
+        "expense_series": sorted(month_expense.items()),
+        "kpis": _row_kpis(filtered),
+        "daily_spend": (
+            _row_daily_spend(filtered, SPARKLINE_DAYS) if filtered else None
+        ),
+    }
+
+
+def get_timeframe_dataset(code: str) -> dict:
+    """
+    Category totals, monthly income/expense series, KPIs (income, expense,
+    net, avg_daily_spend, count) and the daily spend of the last
+    SPARKLINE_DAYS days (None without transactions) for a timeframe. The
+    returned dict is shared between callers; treat it as read-only.
+    """
+    return _timeframe_dataset(*_cache_key(code, DATASET_TOPICS))
+
+
+@lru_cache(maxsize=16)
+def _balance_series(code: str, base_currency, generation, day) -> tuple:
+    today = _today()
+    start = timeframe_start_date(code)
+    if start is None:
+        first = get_first_event_date()
+        if not first:
+            return ()
+        start = min(datetime.strptime(first, "%Y-%m-%d").date(), today)
+
+    totals = defaultdict(float)
+    for row in get_balance_history(start.isoformat(), today.isoformat()):
+        totals[row["date"]] += convert_to_base(float(row["balance"]), row["currency"])
+    return tuple(sorted(totals.items()))
+
+
+def balance_series_for_timeframe(
+    code: str, max_points: int | None = None
+) -> list[tuple[str, float]]:
+    """
+    Daily total balance in the base currency over the timeframe, built from
+    the ledger history (one aggregated row per account/currency/day).
+    With max_points the series is reduced with LTTB to at most that many
+    points (typically the chart's pixel width).
+    """
+    series = _balance_series(*_cache_key(code, BALANCE_TOPICS))
+    if max_points:
+        return downsample(series, max_points)
+    return list(series)
+
+
+def clear_analytics_cache():
+    _timeframe_dataset.cache_clear()
+    _balance_series.cache_clear()
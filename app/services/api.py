@@ -1,30 +1,28 @@
-import json
-import urllib.request
+from concurrent.futures import Future
 from typing import Dict, Optional
 
-API_URL_TEMPLATE = "https://open.er-api.com/v6/latest/{base}"
+from app.services.rate_providers import fetch_rates_async, get_rate_provider
 
 
-def fetch_latest_rates(base_currency: str) -> Optional[Dict[str, float]]:
+def fetch_latest_rates(
+    base_currency: str, force: bool = False
+) -> Optional[Dict[str, float]]:
     """
     Fetches the latest exchange rates for a given base currency.
     Returns a dict of rates or None on failure.
+    Served from the provider's cache while it is fresh; force=True
+    revalidates with the server first.
     """
-    url = API_URL_TEMPLATE.format(base=base_currency)
     try:
-        with urllib.request.urlopen(url, timeout=5) as response:
-            if response.status != 200:
-                print(f"[API Error] Status: {response.status}")
-                return None
-
-            data = json.loads(response.read().decode("utf-8"))
-
-            if data.get("result") == "success":
-                return data.get("rates")
-            else:
-                print(f"[API Error] Response: {data.get('error-type')}")
-                return None
-
+        return get_rate_provider().fetch_rates(base_currency, force)
     except Exception as e:
         print(f"[API Client Error] {e}")
         return None
+
+
+def fetch_latest_rates_async(base_currency: str, force: bool = False) -> Future:
+    """
+    Same as fetch_latest_rates, but runs in the background and returns a
+    Future resolving to the rates dict or None.
+    """
+    return fetch_rates_async(base_currency, force)
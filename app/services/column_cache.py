@@ -0,0 +1,172 @@
+"""
+On-disk column file for the analytics snapshot.
+
+Layout: a 128-byte header, then one fixed-width region per column, each
+`capacity` items long and 64-byte aligned. Only the first `count` items of
+each region are valid. The header records the high-water-mark row id and
+the ledger stamp (ledger id and rewrite generation from ledger_meta) the
+data was built from; a file whose stamp does not match the database is
+ignored and rewritten.
+
+The file is memory-mapped and handed out as read-only zero-copy views.
+New rows are written past `count` and the header is updated last, so
+views handed out earlier never see their data change and a crash
+mid-append leaves the previous contents valid.
+
+This module needs NumPy; app.services.snapshot only imports it when NumPy
+is available.
+"""
+
+import os
+import struct
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"FINETCOL"
+VERSION = 1
+HEADER_SIZE = 128
+_HEADER = struct.Struct("<8sHHIqqqq32s")
+ALIGN = 64
+
+Stamp = Tuple[str, int]
+
+
+def _aligned(n: int) -> int:
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+class ColumnFile:
+    def __init__(self, path: str, dtypes: Sequence[Tuple[str, str]]):
+        self.path = path
+        self.dtypes = [np.dtype(d) for _, d in dtypes]
+        self._map: Optional[np.memmap] = None
+        self._capacity = 0
+        self._count = 0
+        self._hwm = 0
+        self._stamp: Optional[Stamp] = None
+
+    def _offsets(self, capacity: int) -> List[int]:
+        offsets, pos = [], HEADER_SIZE
+        for dt in self.dtypes:
+            offsets.append(pos)
+            pos = _aligned(pos + capacity * dt.itemsize)
+        return offsets + [pos]
+
+    def _views(self) -> List[np.ndarray]:
+        offsets = self._offsets(self._capacity)
+        views = []
+        for dt, start in zip(self.dtypes, offsets):
+            view = np.frombuffer(self._map, dtype=dt, count=self._count, offset=start)
+            view.flags.writeable = False
+            views.append(view)
+        return views
+
+    def _read_header(self):
+        with open(self.path, "rb") as f:
+            raw = f.read(HEADER_SIZE)
+        if len(raw) < _HEADER.size:
+            return None
+        magic, version, ncols, _, capacity, count, hwm, generation, ledger = (
+            _HEADER.unpack_from(raw)
+        )
+        if magic != MAGIC or version != VERSION or ncols != len(self.dtypes):
+            return None
+        return capacity, count, hwm, (ledger.decode("ascii"), generation)
+
+    def _write_header(self, target, capacity: int, count: int, hwm: int, stamp: Stamp):
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            len(self.dtypes),
+            0,
+            capacity,
+            count,
+            hwm,
+            stamp[1],
+            stamp[0].encode("ascii"),
+        )
+        target[: len(header)] = np.frombuffer(header, dtype=np.uint8)
+
+    def open(self, stamp: Stamp, max_id: int) -> Optional[Tuple[List[np.ndarray], int]]:
+        """
+        Maps the file if it was built from this ledger stamp and does not
+        reach past max_id (the database's highest transaction id). Returns
+        (column views, high-water-mark id) or None.
+        """
+        self.close()
+        try:
+            header = self._read_header()
+        except OSError:
+            return None
+        if header is None:
+            return None
+        capacity, count, hwm, file_stamp = header
+        if file_stamp != tuple(stamp) or hwm > max_id or count > capacity:
+            return None
+        if os.path.getsize(self.path) < self._offsets(capacity)[-1]:
+            return None
+        self._map = np.memmap(self.path, dtype=np.uint8, mode="r+")
+        self._capacity, self._count, self._hwm = capacity, count, hwm
+        self._stamp = tuple(stamp)
+        return self._views(), hwm
+
+    def append(
+        self, arrays: Sequence[np.ndarray], hwm: int, stamp: Stamp
+    ) -> Optional[List[np.ndarray]]:
+        """
+        Adds rows in place. Returns the new views, or None when the file is
+        not open for this stamp or is full (the caller rewrites it).
+        """
+        n = len(arrays[0])
+        if (
+            self._map is None
+            or self._stamp != tuple(stamp)
+            or self._count + n > self._capacity
+        ):
+            return None
+        offsets = self._offsets(self._capacity)
+        for dt, start, arr in zip(self.dtypes, offsets, arrays):
+            begin = start + self._count * dt.itemsize
+            self._map[begin : begin + n * dt.itemsize] = np.frombuffer(
+                np.ascontiguousarray(arr, dtype=dt).tobytes(), dtype=np.uint8
+            )
+        self._map.flush()
+        self._count += n
+        self._hwm = hwm
+        self._write_header(self._map, self._capacity, self._count, hwm, self._stamp)
+        self._map.flush()
+        return self._views()
+
+    def write(
+        self, arrays: Sequence[np.ndarray], hwm: int, stamp: Stamp
+    ) -> List[np.ndarray]:
+        """
+        Replaces the file with arrays (leaving room to grow) and maps it.
+        Returns the new views.
+        """
+        count = len(arrays[0])
+        capacity = max(1024, count + count // 4)
+        offsets = self._offsets(capacity)
+        buf = np.zeros(offsets[-1], dtype=np.uint8)
+        self._write_header(buf, capacity, count, hwm, stamp)
+        for dt, start, arr in zip(self.dtypes, offsets, arrays):
+            data = np.ascontiguousarray(arr, dtype=dt).tobytes()
+            buf[start : start + len(data)] = np.frombuffer(data, dtype=np.uint8)
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            buf.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        self.close()
+        os.replace(tmp, self.path)
+        self._map = np.memmap(self.path, dtype=np.uint8, mode="r+")
+        self._capacity, self._count, self._hwm = capacity, count, hwm
+        self._stamp = tuple(stamp)
+        return self._views()
+
+    def close(self):
+        # Views handed out keep their own reference to the mapping.
+        self._map = None
+        self._stamp = None
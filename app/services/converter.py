@@ -1,4 +1,5 @@
 from app.db import settings as db_settings
+from app.events import subscribe
 from functools import lru_cache
 from typing import Dict, List
 
@@ -78,10 +79,20 @@ def convert_to_base(
     return amount / rate
 
 
-def clear_caches():
+def clear_caches(quiet: bool = False):
     get_active_currencies_data.cache_clear()
     get_active_currency_codes.cache_clear()
     get_currency_symbol_map.cache_clear()
     get_base_currency.cache_clear()
     get_conversion_rates.cache_clear()
-    print("[Cache] Cleared converter caches.")
+    if not quiet:
+        print("[Cache] Cleared converter caches.")
+
+
+def _on_settings_change(change):
+    clear_caches(quiet=True)
+
+
+# Rates, currencies and the base currency only change through the settings
+# DAO, which publishes on commit; no caller has to clear these by hand.
+subscribe(("rates", "currencies", "settings"), _on_settings_change)
@@ -1,13 +1,7 @@
 # app/services/currency_info.py
-import json
-import urllib.request
 from typing import List, Tuple
 from functools import lru_cache
 
-API_URL_CODES = (
-    "https://open.er-api.com/v6/latest/USD"
-)
-
 PREDEFINED_CURRENCIES = [
     ("USD", "United States Dollar", "$"),
     ("EUR", "Euro", "€"),
@@ -28,17 +22,16 @@ def fetch_currency_list() -> List[Tuple[str, str]]:
     Fetches a list of available currency codes and names.
     Returns a list of tuples: [('USD', 'United States Dollar'), ('EUR', 'Euro'), ...].
     Uses a fallback predefined list if the API fails.
+    The rate provider caches the code list on disk for a day.
     """
-    try:
-        with urllib.request.urlopen(API_URL_CODES, timeout=5) as response:
-            if response.status == 200:
-                data = json.loads(response.read().decode("utf-8"))
-                if data.get("result") == "success" and "rates" in data:
-                    codes = list(data["rates"].keys())
-                    return [(code, code) for code in sorted(codes)]
-            else:
-                print(f"[Currency API Error] Status: {response.status}")
+    # Imported here: app.db.connection imports this module, and the
+    # providers bring urllib and a thread pool with them.
+    from app.services.rate_providers import get_rate_provider
 
+    try:
+        codes = get_rate_provider().fetch_currency_codes()
+        if codes:
+            return [(code, code) for code in sorted(codes)]
     except Exception as e:
         print(f"[Currency API Client Error] {e}")
 
@@ -0,0 +1,109 @@
+"""
+Downsampling for chart series.
+
+Charts never need more points than they have horizontal pixels, so long
+series (years of daily balances, decades of months) are reduced before
+they are turned into canvas shapes. Points are treated as evenly spaced
+(x = index), which matches the daily and monthly series the dashboard draws.
+
+    lttb_indices      Largest-Triangle-Three-Buckets: keeps the visual shape
+    min_max_indices   keeps the extremes of every bucket (no spike is lost)
+"""
+
+from typing import List, Sequence, Tuple
+
+
+def lttb_indices(values: Sequence[float], threshold: int) -> List[int]:
+    """
+    Indices of the points LTTB keeps, always including the first and last.
+    """
+    n = len(values)
+    if threshold >= n or n <= 2:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1]
+
+    every = (n - 2) / (threshold - 2)
+    picked = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (avg_start + avg_end - 1) / 2
+        avg_y = sum(values[avg_start:avg_end]) / (avg_end - avg_start)
+
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = a, values[a]
+        best, best_area = range_start, -1.0
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - j) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        a = best
+    picked.append(n - 1)
+    return picked
+
+
+def min_max_indices(values: Sequence[float], buckets: int) -> List[int]:
+    """
+    Indices of the minimum and maximum of each of `buckets` equal slices,
+    plus the first and last point. Returns at most 2 * buckets + 2 indices.
+    """
+    n = len(values)
+    if buckets <= 0 or 2 * buckets >= n:
+        return list(range(n))
+    size = n / buckets
+    picked = {0, n - 1}
+    for b in range(buckets):
+        start, end = int(b * size), min(int((b + 1) * size), n)
+        if start >= end:
+            continue
+        chunk = range(start, end)
+        picked.add(min(chunk, key=values.__getitem__))
+        picked.add(max(chunk, key=values.__getitem__))
+    return sorted(picked)
+
+
+def downsample_indices(
+    series: Sequence[Sequence[float]], max_points: int, method: str = "lttb"
+) -> List[int]:
+    """
+    Indices to keep for several series that share the same x axis. The
+    first and last points are shared; each series gets an equal share of the
+    remaining max_points - 2 and the picks are merged, so the result never
+    exceeds max_points.
+    """
+    if method not in ("lttb", "minmax"):
+        raise ValueError(f"Unknown downsampling method: {method}")
+    series = [s for s in series if len(s)]
+    if not series:
+        return []
+    n = len(series[0])
+    if n <= max_points:
+        return list(range(n))
+    if max_points < 2:
+        return [0][: max(max_points, 0)]
+
+    inner = (max_points - 2) // len(series)
+    picked = {0, n - 1}
+    for values in series:
+        if method == "lttb":
+            picked.update(lttb_indices(values, inner + 2))
+        elif inner >= 2:
+            picked.update(min_max_indices(values, inner // 2))
+    return sorted(picked)
+
+
+def downsample(
+    points: Sequence[Tuple[object, float]], max_points: int, method: str = "lttb"
+) -> List[Tuple[object, float]]:
+    """
+    Reduces (label, value) points to at most max_points, keeping the labels
+    of the points that survive.
+    """
+    if len(points) <= max_points:
+        return list(points)
+    idx = downsample_indices([[p[1] for p in points]], max_points, method)
+    return [points[i] for i in idx]
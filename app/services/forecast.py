@@ -0,0 +1,296 @@
+"""
+Cash-flow forecast from recurring schedules.
+
+Expands every active recurring transaction over a horizon, on top of the
+current account_balances, into a projected end-of-day balance per
+(account, currency) for each day, plus the first day each balance drops
+below its threshold.
+
+Occurrences follow generate_due_transactions() exactly (see
+_compute_next): "daily" steps one day, "weekly" interval weeks,
+"custom_interval" interval days, "monthly" interval months on
+day_of_month (or the previous occurrence's day, clamped to the month),
+"yearly" 12 * interval months on the previous occurrence's day, and
+"once" happens once.
+Occurrences that are due but not generated yet land on day 0, as the next
+generation run would book them. Patterns on an (account, currency) with
+no balance row are ignored, since generating them moves no balance.
+
+With NumPy the expansion is vectorised: occurrence counts per pattern
+become one ragged arange, month-stepped dates are built with datetime64
+arithmetic, and the daily deltas are a single bincount followed by a
+cumulative sum. Without it the same occurrences are walked with
+_compute_next.
+"""
+
+import datetime
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from app.db.connection import get_db_connection
+from app.db.recurring import _compute_next
+from app.events import topic_generation
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install finet[analytics]
+    np = None
+
+DEFAULT_HORIZON_DAYS = 365
+MAX_HORIZON_DAYS = 3660
+FORECAST_TOPICS = ("recurring", "balances", "accounts")
+
+_BALANCES_SQL = """
+    SELECT ab.account_id, a.name, ab.currency, ab.balance, ab.balance_threshold
+    FROM account_balances ab
+    JOIN accounts a ON a.id = ab.account_id
+    ORDER BY a.name, ab.currency
+"""
+
+_PATTERNS_SQL = """
+    SELECT r.account_id, r.currency, r.amount, r.frequency, r.interval,
+           r.day_of_month, COALESCE(r.next_occurrence, r.start_date), r.end_date
+    FROM recurring_transactions r
+    JOIN account_balances ab
+      ON ab.account_id = r.account_id AND ab.currency = r.currency
+    WHERE r.active = 1 AND COALESCE(r.next_occurrence, r.start_date) IS NOT NULL
+"""
+
+# Fixed step in days for the day-stepped frequencies; 0 means one occurrence.
+_DAY_STEPS = {"daily": 1, "weekly": 7, "custom_interval": 1}
+_MONTH_STEPS = {"monthly": 1, "yearly": 12}
+
+
+def _load() -> Tuple[list, list]:
+    conn = get_db_connection()
+    try:
+        cur = conn.execute(_BALANCES_SQL)
+        cur.row_factory = None
+        balances = cur.fetchall()
+        cur = conn.execute(_PATTERNS_SQL)
+        cur.row_factory = None
+        patterns = cur.fetchall()
+    finally:
+        conn.close()
+    return balances, patterns
+
+
+# ---------- Vectorised expansion ----------
+
+
+def _ragged(counts):
+    """
+    (group, position) for each element of groups of the given sizes, e.g.
+    counts [2, 3] -> groups [0, 0, 1, 1, 1], positions [0, 1, 0, 1, 2].
+    """
+    group = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    return group, np.arange(int(counts.sum())) - starts[group]
+
+
+def _seen_before(flag, pos):
+    """
+    Per element of _ragged() groups: whether flag was set at any position
+    up to this one in the same group.
+    """
+    total = np.cumsum(flag)
+    first = np.arange(len(flag)) - pos
+    return total - (total[first] - flag[first]) > 0
+
+
+def _expand_numpy(patterns, start, days: int):
+    """
+    Occurrence dates of all patterns within [.., start + days), as
+    (pattern index, datetime64[D]) arrays.
+    """
+    freq = np.array([p[3] for p in patterns], dtype=object)
+    interval = np.array([max(1, p[4] or 1) for p in patterns], dtype=np.int64)
+    # Only "monthly" honours day_of_month; "yearly" keeps the day it has.
+    dom = np.array(
+        [(p[5] or 0) if p[3] == "monthly" else 0 for p in patterns], dtype=np.int64
+    )
+    first = np.array([p[6][:10] for p in patterns], dtype="datetime64[D]")
+    end_date = np.array(
+        [p[7][:10] if p[7] else "NaT" for p in patterns], dtype="datetime64[D]"
+    )
+    horizon_end = np.datetime64(start) + (days - 1)
+    # The first occurrence is due regardless of end_date, the rest are not.
+    limit = np.where(np.isnat(end_date), horizon_end, np.minimum(end_date, horizon_end))
+    in_horizon = first <= horizon_end
+
+    out_index, out_dates = [], []
+
+    # Day-stepped: first + k * step.
+    day_step = np.array([_DAY_STEPS.get(f, 0) for f in freq], dtype=np.int64)
+    day_step = np.where(freq == "daily", 1, day_step * interval)
+    is_day = in_horizon & (day_step > 0)
+    is_once = in_horizon & (day_step == 0) & ~np.isin(freq, list(_MONTH_STEPS))
+    span = (limit - first).astype(np.int64)
+    counts = np.where(is_day, 1 + np.maximum(span, 0) // np.maximum(day_step, 1), 0)
+    counts = np.where(is_once, 1, counts)
+    group, pos = _ragged(counts)
+    out_index.append(group)
+    out_dates.append(first[group] + pos * day_step[group])
+
+    # Month-stepped: first, then every step months on day_of_month or the
+    # drifting previous day, clamped to the length of the month.
+    month_step = np.array([_MONTH_STEPS.get(f, 0) for f in freq], dtype=np.int64)
+    month_step *= interval
+    is_month = in_horizon & (month_step > 0)
+    first_month = first.astype("datetime64[M]")
+    months = (limit.astype("datetime64[M]") - first_month).astype(np.int64)
+    counts = np.where(
+        is_month, 1 + np.maximum(months, 0) // np.maximum(month_step, 1), 0
+    )
+    group, pos = _ragged(counts)
+    month = first_month[group] + pos * month_step[group]
+    month_start = month.astype("datetime64[D]")
+    month_len = ((month + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+    first_day = (first - first_month.astype("datetime64[D]")).astype(np.int64) + 1
+    d0 = first_day[group]
+    later = pos > 0
+    # Smallest month length seen so far (28..31) bounds the drifting day.
+    shortest = np.full(len(group), 31, dtype=np.int64)
+    for length in (30, 29, 28):
+        seen = _seen_before(later & (month_len <= length), pos)
+        shortest = np.where(seen, length, shortest)
+    day = np.where(
+        dom[group] > 0,
+        np.minimum(np.minimum(dom[group], 31), month_len),
+        np.minimum(d0, shortest),
+    )
+    day = np.where(later, day, d0)
+    dates = month_start + (day - 1)
+    keep = ~later | (dates <= limit[group])
+    out_index.append(group[keep])
+    out_dates.append(dates[keep])
+
+    return np.concatenate(out_index), np.concatenate(out_dates)
+
+
+def _project_numpy(balances, patterns, start: datetime.date, days: int):
+    keys = {(b[0], b[2]): i for i, b in enumerate(balances)}
+    opening = np.array([b[3] or 0.0 for b in balances], dtype=np.float64)
+    deltas = np.zeros(len(balances) * days)
+    occurrences = 0
+    if patterns:
+        index, dates = _expand_numpy(patterns, start, days)
+        occurrences = len(index)
+        key = np.array([keys[(p[0], p[1])] for p in patterns], dtype=np.int64)
+        amount = np.array([p[2] or 0.0 for p in patterns], dtype=np.float64)
+        offset = np.maximum((dates - np.datetime64(start)).astype(np.int64), 0)
+        deltas = np.bincount(
+            key[index] * days + offset,
+            weights=amount[index],
+            minlength=len(balances) * days,
+        )
+    series = opening[:, None] + np.cumsum(deltas.reshape(len(balances), days), axis=1)
+    return series.tolist(), occurrences
+
+
+# ---------- Fallback ----------
+
+
+def _project_python(balances, patterns, start: datetime.date, days: int):
+    keys = {(b[0], b[2]): i for i, b in enumerate(balances)}
+    deltas = [[0.0] * days for _ in balances]
+    horizon_end = start + datetime.timedelta(days=days - 1)
+    occurrences = 0
+    for account_id, currency, amount, freq, interval, dom, first, end in patterns:
+        rec = {
+            "frequency": freq,
+            "interval": interval,
+            "day_of_month": dom,
+            "end_date": end,
+        }
+        row = deltas[keys[(account_id, currency)]]
+        occ = datetime.date.fromisoformat(first[:10])
+        while occ is not None and occ <= horizon_end:
+            row[max(0, (occ - start).days)] += amount or 0.0
+            occurrences += 1
+            rec["next_occurrence"] = occ.isoformat()
+            occ = _compute_next(rec, occ)
+    series = []
+    for b, row in zip(balances, deltas):
+        running, line = b[3] or 0.0, []
+        for delta in row:
+            running += delta
+            line.append(running)
+        series.append(line)
+    return series, occurrences
+
+
+# ---------- Public API ----------
+
+
+@lru_cache(maxsize=8)
+def _forecast(days: int, start_iso: str, generation) -> dict:
+    start = datetime.date.fromisoformat(start_iso)
+    balances, patterns = _load()
+    project = _project_numpy if np is not None else _project_python
+    series, occurrences = project(balances, patterns, start, days)
+
+    accounts = []
+    for (account_id, name, currency, balance, threshold), line in zip(balances, series):
+        low = min(range(days), key=line.__getitem__)
+        breach = None
+        if threshold is not None:
+            breach = next((i for i, v in enumerate(line) if v < threshold), None)
+        accounts.append(
+            {
+                "account_id": account_id,
+                "account_name": name,
+                "currency": currency,
+                "balance": balance or 0.0,
+                "threshold": threshold,
+                "end_balance": line[-1],
+                "min_balance": line[low],
+                "min_date": (start + datetime.timedelta(days=low)).isoformat(),
+                "breach_date": (
+                    (start + datetime.timedelta(days=breach)).isoformat()
+                    if breach is not None
+                    else None
+                ),
+                "daily": line,
+            }
+        )
+    return {
+        "start": start_iso,
+        "days": days,
+        "occurrences": occurrences,
+        "accounts": accounts,
+    }
+
+
+def forecast_balances(
+    days: int = DEFAULT_HORIZON_DAYS, today: Optional[datetime.date] = None
+) -> dict:
+    """
+    Projected balances for the `days` days starting today:
+    {"start", "days", "occurrences", "accounts": [...]}, one account entry
+    per balance row with the current balance, threshold, end and minimum
+    balance (and its date), the first date below the threshold
+    (breach_date, None if it never drops below or there is no threshold)
+    and "daily", the end-of-day balance for each day. The result is
+    cached per recurring/balance change; treat it as read-only.
+    """
+    if not 1 <= days <= MAX_HORIZON_DAYS:
+        raise ValueError(f"days must be between 1 and {MAX_HORIZON_DAYS}")
+    start = today or datetime.date.today()
+    return _forecast(days, start.isoformat(), topic_generation(*FORECAST_TOPICS))
+
+
+def get_breaches(days: int = DEFAULT_HORIZON_DAYS) -> List[dict]:
+    """
+    Accounts projected to drop below their threshold within `days` days,
+    soonest first.
+    """
+    accounts = forecast_balances(days)["accounts"]
+    return sorted(
+        (
+            {k: v for k, v in a.items() if k != "daily"}
+            for a in accounts
+            if a["breach_date"]
+        ),
+        key=lambda a: a["breach_date"],
+    )
@@ -0,0 +1,442 @@
+"""
+Prometheus metrics for the web deployment.
+
+An opt-in HTTP endpoint on a side port that serves the Prometheus text
+format (0.0.4) at /metrics. It is read-only and unauthenticated, so it
+listens on 127.0.0.1 unless FINET_METRICS_HOST says otherwise.
+
+Usage:
+    FINET_METRICS_PORT=9108 python -m app.main --web
+    docker run -e FINET_METRICS_PORT=9108 -p 8550:8550 -p 9108:9108 finet
+
+Exported:
+    database     file and WAL size, rows per table, connections opened,
+                 commits, idle pool connections, data generation
+    caches       lru_cache hits/misses/size of the converter and analytics
+                 caches (they reset when the cache is cleared)
+    recurring    active patterns, due backlog, runs, generated transactions,
+                 last run time and duration
+    backups      time of the newest backup (made by this process, or the
+                 newest file in FINET_BACKUP_DIR, default ./backups) and age
+    latency      API request durations (histogram) and UI handler latency
+                 quantiles when handler instrumentation is on
+                 (FINET_INSTRUMENT=1)
+"""
+
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from app.db import connection
+from app.db import recurring as db_recurring
+from app.services import converter
+from app.utils import instrumentation
+from app.utils.backup import get_last_backup
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9108
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+ROW_COUNT_TABLES = (
+    "transactions",
+    "accounts",
+    "account_balances",
+    "balance_events",
+    "categories",
+    "budgets",
+    "recurring_transactions",
+    "rate_history",
+)
+
+def _caches() -> dict:
+    # analytics pulls in the NumPy snapshot and forecast; only scrapes pay
+    # for importing them.
+    from app.services import analytics, forecast
+
+    return {
+        "converter_active_currencies": converter.get_active_currencies_data,
+        "converter_active_codes": converter.get_active_currency_codes,
+        "converter_symbols": converter.get_currency_symbol_map,
+        "converter_base_currency": converter.get_base_currency,
+        "converter_rates": converter.get_conversion_rates,
+        "analytics_timeframe_dataset": analytics._timeframe_dataset,
+        "analytics_balance_series": analytics._balance_series,
+        "forecast": forecast._forecast,
+    }
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with labels, in seconds.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, seconds: float, **labels):
+        key = tuple(sorted(labels.items()))
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += seconds
+
+    def collect(self) -> List[Tuple[tuple, list]]:
+        with self._lock:
+            return [(k, list(v)) for k, v in self._series.items()]
+
+
+REQUEST_DURATION = Histogram((0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5))
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    REQUEST_DURATION.observe(seconds, method=method, route=route, status=str(status))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_value(value) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _fmt_labels(labels) -> str:
+    if not labels:
+        return ""
+    items = labels.items() if isinstance(labels, dict) else labels
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str, samples):
+        """
+        samples: value, or a list of (labels, value).
+        """
+        if not isinstance(samples, list):
+            samples = [((), samples)]
+        samples = [(labels, v) for labels, v in samples if v is not None]
+        if not samples:
+            return
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+    def histogram(self, name: str, help_text: str, hist: Histogram):
+        series = hist.collect()
+        if not series:
+            return
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} histogram")
+        for labels, counts in series:
+            cumulative = 0
+            for bound, n in zip(list(hist.buckets) + ["+Inf"], counts[:-1]):
+                cumulative += n
+                le = labels + (("le", bound),)
+                self.lines.append(f"{name}_bucket{_fmt_labels(le)} {cumulative}")
+            self.lines.append(
+                f"{name}_sum{_fmt_labels(labels)} {_fmt_value(counts[-1])}"
+            )
+            self.lines.append(f"{name}_count{_fmt_labels(labels)} {cumulative}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _file_size(path: str) -> Optional[int]:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _newest_backup_file(backup_dir: str) -> Optional[float]:
+    try:
+        entries = [e for e in os.scandir(backup_dir) if e.is_file()]
+    except OSError:
+        return None
+    return max((e.stat().st_mtime for e in entries), default=None)
+
+
+def _row_counts() -> List[tuple]:
+    conn = connection.get_db_connection()
+    try:
+        existing = {
+            r[0]
+            for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            ).fetchall()
+        }
+        return [
+            ((("table", t),), conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0])
+            for t in ROW_COUNT_TABLES
+            if t in existing
+        ]
+    finally:
+        conn.close()
+
+
+def collect() -> str:
+    """
+    Gathers every metric and returns the exposition text.
+    """
+    started = time.perf_counter()
+    out = _Exposition()
+    now = time.time()
+
+    # Database
+    db_path = connection.get_db_path()
+    out.family(
+        "finet_db_size_bytes",
+        "gauge",
+        "Size of the database file.",
+        _file_size(db_path),
+    )
+    out.family(
+        "finet_db_wal_size_bytes",
+        "gauge",
+        "Size of the write-ahead log.",
+        _file_size(db_path + "-wal"),
+    )
+    out.family("finet_table_rows", "gauge", "Rows per table.", _row_counts())
+    stats = connection.get_connection_stats()
+    out.family(
+        "finet_db_connections_opened_total",
+        "counter",
+        "SQLite connections opened.",
+        stats.get("connections_opened", 0),
+    )
+    out.family(
+        "finet_db_commits_total",
+        "counter",
+        "Commits that wrote data.",
+        stats.get("commits", 0),
+    )
+    out.family(
+        "finet_db_pool_idle_connections",
+        "gauge",
+        "Idle connections in the pool.",
+        stats.get("pool_idle", 0),
+    )
+    out.family(
+        "finet_data_generation",
+        "counter",
+        "Data generation (bumped on every write or database swap).",
+        connection.get_data_generation(),
+    )
+
+    # Caches
+    infos = [(name, fn.cache_info()) for name, fn in _caches().items()]
+    out.family(
+        "finet_cache_hits_total",
+        "counter",
+        "Cache hits since the cache was last cleared.",
+        [((("cache", name),), info.hits) for name, info in infos],
+    )
+    out.family(
+        "finet_cache_misses_total",
+        "counter",
+        "Cache misses since the cache was last cleared.",
+        [((("cache", name),), info.misses) for name, info in infos],
+    )
+    out.family(
+        "finet_cache_entries",
+        "gauge",
+        "Entries currently cached.",
+        [((("cache", name),), info.currsize) for name, info in infos],
+    )
+
+    # Recurring
+    rec = db_recurring.get_recurring_stats()
+    out.family(
+        "finet_recurring_active",
+        "gauge",
+        "Active recurring patterns.",
+        len(db_recurring.list_recurring(active_only=True)),
+    )
+    out.family(
+        "finet_recurring_due",
+        "gauge",
+        "Active patterns with an occurrence due today or earlier.",
+        db_recurring.count_due_recurring(),
+    )
+    out.family(
+        "finet_recurring_runs_total",
+        "counter",
+        "Recurring generation runs.",
+        rec["runs"],
+    )
+    out.family(
+        "finet_recurring_generated_total",
+        "counter",
+        "Transactions generated from recurring patterns.",
+        rec["generated"],
+    )
+    out.family(
+        "finet_recurring_last_run_timestamp_seconds",
+        "gauge",
+        "When the last generation run finished.",
+        rec["last_run_at"],
+    )
+    out.family(
+        "finet_recurring_last_run_duration_seconds",
+        "gauge",
+        "Duration of the last generation run.",
+        rec["last_run_ms"] / 1000 if rec["last_run_ms"] is not None else None,
+    )
+
+    # Backups
+    last = get_last_backup()
+    newest = max(
+        filter(
+            None,
+            [
+                last and last["finished_at"],
+                _newest_backup_file(os.getenv("FINET_BACKUP_DIR", "./backups")),
+            ],
+        ),
+        default=None,
+    )
+    out.family(
+        "finet_backup_last_timestamp_seconds",
+        "gauge",
+        "Time of the newest backup.",
+        newest,
+    )
+    out.family(
+        "finet_backup_age_seconds",
+        "gauge",
+        "Seconds since the newest backup.",
+        now - newest if newest else None,
+    )
+    if last:
+        out.family(
+            "finet_backup_last_size_bytes",
+            "gauge",
+            "Size of the last backup made by this process.",
+            last["size_bytes"],
+        )
+        out.family(
+            "finet_backup_last_duration_seconds",
+            "gauge",
+            "Duration of the last backup made by this process.",
+            last["seconds"],
+        )
+
+    # Latency
+    out.histogram(
+        "finet_api_request_duration_seconds",
+        "JSON API request duration.",
+        REQUEST_DURATION,
+    )
+    if instrumentation.is_enabled():
+        handlers = instrumentation.snapshot()
+        samples = []
+        for h in handlers:
+            for q, key in (("0.5", "p50_ms"), ("0.95", "p95_ms")):
+                samples.append(
+                    ((("handler", h["handler"]), ("quantile", q)), h[key] / 1000)
+                )
+        out.family(
+            "finet_ui_handler_latency_seconds",
+            "gauge",
+            "UI event handler wall time quantiles over the recent window.",
+            samples,
+        )
+        out.family(
+            "finet_ui_handler_calls_total",
+            "counter",
+            "UI event handler calls.",
+            [((("handler", h["handler"]),), h["calls"]) for h in handlers],
+        )
+
+    out.family(
+        "finet_metrics_scrape_duration_seconds",
+        "gauge",
+        "Time taken to gather these metrics.",
+        time.perf_counter() - started,
+    )
+    return out.text()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        try:
+            body = collect().encode("utf-8")
+        except Exception as ex:
+            print(f"[Metrics] Collection failed: {type(ex).__name__}: {ex}")
+            self.send_error(500)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(
+    host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+) -> ThreadingHTTPServer:
+    """
+    Serves /metrics on a daemon thread. Calling it again returns the
+    running server.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(
+                target=_server.serve_forever, name="finet-metrics", daemon=True
+            ).start()
+            print(
+                f"[Metrics] Serving Prometheus metrics on http://{host}:{port}/metrics"
+            )
+        return _server
+
+
+def stop_metrics_server():
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
+
+
+def start_from_env() -> Optional[ThreadingHTTPServer]:
+    """
+    Starts the endpoint when FINET_METRICS_PORT is set (startup calls this).
+    """
+    port = os.getenv("FINET_METRICS_PORT")
+    if not port:
+        return None
+    try:
+        return start_metrics_server(
+            os.getenv("FINET_METRICS_HOST", DEFAULT_HOST), int(port)
+        )
+    except (OSError, ValueError) as ex:
+        print(f"[Metrics] Could not start metrics endpoint: {ex}")
+        return None
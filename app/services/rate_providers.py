@@ -0,0 +1,358 @@
+"""
+Exchange-rate providers.
+
+A provider turns a base currency into {code: rate} ("1 base = rate code")
+and lists the currency codes it knows. Network providers go through
+HttpCache: responses are kept on disk with their ETag, reused while younger
+than the TTL, revalidated with If-None-Match afterwards, and served stale
+when the network is down. Failed requests are retried with exponential
+backoff.
+
+    ERApiProvider        open.er-api.com (default; latest rates only)
+    FrankfurterProvider  api.frankfurter.app (ECB rates, with history)
+    FixtureProvider      rates from a JSON file or the built-in table; never
+                         touches the network (tests, offline use)
+
+The provider is picked with FINET_RATES_PROVIDER (a PROVIDERS key;
+FINET_RATES_FIXTURE points the fixture provider at a file) or replaced at
+runtime with set_rate_provider(). fetch_rates_async() runs a fetch on a
+small thread pool and returns a Future, so callers never block the UI.
+"""
+
+import abc
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "finet", "http")
+DEFAULT_TTL = 6 * 3600
+# Published history does not change; only ranges touching the last week
+# use the normal TTL.
+HISTORY_TTL = 30 * 24 * 3600
+DEFAULT_TIMEOUT = 5
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+
+# Same table as the settings defaults ("1 EUR = X"), used by the fixture
+# provider when no file is given.
+FIXTURE_RATES = {
+    "EUR": 1.0,
+    "USD": 1.08,
+    "GBP": 0.86,
+    "JPY": 162.5,
+    "CHF": 0.97,
+    "CAD": 1.48,
+    "UAH": 43.0,
+    "AUD": 1.64,
+    "CNY": 7.8,
+    "INR": 90.0,
+}
+
+
+class HttpCache:
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        self.cache_dir = cache_dir or os.getenv("FINET_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self.stats = {"fresh": 0, "revalidated": 0, "fetched": 0, "stale": 0}
+
+    def _path(self, url: str) -> str:
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json"
+        return os.path.join(self.cache_dir, name)
+
+    def _load(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry if entry.get("url") == url else None
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, url: str, body, etag: Optional[str]):
+        entry = {"url": url, "fetched_at": time.time(), "etag": etag, "body": body}
+        path = self._path(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, path)
+        except OSError as ex:
+            print(f"[Rates] Could not write cache for {url}: {ex}")
+
+    def _request(self, url: str, etag: Optional[str]):
+        """
+        One GET with retries. Returns (status, body, etag); status 304 means
+        the cached copy is still current. Server errors and refused or reset
+        connections are retried; timeouts are not, so a call never blocks
+        much longer than one timeout.
+        """
+        headers = {"Accept": "application/json"}
+        if etag:
+            headers["If-None-Match"] = etag
+        attempt = 0
+        while True:
+            try:
+                req = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                    body = json.loads(response.read().decode("utf-8"))
+                    return response.status, body, response.headers.get("ETag")
+            except urllib.error.HTTPError as ex:
+                if ex.code == 304:
+                    return 304, None, etag
+                # Client errors will not get better by retrying.
+                if ex.code < 500 or attempt >= self.retries:
+                    raise
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as ex:
+                reason = getattr(ex, "reason", ex)
+                if isinstance(reason, TimeoutError) or attempt >= self.retries:
+                    raise
+            time.sleep(self.backoff * (2**attempt))
+            attempt += 1
+
+    def get_json(self, url: str, ttl: float = DEFAULT_TTL, force: bool = False):
+        """
+        Parsed JSON body for url, from the cache when possible. Returns None
+        only when there is neither a response nor a cached copy.
+        """
+        with self._lock:
+            entry = self._load(url)
+            if entry and not force and time.time() - entry["fetched_at"] < ttl:
+                self.stats["fresh"] += 1
+                return entry["body"]
+
+        try:
+            status, body, etag = self._request(url, entry and entry.get("etag"))
+        except Exception as ex:
+            if entry:
+                with self._lock:
+                    self.stats["stale"] += 1
+                print(f"[Rates] {ex}; using cached response for {url}")
+                return entry["body"]
+            print(f"[Rates] {ex}")
+            return None
+
+        with self._lock:
+            if status == 304 and entry:
+                self.stats["revalidated"] += 1
+                self._store(url, entry["body"], etag)
+                return entry["body"]
+            self.stats["fetched"] += 1
+            self._store(url, body, etag)
+        return body
+
+    def clear(self):
+        with self._lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+class RateProvider(abc.ABC):
+    name = "base"
+    # Whether fetch_history() returns anything; check before backfilling.
+    supports_history = False
+
+    @abc.abstractmethod
+    def fetch_rates(
+        self, base_currency: str, force: bool = False
+    ) -> Optional[Dict[str, float]]:
+        """
+        Rates relative to base_currency, or None if they are unavailable.
+        """
+
+    @abc.abstractmethod
+    def fetch_currency_codes(self) -> Optional[List[str]]:
+        pass
+
+    def fetch_history(
+        self,
+        base_currency: str,
+        start: str,
+        end: str,
+        currencies: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Daily rates {date: {code: rate}} for start..end (inclusive
+        YYYY-MM-DD). Dates the source did not publish are missing, which
+        is every date for providers without supports_history.
+        """
+        return {}
+
+
+class ERApiProvider(RateProvider):
+    name = "erapi"
+    URL_TEMPLATE = "https://open.er-api.com/v6/latest/{base}"
+
+    def __init__(self, cache: Optional[HttpCache] = None, ttl: float = DEFAULT_TTL):
+        self.cache = cache or HttpCache()
+        self.ttl = ttl
+
+    def _latest(
+        self, base_currency: str, force: bool = False, ttl: Optional[float] = None
+    ) -> Optional[dict]:
+        url = self.URL_TEMPLATE.format(base=base_currency.upper())
+        data = self.cache.get_json(url, ttl=ttl or self.ttl, force=force)
+        if not data:
+            return None
+        if data.get("result") != "success":
+            print(f"[API Error] Response: {data.get('error-type')}")
+            return None
+        return data
+
+    def fetch_rates(self, base_currency, force=False):
+        data = self._latest(base_currency, force)
+        return data.get("rates") if data else None
+
+    def fetch_currency_codes(self):
+        # The code list rarely changes; reuse the USD table for a day.
+        data = self._latest("USD", ttl=24 * 3600)
+        return sorted(data["rates"]) if data and "rates" in data else None
+
+
+class FrankfurterProvider(RateProvider):
+    name = "frankfurter"
+    supports_history = True
+    URL = "https://api.frankfurter.app"
+
+    def __init__(self, cache: Optional[HttpCache] = None, ttl: float = DEFAULT_TTL):
+        self.cache = cache or HttpCache()
+        self.ttl = ttl
+
+    def fetch_rates(self, base_currency, force=False):
+        url = f"{self.URL}/latest?from={base_currency.upper()}"
+        data = self.cache.get_json(url, ttl=self.ttl, force=force)
+        if not data or "rates" not in data:
+            return None
+        return {**data["rates"], base_currency.upper(): 1.0}
+
+    def fetch_currency_codes(self):
+        data = self.cache.get_json(f"{self.URL}/currencies", ttl=24 * 3600)
+        return sorted(data) if data else None
+
+    def fetch_history(self, base_currency, start, end, currencies=None):
+        url = f"{self.URL}/{start}..{end}?from={base_currency.upper()}"
+        if currencies:
+            url += "&to=" + ",".join(
+                c.upper() for c in currencies if c.upper() != base_currency.upper()
+            )
+        recent = datetime.date.today() - datetime.timedelta(days=7)
+        ttl = self.ttl if end >= recent.isoformat() else HISTORY_TTL
+        data = self.cache.get_json(url, ttl=ttl)
+        if not data or "rates" not in data:
+            raise RuntimeError(f"No history from {self.name} for {start}..{end}")
+        return data["rates"]
+
+
+class FixtureProvider(RateProvider):
+    name = "fixture"
+    supports_history = True
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        path is a JSON file {"base": "EUR", "rates": {"USD": 1.08, ...}};
+        without it FIXTURE_RATES is used.
+        """
+        base, rates = "EUR", FIXTURE_RATES
+        if path:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            base, rates = data.get("base", base), data["rates"]
+        self.base = base
+        self.rates = {**rates, base: 1.0}
+
+    def fetch_rates(self, base_currency, force=False):
+        pivot = self.rates.get(base_currency.upper())
+        if not pivot:
+            return None
+        return {code: rate / pivot for code, rate in self.rates.items()}
+
+    def fetch_currency_codes(self):
+        return sorted(self.rates)
+
+    def fetch_history(self, base_currency, start, end, currencies=None):
+        # The same table for every day.
+        day = self.fetch_rates(base_currency)
+        if day is None:
+            return {}
+        if currencies:
+            day = {c: r for c, r in day.items() if c in currencies}
+        d = datetime.date.fromisoformat(start)
+        last = datetime.date.fromisoformat(end)
+        history = {}
+        while d <= last:
+            history[d.isoformat()] = dict(day)
+            d += datetime.timedelta(days=1)
+        return history
+
+
+PROVIDERS = {
+    ERApiProvider.name: ERApiProvider,
+    FrankfurterProvider.name: FrankfurterProvider,
+    FixtureProvider.name: FixtureProvider,
+}
+
+_provider: Optional[RateProvider] = None
+_provider_lock = threading.Lock()
+_FETCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rates")
+
+
+def _default_provider() -> RateProvider:
+    name = os.getenv("FINET_RATES_PROVIDER", ERApiProvider.name)
+    if name == FixtureProvider.name:
+        return FixtureProvider(os.getenv("FINET_RATES_FIXTURE"))
+    if name not in PROVIDERS:
+        print(f"[Rates] Unknown provider '{name}', using {ERApiProvider.name}")
+        name = ERApiProvider.name
+    return PROVIDERS[name]()
+
+
+def get_rate_provider() -> RateProvider:
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = _default_provider()
+        return _provider
+
+
+def set_rate_provider(provider: Optional[RateProvider]):
+    """
+    Replaces the active provider; None goes back to the environment default.
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+def fetch_rates_async(base_currency: str, force: bool = False) -> Future:
+    """
+    Fetches rates on the provider pool. The Future resolves to the rates
+    dict or None and never raises.
+    """
+    provider = get_rate_provider()
+
+    def run():
+        try:
+            return provider.fetch_rates(base_currency, force)
+        except Exception as ex:
+            print(f"[Rates] {provider.name} failed: {ex}")
+            return None
+
+    return _FETCH_POOL.submit(run)
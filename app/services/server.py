@@ -0,0 +1,604 @@
+"""
+Headless JSON API exposing the DAO layer.
+
+Usage:
+    python -m app.main --api
+    FINET_API_HOST=0.0.0.0 FINET_API_PORT=8551 python -m app.main --api
+
+All SQLite work runs on a thread pool so slow queries from one client do not
+block the event loop. List endpoints stream their JSON body with chunked
+transfer encoding.
+"""
+
+import asyncio
+import dataclasses
+import datetime
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import parse_qs, urlsplit
+
+from app.db import accounts as db_accounts
+from app.db import budgets as db_budgets
+from app.db import categories as db_categories
+from app.db import recurring as db_recurring
+from app.db import transactions as db_transactions
+from app.db.connection import unit_of_work
+from app.services import forecast
+from app.services.metrics import observe_request
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8551
+STREAM_CHUNK_ITEMS = 500
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+_REASONS = {
+    200: "OK",
+    201: "Created",
+    204: "No Content",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.params = {}
+        self.route = None
+
+    def json(self):
+        if not self.body:
+            raise HTTPError(400, "Request body is required.")
+        try:
+            return json.loads(self.body.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"Invalid JSON: {e}")
+
+    def arg(self, name, default=None, cast=str):
+        values = self.query.get(name)
+        if not values:
+            return default
+        try:
+            return cast(values[0])
+        except ValueError:
+            raise HTTPError(400, f"Invalid value for '{name}'.")
+
+
+class Streamed:
+    """
+    Marks a handler result as a list to be streamed as a JSON array.
+    """
+
+    def __init__(self, items, status=200):
+        self.items = items
+        self.status = status
+
+
+def _to_jsonable(obj):
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__dict__"):
+        return dict(vars(obj))
+    return obj
+
+
+def _require(data: dict, *keys):
+    missing = [k for k in keys if data.get(k) in (None, "")]
+    if missing:
+        raise HTTPError(400, f"Missing field(s): {', '.join(missing)}")
+
+
+def _iso_date(data: dict, key: str):
+    """
+    data[key] as a YYYY-MM-DD string, None when absent; 400 if it is not a
+    valid date.
+    """
+    value = data.get(key)
+    if value in (None, ""):
+        return None
+    try:
+        return datetime.date.fromisoformat(str(value)).isoformat()
+    except ValueError:
+        raise HTTPError(400, f"Invalid date for '{key}' (expected YYYY-MM-DD).")
+
+
+# ---------- DAO-backed operations (run on the worker pool) ----------
+
+
+def _add_transaction_record(rec: dict):
+    """
+    Mirrors the Transactions tab: store the transaction and, unless told
+    otherwise, move the account balance by the signed amount.
+    """
+    _require(rec, "date", "amount", "account_id", "currency")
+    date = _iso_date(rec, "date")
+    occurrence_date = _iso_date(rec, "occurrence_date")
+    amount = float(rec["amount"])
+    account_id = int(rec["account_id"])
+    currency = str(rec["currency"]).upper()
+    with unit_of_work():
+        tx_id = db_transactions.add_transaction(
+            date,
+            amount,
+            rec.get("category_id"),
+            account_id,
+            rec.get("notes") or "",
+            currency,
+            occurrence_date=occurrence_date,
+        )
+        if rec.get("adjust_balance", True):
+            db_accounts.increment_account_balance(
+                account_id,
+                currency,
+                amount,
+                kind="transaction",
+                effective_date=date,
+                transaction_id=tx_id,
+            )
+    return tx_id
+
+
+def _add_transactions_bulk(records: list, adjust_balances: bool) -> list:
+    rows = []
+    for i, rec in enumerate(records):
+        if not isinstance(rec, dict):
+            raise HTTPError(400, f"Item {i} is not a JSON object.")
+        try:
+            _require(rec, "date", "amount", "account_id", "currency")
+            date = _iso_date(rec, "date")
+            occurrence_date = _iso_date(rec, "occurrence_date")
+        except HTTPError as e:
+            raise HTTPError(400, f"Item {i}: {e.message}")
+        rows.append(
+            {
+                "date": date,
+                "amount": float(rec["amount"]),
+                "category_id": rec.get("category_id"),
+                "account_id": int(rec["account_id"]),
+                "notes": rec.get("notes") or "",
+                "currency": str(rec["currency"]).upper(),
+                "occurrence_date": occurrence_date,
+            }
+        )
+    return db_transactions.add_transactions_bulk(rows, adjust_balances=adjust_balances)
+
+
+def _add_budget(data: dict):
+    _require(data, "category_id", "period", "amount", "start_date", "end_date")
+    db_budgets.add_budget(
+        int(data["category_id"]),
+        data["period"],
+        float(data["amount"]),
+        _iso_date(data, "start_date"),
+        _iso_date(data, "end_date"),
+    )
+
+
+def _add_budgets_bulk(items: list) -> int:
+    """
+    Adds every budget or, if one is invalid, none of them.
+    """
+    with unit_of_work():
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise HTTPError(400, f"Item {i} is not a JSON object.")
+            try:
+                _add_budget(item)
+            except HTTPError as e:
+                raise HTTPError(400, f"Item {i}: {e.message}")
+    return len(items)
+
+
+def _create_account(data: dict) -> int:
+    _require(data, "name")
+    with unit_of_work():
+        acc_id = db_accounts.add_account(
+            data["name"], data.get("type") or "Cash", data.get("notes") or ""
+        )
+        for b in data.get("balances") or []:
+            _require(b, "currency")
+            currency = str(b["currency"]).upper()
+            db_accounts.add_account_balance(
+                acc_id, currency, float(b.get("balance") or 0.0)
+            )
+            if b.get("balance_threshold") is not None:
+                db_accounts.set_account_balance_threshold(
+                    acc_id, currency, float(b["balance_threshold"])
+                )
+    return acc_id
+
+
+# ---------- Handlers ----------
+
+
+class FinetAPI:
+    def __init__(self, executor: ThreadPoolExecutor):
+        self.executor = executor
+        self.routes = []
+        self._register_routes()
+
+    async def run_db(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    def route(self, method: str, pattern: str, handler):
+        self.routes.append((method, re.compile(f"^{pattern}$"), handler))
+
+    def _register_routes(self):
+        r = self.route
+        r("GET", r"/health", self.health)
+
+        r("GET", r"/transactions", self.list_transactions)
+        r("POST", r"/transactions", self.create_transaction)
+        r("POST", r"/transactions/bulk", self.create_transactions_bulk)
+        r("DELETE", r"/transactions/(?P<id>\d+)", self.delete_transaction)
+
+        r("GET", r"/accounts", self.list_accounts)
+        r("POST", r"/accounts", self.create_account)
+        r("DELETE", r"/accounts/(?P<id>\d+)", self.delete_account)
+
+        r("GET", r"/categories", self.list_categories)
+
+        r("GET", r"/budgets", self.list_budgets)
+        r("POST", r"/budgets", self.create_budget)
+        r("POST", r"/budgets/bulk", self.create_budgets_bulk)
+        r("DELETE", r"/budgets/(?P<id>\d+)", self.delete_budget)
+
+        r("GET", r"/recurring", self.list_recurring)
+        r("POST", r"/recurring", self.create_recurring)
+        r("POST", r"/recurring/generate", self.generate_recurring)
+
+        r("GET", r"/analytics/transactions", self.analytics_transactions)
+        r("GET", r"/analytics/category-spend", self.analytics_category_spend)
+        r("GET", r"/analytics/upcoming", self.analytics_upcoming)
+        r("GET", r"/analytics/low-balance", self.analytics_low_balance)
+        r("GET", r"/analytics/forecast", self.analytics_forecast)
+        r("GET", r"/analytics/forecast/breaches", self.analytics_forecast_breaches)
+
+    async def health(self, req):
+        return 200, {"status": "ok"}
+
+    async def list_transactions(self, req):
+        limit = req.arg("limit", 100, int)
+        txs = await self.run_db(db_transactions.get_recent_transactions, limit)
+        return Streamed(txs)
+
+    async def create_transaction(self, req):
+        rec = req.json()
+        if not isinstance(rec, dict):
+            raise HTTPError(400, "Expected a JSON object.")
+        tx_id = await self.run_db(_add_transaction_record, rec)
+        return 201, {"id": tx_id}
+
+    async def create_transactions_bulk(self, req):
+        records = req.json()
+        if not isinstance(records, list):
+            raise HTTPError(400, "Expected a JSON array of transactions.")
+        adjust = req.arg("adjust_balances", "1") not in ("0", "false", "no")
+        ids = await self.run_db(_add_transactions_bulk, records, adjust)
+        return 201, {"created": len(ids), "ids": ids}
+
+    async def delete_transaction(self, req):
+        await self.run_db(db_transactions.delete_transaction, int(req.params["id"]))
+        return 204, None
+
+    async def list_accounts(self, req):
+        return Streamed(await self.run_db(db_accounts.get_accounts))
+
+    async def create_account(self, req):
+        data = req.json()
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Expected a JSON object.")
+        acc_id = await self.run_db(_create_account, data)
+        return 201, {"id": acc_id}
+
+    async def delete_account(self, req):
+        await self.run_db(db_accounts.delete_account, int(req.params["id"]))
+        return 204, None
+
+    async def list_categories(self, req):
+        return Streamed(await self.run_db(db_categories.get_categories))
+
+    async def list_budgets(self, req):
+        return Streamed(await self.run_db(db_budgets.get_budgets))
+
+    async def create_budget(self, req):
+        data = req.json()
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Expected a JSON object.")
+        await self.run_db(_add_budget, data)
+        return 201, {"created": 1}
+
+    async def create_budgets_bulk(self, req):
+        items = req.json()
+        if not isinstance(items, list):
+            raise HTTPError(400, "Expected a JSON array of budgets.")
+
+        return 201, {"created": await self.run_db(_add_budgets_bulk, items)}
+
+    async def delete_budget(self, req):
+        await self.run_db(db_budgets.delete_budget, int(req.params["id"]))
+        return 204, None
+
+    async def list_recurring(self, req):
+        active_only = req.arg("active_only", "1") not in ("0", "false", "no")
+        return Streamed(await self.run_db(db_recurring.list_recurring, active_only))
+
+    async def create_recurring(self, req):
+        data = req.json()
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Expected a JSON object.")
+        _require(
+            data,
+            "account_id",
+            "category_id",
+            "amount",
+            "currency",
+            "frequency",
+            "start_date",
+        )
+        rid = await self.run_db(
+            db_recurring.create_recurring,
+            account_id=int(data["account_id"]),
+            category_id=int(data["category_id"]),
+            amount=float(data["amount"]),
+            currency=str(data["currency"]).upper(),
+            frequency=data["frequency"],
+            start_date=data["start_date"],
+            end_date=data.get("end_date"),
+            notes=data.get("notes") or "",
+            interval=data.get("interval"),
+            day_of_month=data.get("day_of_month"),
+            weekday=data.get("weekday"),
+            active=bool(data.get("active", True)),
+        )
+        return 201, {"id": rid}
+
+    async def generate_recurring(self, req):
+        created = await self.run_db(db_recurring.generate_due_transactions)
+        return 200, {"generated": created}
+
+    async def analytics_transactions(self, req):
+        rows = await self.run_db(db_transactions.get_transactions_for_analytics)
+        return Streamed(rows)
+
+    async def analytics_category_spend(self, req):
+        category_id = req.arg("category_id", None, int)
+        start = req.arg("start")
+        end = req.arg("end")
+        if category_id is None or not start or not end:
+            raise HTTPError(400, "category_id, start and end are required.")
+        total = await self.run_db(
+            db_transactions.get_category_spend, category_id, start, end
+        )
+        return 200, {"category_id": category_id, "total": total}
+
+    async def analytics_upcoming(self, req):
+        rows = await self.run_db(
+            db_recurring.get_upcoming_recurring,
+            limit=req.arg("limit", 5, int),
+            days_ahead=req.arg("days", 30, int),
+        )
+        return Streamed(rows)
+
+    async def analytics_low_balance(self, req):
+        return Streamed(await self.run_db(db_accounts.get_low_balance_alerts))
+
+    def _forecast_days(self, req) -> int:
+        days = req.arg("days", forecast.DEFAULT_HORIZON_DAYS, int)
+        if not 1 <= days <= forecast.MAX_HORIZON_DAYS:
+            raise HTTPError(
+                400, f"days must be between 1 and {forecast.MAX_HORIZON_DAYS}."
+            )
+        return days
+
+    async def analytics_forecast(self, req):
+        result = await self.run_db(forecast.forecast_balances, self._forecast_days(req))
+        if req.arg("daily", "1") in ("0", "false", "no"):
+            accounts = [
+                {k: v for k, v in a.items() if k != "daily"} for a in result["accounts"]
+            ]
+            result = {**result, "accounts": accounts}
+        return 200, result
+
+    async def analytics_forecast_breaches(self, req):
+        return Streamed(
+            await self.run_db(forecast.get_breaches, self._forecast_days(req))
+        )
+
+    # ---------- Dispatch ----------
+
+    async def dispatch(self, req: Request):
+        allowed = False
+        for method, pattern, handler in self.routes:
+            m = pattern.match(req.path)
+            if not m:
+                continue
+            allowed = True
+            if method == req.method:
+                req.params = m.groupdict()
+                req.route = pattern.pattern.strip("^$")
+                return await handler(req)
+        if allowed:
+            raise HTTPError(405, f"Method {req.method} not allowed on {req.path}")
+        raise HTTPError(404, f"No route for {req.path}")
+
+
+# ---------- HTTP plumbing ----------
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").strip().split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "Malformed request line.")
+
+    headers = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length") or 0)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, "Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+
+    parts = urlsplit(target)
+    req = Request(
+        method.upper(),
+        parts.path.rstrip("/") or "/",
+        parse_qs(parts.query),
+        headers,
+        body,
+    )
+    req.keep_alive = (
+        version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    )
+    return req
+
+
+def _head(status: int, extra: dict, keep_alive: bool) -> bytes:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}"]
+    extra = dict(extra)
+    extra["Connection"] = "keep-alive" if keep_alive else "close"
+    lines.extend(f"{k}: {v}" for k, v in extra.items())
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer, status: int, payload, keep_alive: bool):
+    body = b"" if payload is None else json.dumps(payload, default=str).encode()
+    headers = {"Content-Length": str(len(body))}
+    if body:
+        headers["Content-Type"] = "application/json"
+    writer.write(_head(status, headers, keep_alive) + body)
+    await writer.drain()
+
+
+async def _send_stream(writer, result: Streamed, keep_alive: bool):
+    writer.write(
+        _head(
+            result.status,
+            {"Content-Type": "application/json", "Transfer-Encoding": "chunked"},
+            keep_alive,
+        )
+    )
+
+    def chunk(data: bytes):
+        writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+
+    items = result.items
+    chunk(b"[")
+    for start in range(0, len(items), STREAM_CHUNK_ITEMS):
+        batch = items[start : start + STREAM_CHUNK_ITEMS]
+        encoded = ",".join(
+            json.dumps(_to_jsonable(i), default=str) for i in batch
+        ).encode()
+        chunk((b"," if start else b"") + encoded)
+        await writer.drain()
+    chunk(b"]")
+    writer.write(b"0\r\n\r\n")
+    await writer.drain()
+
+
+async def _handle_client(api: FinetAPI, reader, writer):
+    try:
+        while True:
+            keep_alive = False
+            req = None
+            status = 500
+            try:
+                req = await _read_request(reader)
+                if req is None:
+                    break
+                started = time.perf_counter()
+                keep_alive = req.keep_alive
+                result = await api.dispatch(req)
+                if isinstance(result, Streamed):
+                    status = result.status
+                    await _send_stream(writer, result, keep_alive)
+                else:
+                    status, payload = result
+                    await _send_json(writer, status, payload, keep_alive)
+            except HTTPError as e:
+                status = e.status
+                await _send_json(writer, e.status, {"error": e.message}, keep_alive)
+            except (ValueError, TypeError, KeyError) as e:
+                status = 400
+                await _send_json(writer, 400, {"error": str(e)}, keep_alive)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            except Exception as e:
+                print(f"[API] Error handling request: {type(e).__name__}: {e}")
+                await _send_json(
+                    writer, 500, {"error": f"{type(e).__name__}: {e}"}, keep_alive
+                )
+            if req is not None:
+                observe_request(
+                    req.method,
+                    req.route or "unmatched",
+                    status,
+                    time.perf_counter() - started,
+                )
+            if not keep_alive:
+                break
+    finally:
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers=None):
+    executor = ThreadPoolExecutor(
+        max_workers=workers or min(32, (os.cpu_count() or 1) + 4),
+        thread_name_prefix="finet-db",
+    )
+    api = FinetAPI(executor)
+    server = await asyncio.start_server(
+        lambda r, w: _handle_client(api, r, w), host, port
+    )
+    print(f"[API] Serving Finet JSON API on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+
+
+def run_api_server(host: str | None = None, port: int | None = None):
+    """
+    Blocking entry point used by `python -m app.main --api`.
+    init_db() must already have been called.
+    """
+    host = host or os.getenv("FINET_API_HOST", DEFAULT_HOST)
+    port = port or int(os.getenv("FINET_API_PORT", DEFAULT_PORT))
+    workers = int(os.getenv("FINET_API_WORKERS", "0")) or None
+    try:
+        asyncio.run(serve(host, port, workers))
+    except KeyboardInterrupt:
+        print("[API] Shutting down.")
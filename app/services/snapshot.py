@@ -0,0 +1,285 @@
+"""
+Columnar analytics snapshot.
+
+Keeps the transaction columns the dashboard aggregates over in contiguous
+NumPy arrays: day number (date.toordinal()), month index (year * 12 +
+month - 1), amount_converted, category_id and account_id (-1 for NULL).
+Timeframe filters, group-bys and KPIs then run as array operations
+instead of loops over dicts. Rows whose date is NULL or not a date SQLite
+can parse are left out.
+
+The snapshot follows the event bus: inserted transactions are appended by
+loading only the rows with a higher id; any other change to transactions
+(edits, deletes, recalculated conversions, a database swap) reloads it.
+
+The arrays are also kept in a memory-mapped file next to the database
+(<db>.columns, see app.services.column_cache), so a cold start maps the
+columns instead of reading every row, then tops up with the rows added
+since. The file is stamped with ledger_meta's ledger id and tx_generation,
+which triggers bump on deletes and rewrites of the cached columns; a
+stale stamp means a full load and a rewritten file. FINET_COLUMN_CACHE=0
+keeps the snapshot in memory only.
+
+NumPy is optional. Without it get_snapshot() returns None and analytics
+falls back to the row-based path.
+"""
+
+import os
+import threading
+from datetime import date
+from typing import NamedTuple, Optional
+
+from app.db.connection import get_db_connection, get_db_path
+from app.events import subscribe, topic_generation
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install finet[analytics]
+    np = None
+else:
+    from app.services.column_cache import ColumnFile
+
+_COLUMNS_SQL = """
+    SELECT id,
+           CAST(julianday(date) - 1721424.5 AS INTEGER),
+           CAST(substr(date, 1, 4) AS INTEGER) * 12
+               + CAST(substr(date, 6, 2) AS INTEGER) - 1,
+           amount_converted,
+           COALESCE(category_id, -1),
+           COALESCE(account_id, -1)
+    FROM transactions
+    WHERE id > ? AND julianday(date) IS NOT NULL
+    ORDER BY id
+"""
+
+_DTYPE = [
+    ("id", "i8"),
+    ("day", "i4"),
+    ("month", "i4"),
+    ("amount", "f8"),
+    ("category", "i8"),
+    ("account", "i8"),
+]
+
+
+class Columns(NamedTuple):
+    """
+    One immutable version of the snapshot. Arrays are replaced, never
+    changed in place, so a Columns stays valid while the snapshot moves on.
+    """
+
+    id: "np.ndarray"
+    day: "np.ndarray"
+    month: "np.ndarray"
+    amount: "np.ndarray"
+    category: "np.ndarray"
+    account: "np.ndarray"
+
+    def __len__(self):
+        return len(self.id)
+
+
+def _read_stamp(conn):
+    stamp = dict(
+        conn.execute(
+            "SELECT key, value FROM ledger_meta"
+            " WHERE key IN ('ledger_id', 'tx_generation')"
+        ).fetchall()
+    )
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()
+    return (stamp["ledger_id"], int(stamp["tx_generation"])), max_id[0]
+
+
+def _current_stamp():
+    conn = get_db_connection()
+    try:
+        return _read_stamp(conn)
+    finally:
+        conn.close()
+
+
+def _load(after_id: int):
+    """
+    Rows with id > after_id and the ledger stamp, read in one transaction
+    so they agree.
+    """
+    conn = get_db_connection()
+    try:
+        conn.execute("BEGIN")
+        stamp, _ = _read_stamp(conn)
+        cur = conn.execute(_COLUMNS_SQL, (after_id,))
+        cur.row_factory = None
+        rows = cur.fetchall()
+        conn.rollback()
+    finally:
+        conn.close()
+    table = np.array(rows, dtype=_DTYPE) if rows else np.empty(0, dtype=_DTYPE)
+    columns = Columns(*(np.ascontiguousarray(table[name]) for name, _ in _DTYPE))
+    return columns, stamp
+
+
+def _last_id(cols: Columns) -> int:
+    return int(cols.id[-1]) if len(cols) else 0
+
+
+class AnalyticsSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._columns: Optional[Columns] = None
+        self._stamp = None
+        self._generation = None
+        self._reload = True
+        self._file = None
+        subscribe(("transactions",), self._on_change)
+
+    def _on_change(self, change):
+        if change.op != "insert":
+            self._reload = True
+
+    def columns(self) -> Columns:
+        """
+        The snapshot as of the last committed transaction write.
+        """
+        generation = topic_generation("transactions")
+        if generation == self._generation and not self._reload:
+            return self._columns
+        with self._lock:
+            generation = topic_generation("transactions")
+            if generation == self._generation and not self._reload:
+                return self._columns
+            full, self._reload = self._reload or self._columns is None, False
+            if full:
+                self._cold_load()
+            else:
+                added, stamp = _load(_last_id(self._columns))
+                if stamp != self._stamp:
+                    # Rows were rewritten as well; the change event for
+                    # that may still be on its way.
+                    self._full_load()
+                else:
+                    self._columns = self._extend(self._columns, added)
+            self._generation = generation
+            return self._columns
+
+    def _cold_load(self):
+        path = get_db_path()
+        if os.getenv("FINET_COLUMN_CACHE") == "0" or path == ":memory:":
+            self._file = None
+        elif self._file is None or self._file.path != path + ".columns":
+            self._file = ColumnFile(path + ".columns", _DTYPE)
+
+        if self._file is not None:
+            stamp, max_id = _current_stamp()
+            try:
+                opened = self._file.open(stamp, max_id)
+            except (OSError, ValueError) as e:
+                print(f"[Analytics] Column cache unreadable ({e}); rebuilding")
+                opened = None
+            if opened is not None:
+                views, hwm = opened
+                added, loaded_stamp = _load(hwm)
+                if loaded_stamp == stamp:
+                    self._stamp = stamp
+                    self._columns = self._extend(Columns(*views), added)
+                    return
+        self._full_load()
+
+    def _full_load(self):
+        columns, self._stamp = _load(0)
+        self._columns = self._persist(columns)
+
+    def _extend(self, current: Columns, added: Columns) -> Columns:
+        if not len(added):
+            return current
+        if self._file is not None:
+            try:
+                views = self._file.append(added, _last_id(added), self._stamp)
+            except (OSError, ValueError) as e:
+                print(f"[Analytics] Column cache append failed ({e})")
+                views = None
+            if views is not None:
+                return Columns(*views)
+        merged = Columns(*(np.concatenate(pair) for pair in zip(current, added)))
+        return self._persist(merged)
+
+    def _persist(self, columns: Columns) -> Columns:
+        """
+        Rewrites the column file from columns and returns views of it, or
+        columns itself when there is no usable file.
+        """
+        if self._file is None:
+            return columns
+        try:
+            return Columns(*self._file.write(columns, _last_id(columns), self._stamp))
+        except OSError as e:
+            # e.g. a read-only data directory, or a file still mapped on
+            # Windows; the snapshot works the same from memory.
+            print(f"[Analytics] Column cache disabled: {e}")
+            self._file = None
+            return columns
+
+
+_snapshot: Optional[AnalyticsSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot() -> Optional[AnalyticsSnapshot]:
+    """
+    The process-wide snapshot, or None when NumPy is not installed (or
+    FINET_NUMPY_ANALYTICS=0).
+    """
+    global _snapshot
+    if np is None or os.getenv("FINET_NUMPY_ANALYTICS") == "0":
+        return None
+    if _snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                _snapshot = AnalyticsSnapshot()
+    return _snapshot
+
+
+# ---------- Vectorised aggregates ----------
+
+
+def since_mask(cols: Columns, start: Optional[date]):
+    """
+    Boolean mask of rows on or after start (all rows for None).
+    """
+    if start is None:
+        return np.ones(len(cols), dtype=bool)
+    return cols.day >= start.toordinal()
+
+
+def sum_by(keys, values):
+    """
+    {key: sum of values} over matching positions of two arrays.
+    """
+    if not len(keys):
+        return {}
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, weights=values, minlength=len(uniq))
+    return dict(zip(uniq.tolist(), totals.tolist()))
+
+
+def kpis(amount, day) -> dict:
+    income = float(amount[amount > 0].sum())
+    expense = float(-amount[amount < 0].sum())
+    days = len(np.unique(day)) if len(day) else 0
+    return {
+        "income": income,
+        "expense": expense,
+        "net": income - expense,
+        "avg_daily_spend": expense / max(1, days) if len(day) else 0.0,
+        "count": int(len(amount)),
+    }
+
+
+def daily_spend(amount, day, end: date, days: int) -> list:
+    """
+    Spending (absolute value of negative amounts) per day for the `days`
+    days up to end, as [(date, value)].
+    """
+    first = end.toordinal() - days + 1
+    window = (day >= first) & (day <= end.toordinal()) & (amount < 0)
+    totals = np.bincount(day[window] - first, weights=-amount[window], minlength=days)
+    return [(date.fromordinal(first + i), float(v)) for i, v in enumerate(totals)]
@@ -1,13 +1,52 @@
+import os
+import threading
+
 from app.db.connection import init_db
+from app.db.profiling import enable_from_env as enable_sql_profiling_from_env
 from app.db.recurring import generate_due_transactions
+from app.utils.instrumentation import enable_from_env as enable_instrumentation_from_env
 
 
-def initialize(database_path: str):
+def initialize(database_path: str, run_recurring: bool = True):
     """
     Initializes the application, starting with the database.
+    With run_recurring=False the recurring catch-up is left to the caller
+    (see start_recurring_catch_up).
     """
+    enable_sql_profiling_from_env()
+    enable_instrumentation_from_env()
     init_db(database_path)
+    if os.getenv("FINET_METRICS_PORT"):
+        # Imported only when enabled: metrics loads the analytics stack.
+        from app.services.metrics import start_from_env as start_metrics_from_env
+
+        start_metrics_from_env()
+
+    if run_recurring:
+        created = generate_due_transactions()
+        if created:
+            print(f"[recurring] Generated {created} pending recurring transactions.")
+
+
+def start_recurring_catch_up(on_done=None) -> threading.Thread:
+    """
+    Generates due recurring transactions on a background thread so the UI
+    can render first. Each pattern commits separately, so UI writes are
+    not locked out for the whole catch-up. on_done(created) is called from
+    that thread.
+    """
+
+    def worker():
+        try:
+            created = generate_due_transactions()
+        except Exception as ex:
+            print(f"[recurring] Catch-up failed: {ex}")
+            return
+        if created:
+            print(f"[recurring] Generated {created} pending recurring transactions.")
+        if on_done:
+            on_done(created)
 
-    created = generate_due_transactions()
-    if created:
-        print(f"[recurring] Generated {created} pending recurring transactions.")
+    t = threading.Thread(target=worker, name="recurring-catch-up", daemon=True)
+    t.start()
+    return t
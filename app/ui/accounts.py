@@ -10,7 +10,10 @@ from app.db.accounts import (
     get_account_balances,
     delete_account_balance,
 )
+from app.db.connection import unit_of_work
 from app.services.converter import get_active_currency_codes
+from app.ui.refresh import get_refresh_scheduler
+from app.utils.instrumentation import instrument
 
 ACCOUNT_TYPES = ["Cash", "Bank", "Credit Card"]
 
@@ -165,25 +168,25 @@ def accounts_page(page: ft.Page):
         if not name_field.value.strip():
             snack("Account name required", WARNING)
             return
-        acc_id = add_account(
-            name_field.value.strip(),
-            type_field.value or "Cash",
-            notes_field.value.strip(),
-        )
-        for row in add_currency_rows:
-            ccy = row["currency"].value
-            if not ccy:
-                continue
-            amt = parse_amount(row["amount"].value) or 0.0
-            add_account_balance(acc_id, ccy, amt)
-
-            threshold = parse_amount(row["threshold"].value)
-            if threshold is not None:
-                set_account_balance_threshold(acc_id, ccy, threshold)
+        with unit_of_work():
+            acc_id = add_account(
+                name_field.value.strip(),
+                type_field.value or "Cash",
+                notes_field.value.strip(),
+            )
+            for row in add_currency_rows:
+                ccy = row["currency"].value
+                if not ccy:
+                    continue
+                amt = parse_amount(row["amount"].value) or 0.0
+                add_account_balance(acc_id, ccy, amt)
+
+                threshold = parse_amount(row["threshold"].value)
+                if threshold is not None:
+                    set_account_balance_threshold(acc_id, ccy, threshold)
 
-        refresh_accounts()
         clear_add_form()
-        snack("Account added!", SUCCESS)
+        refresh.notify("Account added!", SUCCESS)
 
     add_currency_btn = ft.OutlinedButton(
         "Add Currency",
@@ -241,46 +244,45 @@ def accounts_page(page: ft.Page):
             return
 
         acc_id = edit_account_id[0]
-        update_account(
-            acc_id,
-            name=edit_name_field.value.strip(),
-            type=edit_type_field.value or "Cash",
-            notes=edit_notes_field.value.strip(),
-        )
+        with unit_of_work():
+            update_account(
+                acc_id,
+                name=edit_name_field.value.strip(),
+                type=edit_type_field.value or "Cash",
+                notes=edit_notes_field.value.strip(),
+            )
 
-        current_balances_in_db = get_account_balances(acc_id)
-        currencies_in_ui = set()
+            current_balances_in_db = get_account_balances(acc_id)
+            currencies_in_ui = set()
 
-        for row in edit_currency_rows:
-            ccy = row["currency"].value
-            if not ccy:
-                continue
+            for row in edit_currency_rows:
+                ccy = row["currency"].value
+                if not ccy:
+                    continue
 
-            currencies_in_ui.add(ccy)
-            amt = parse_amount(row["amount"].value) or 0.0
-            threshold = parse_amount(row["threshold"].value)
+                currencies_in_ui.add(ccy)
+                amt = parse_amount(row["amount"].value) or 0.0
+                threshold = parse_amount(row["threshold"].value)
 
-            existing = next(
-                (b for b in current_balances_in_db if b["currency"] == ccy), None
-            )
+                existing = next(
+                    (b for b in current_balances_in_db if b["currency"] == ccy), None
+                )
 
-            if existing:
-                delta = amt - existing["balance"]
-                if delta != 0:
-                    add_account_balance(acc_id, ccy, delta)
-            else:
-                add_account_balance(acc_id, ccy, amt)
+                if existing:
+                    delta = amt - existing["balance"]
+                    if delta != 0:
+                        add_account_balance(acc_id, ccy, delta)
+                else:
+                    add_account_balance(acc_id, ccy, amt)
 
-            set_account_balance_threshold(acc_id, ccy, threshold)
+                set_account_balance_threshold(acc_id, ccy, threshold)
 
-        for b in current_balances_in_db:
-            if b["currency"] not in currencies_in_ui:
-                delete_account_balance(acc_id, b["currency"])
+            for b in current_balances_in_db:
+                if b["currency"] not in currencies_in_ui:
+                    delete_account_balance(acc_id, b["currency"])
 
         edit_dialog.open = False
-        refresh_accounts()
-        snack("Account updated", SUCCESS)
-        page.update()
+        refresh.notify("Account updated", SUCCESS)
 
     def cancel_edit(e):
         edit_dialog.open = False
@@ -355,6 +357,7 @@ def accounts_page(page: ft.Page):
         page.dialog = transfer_dialog
         page.update()
 
+    @instrument("accounts.do_transfer")
     def do_transfer(e):
         if not (
             transfer_from.value
@@ -373,12 +376,15 @@ def accounts_page(page: ft.Page):
             snack("Amount must be > 0", WARNING)
             return
 
-        add_account_balance(int(transfer_from.value), transfer_ccy.value, -amt_val)
-        add_account_balance(int(transfer_to.value), transfer_ccy.value, amt_val)
+        with unit_of_work():
+            add_account_balance(
+                int(transfer_from.value), transfer_ccy.value, -amt_val, kind="transfer"
+            )
+            add_account_balance(
+                int(transfer_to.value), transfer_ccy.value, amt_val, kind="transfer"
+            )
         transfer_dialog.open = False
-        refresh_accounts()
-        snack("Transfer complete", SUCCESS)
-        page.update()
+        refresh.notify("Transfer complete", SUCCESS)
 
     transfer_dialog.content = ft.Container(
         ft.Column(
@@ -522,7 +528,7 @@ def accounts_page(page: ft.Page):
             ),
         )
 
-    def refresh_accounts():
+    def refresh_accounts(update: bool = True):
         accounts_column.controls.clear()
         data = get_accounts()
         if not data:
@@ -538,13 +544,15 @@ def accounts_page(page: ft.Page):
         else:
             for acc in data:
                 accounts_column.controls.append(build_card(acc))
-        if accounts_column.page:
+        if update and accounts_column.page:
             accounts_column.update()
 
+    refresh = get_refresh_scheduler(page)
+    refresh.register("accounts", lambda: refresh_accounts(update=False))
+
     def delete_account_ui(acc_id):
         delete_account(acc_id)
-        refresh_accounts()
-        snack("Account deleted", DANGER)
+        refresh.notify("Account deleted", DANGER)
 
     # ========== Snack helper ==========
     def snack(msg, color):
@@ -640,6 +648,7 @@ def accounts_page(page: ft.Page):
         expand=True,
         alignment=ft.alignment.top_center,
         bgcolor=BG,
+        data=refresh_accounts,
     )
 
     return root
@@ -3,6 +3,8 @@ import flet as ft
 from app.db.categories import get_categories
 from app.db.budgets import get_budgets, add_budget, update_budget, delete_budget
 from app.db.transactions import get_category_spend
+from app.ui.refresh import get_refresh_scheduler
+from app.utils.instrumentation import instrument
 
 
 class UX:
@@ -64,12 +66,6 @@ def budgets_page(page: ft.Page):
         except (TypeError, ValueError):
             return default
 
-    def snack(msg: str, color=UX.ACCENT):
-        page.snack_bar = ft.SnackBar(ft.Text(msg), bgcolor=color)
-        page.snack_bar.open = True
-        if page:
-            page.update()
-
     # ------------- Add Form State -------------
     period_choices = [
         ("monthly", "Monthly"),
@@ -210,9 +206,8 @@ def budgets_page(page: ft.Page):
                 start_date=s_val,
                 end_date=e_val,
             )
-            close_edit()
-            refresh_budgets()
-            snack("Budget updated", UX.SUCCESS)
+            edit_dialog.open = False
+            refresh.notify("Budget updated", UX.SUCCESS)
         except Exception as ex:
             edit_feedback.value = f"Error: {ex}"
             page.update()
@@ -300,8 +295,7 @@ def budgets_page(page: ft.Page):
 
     def delete_budget_ui(budget_id):
         delete_budget(budget_id)
-        refresh_budgets()
-        snack("Budget deleted", UX.DANGER)
+        refresh.notify("Budget deleted", UX.DANGER)
 
     def build_budget_card(
         b: dict, spent_positive: float, percent: float, raw_signed: float
@@ -436,7 +430,8 @@ def budgets_page(page: ft.Page):
             shadow=UX.SHADOW,
         )
 
-    def refresh_budgets():
+    @instrument("budgets.refresh_budgets")
+    def refresh_budgets(update: bool = True):
         budgets_container.controls.clear()
         budgets = get_budgets()
         selected_period = filter_period.value
@@ -478,9 +473,12 @@ def budgets_page(page: ft.Page):
                     border_radius=UX.R_LG,
                 )
             )
-        if budgets_container.page:
+        if update and budgets_container.page:
             budgets_container.update()
 
+    refresh = get_refresh_scheduler(page)
+    refresh.register("budgets", lambda: refresh_budgets(update=False))
+
     filter_period.on_change = lambda e: refresh_budgets()
 
     # ------------- Add Budget Logic -------------
@@ -516,11 +514,9 @@ def budgets_page(page: ft.Page):
                 e_val = end_field.value
 
             add_budget(int(category_field.value), per, amount, s_val, e_val)
-            snack("Budget added", UX.SUCCESS)
             amount_field.value = ""
             form_feedback.value = ""
-            refresh_budgets()
-            page.update()
+            refresh.notify("Budget added", UX.SUCCESS)
         except Exception as ex:
             form_feedback.value = f"Error: {ex}"
             page.update()
@@ -619,6 +615,7 @@ def budgets_page(page: ft.Page):
         expand=True,
         alignment=ft.alignment.top_center,
         bgcolor=UX.BG,
+        data=refresh_budgets,
     )
 
     return root
@@ -0,0 +1,73 @@
+"""
+Keyed canvas shapes.
+
+Rebuilding a chart as a fresh list of cv.Shape objects makes Flet send
+every shape to the client again. KeyedCanvas keeps one shape per key
+(e.g. ("income", "point", "2024-05")) and, when given a new list, copies
+only the properties that changed onto the shapes it already has. Flet then
+ships just those property changes plus any added or removed shapes.
+"""
+
+from typing import Hashable, NamedTuple
+
+import flet as ft
+import flet.canvas as cv
+
+# Properties compared and copied per shape type. Other shape types are
+# replaced whenever they are passed in again.
+SHAPE_FIELDS = {
+    cv.Line: ("x1", "y1", "x2", "y2", "paint"),
+    cv.Circle: ("x", "y", "radius", "paint"),
+    cv.Rect: ("x", "y", "width", "height", "border_radius", "paint"),
+    cv.Text: ("x", "y", "text", "style", "alignment"),
+    cv.Path: ("elements", "paint"),
+}
+
+
+class ChartFrame(NamedTuple):
+    """
+    One render of a chart: keyed shapes in paint order, the canvas height
+    and the controls shown next to / below the canvas (legend, footer).
+    """
+
+    shapes: list[tuple[Hashable, ft.Control]]
+    height: int
+    extra: list[ft.Control] = []
+
+
+class KeyedCanvas(cv.Canvas):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._keyed: dict[Hashable, ft.Control] = {}
+
+    def set_shapes(self, keyed_shapes: list[tuple[Hashable, ft.Control]]) -> dict:
+        """
+        Makes the canvas show keyed_shapes, reusing existing shapes with the
+        same key and type. Returns counts of added, changed, unchanged and
+        removed shapes.
+        """
+        stats = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+        keyed: dict[Hashable, ft.Control] = {}
+        ordered: list[ft.Control] = []
+        for key, new in keyed_shapes:
+            old = self._keyed.get(key)
+            fields = SHAPE_FIELDS.get(type(new))
+            if old is None or type(old) is not type(new) or fields is None:
+                shape = new
+                stats["added"] += 1
+            else:
+                shape = old
+                changed = False
+                for name in fields:
+                    value = getattr(new, name)
+                    if getattr(old, name) != value:
+                        setattr(old, name, value)
+                        changed = True
+                stats["changed" if changed else "unchanged"] += 1
+            keyed[key] = shape
+            ordered.append(shape)
+
+        stats["removed"] = sum(1 for k in self._keyed if k not in keyed)
+        self._keyed = keyed
+        self.shapes = ordered
+        return stats
@@ -1,21 +1,29 @@
 import flet as ft
 import flet.canvas as cv
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from collections import defaultdict
 from app.db.recurring import get_upcoming_recurring
 from app.db.transactions import (
     get_recent_transactions,
-    get_transactions_for_analytics,
     get_category_spend,
 )
 from app.db.accounts import get_accounts, get_low_balance_alerts
-from app.db.categories import get_categories
 from app.db.budgets import get_budgets
+from app.services.analytics import (
+    balance_series_for_timeframe,
+    get_timeframe_dataset,
+)
 from app.services.converter import (
     convert_to_base,
     get_base_currency,
     get_currency_symbol,
 )
+from app.services.downsample import downsample_indices
+from app.ui.charts import ChartFrame, KeyedCanvas
+from app.ui.refresh import get_refresh_scheduler
+from app.utils.instrumentation import instrument
 from app.ui.transactions import get_icon_by_name
 
 # ============================================================
@@ -124,38 +132,6 @@ def fmt_number(
             return fallback_num
 
 
-def month_key(date_str: str) -> str:
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m")
-    except Exception:
-        return "0000-00"
-
-
-def filter_transactions_by_timeframe(transactions: list[dict], code: str) -> list[dict]:
-    if not transactions:
-        return []
-    if code == "ALL":
-        return transactions
-    today = datetime.today().date()
-    if code == "30D":
-        start = today - timedelta(days=30)
-    elif code == "90D":
-        start = today - timedelta(days=90)
-    elif code == "YTD":
-        start = datetime(today.year, 1, 1).date()
-    else:
-        return transactions
-    res = []
-    for t in transactions:
-        try:
-            d = datetime.strptime(t["date"], "%Y-%m-%d").date()
-            if d >= start:
-                res.append(t)
-        except Exception:
-            pass
-    return res
-
-
 def empty_state(title: str, subtitle: str = "No data available"):
     return ft.Container(
         ft.Column(
@@ -237,25 +213,14 @@ def Card(
 # ============================================================
 
 
-def build_kpi_row(txs: list[dict]) -> ft.Control:
-    total_income = sum(t["amount_converted"] for t in txs if t["amount_converted"] > 0)
-    total_expense = sum(
-        abs(t["amount_converted"]) for t in txs if t["amount_converted"] < 0
-    )
-    net = total_income - total_expense
-    avg_daily = 0.0
-    if txs:
-        unique_days = {t["date"] for t in txs}
-        avg_daily = total_expense / max(1, len(unique_days))
-
-    transaction_count = len(txs)
-
+def build_kpi_row(kpis: dict) -> ft.Control:
+    net = kpis["net"]
     metrics = [
-        ("Income", total_income, THEME.POSITIVE),
-        ("Expense", total_expense, THEME.NEGATIVE),
+        ("Income", kpis["income"], THEME.POSITIVE),
+        ("Expense", kpis["expense"], THEME.NEGATIVE),
         ("Net", net, THEME.POSITIVE if net >= 0 else THEME.NEGATIVE),
-        ("Avg Daily Spend", avg_daily, THEME.WARNING),
-        ("Transactions", transaction_count, THEME.PURPLE),
+        ("Avg Daily Spend", kpis["avg_daily_spend"], THEME.WARNING),
+        ("Transactions", kpis["count"], THEME.PURPLE),
     ]
 
     chips = []
@@ -407,18 +372,63 @@ def build_accounts_section(accounts) -> ft.Control:
     )
 
 
+# ============================================================
+# CHART SECTIONS
+# ============================================================
+
+
+class ChartSection:
+    """
+    Dashboard card around a KeyedCanvas. The card is built once; render()
+    patches the canvas and swaps the extra controls, so a refresh only
+    sends the shapes that actually changed.
+    """
+
+    def __init__(self, title: str, icon: str, side_extra: bool = False):
+        self.empty = empty_state(title)
+        self.canvas = KeyedCanvas(width=560, height=100)
+        self.extra = ft.Column(spacing=10)
+        if side_extra:
+            self.body = ft.Row(
+                [self.canvas, self.extra],
+                spacing=20,
+                alignment=ft.MainAxisAlignment.START,
+            )
+        else:
+            self.body = ft.Column([self.canvas, self.extra], spacing=10)
+        self.card = Card(self.empty, self.body, title=title, icon=icon)
+
+    def render(self, frame: ChartFrame | None) -> ft.Control:
+        self.empty.visible = frame is None
+        self.body.visible = frame is not None
+        if frame is not None:
+            self.canvas.height = frame.height
+            self.canvas.set_shapes(frame.shapes)
+            self.extra.controls = list(frame.extra)
+            self.extra.visible = bool(frame.extra)
+        return self.card
+
+
+def new_chart_sections() -> dict[str, ChartSection]:
+    return {
+        "category": ChartSection(
+            "Category Breakdown", ft.Icons.DONUT_SMALL, side_extra=True
+        ),
+        "line": ChartSection("Income vs Expense (Monthly)", ft.Icons.SHOW_CHART),
+        "balance": ChartSection("Balance Over Time", ft.Icons.STACKED_LINE_CHART),
+        "sparkline": ChartSection("Daily Spend (Last 14 days)", ft.Icons.TIMELAPSE),
+        "budgets": ChartSection("Budget Utilization", ft.Icons.DATA_USAGE),
+    }
+
+
 # ============================================================
 # CATEGORY BAR CHART (signed amounts)
 # ============================================================
 
 
-def build_category_bar_chart(cat_amounts: dict[str, float]) -> ft.Control:
+def category_chart_frame(cat_amounts: dict[str, float]) -> ChartFrame | None:
     if not cat_amounts:
-        return Card(
-            empty_state("Category Breakdown"),
-            title="Category Breakdown",
-            icon=ft.Icons.DONUT_SMALL,
-        )
+        return None
 
     cat_amounts = dict(
         sorted(cat_amounts.items(), key=lambda x: abs(x[1]), reverse=True)
@@ -430,7 +440,7 @@ def build_category_bar_chart(cat_amounts: dict[str, float]) -> ft.Control:
     usable_w = 360
     top_pad = 10
 
-    shapes: list[cv.Shape] = []
+    shapes = []
     for idx, (cat, amt) in enumerate(cat_amounts.items()):
         y = top_pad + idx * (bar_h + gap)
         abs_amt = abs(amt)
@@ -439,42 +449,53 @@ def build_category_bar_chart(cat_amounts: dict[str, float]) -> ft.Control:
         is_expense = amt < 0
         color = THEME.NEGATIVE if is_expense else THEME.POSITIVE
         shapes.append(
-            cv.Rect(
-                x=bar_x,
-                y=y,
-                width=usable_w,
-                height=bar_h,
-                paint=ft.Paint(color=THEME.SURFACE_SUBTLE),
+            (
+                (cat, "track"),
+                cv.Rect(
+                    x=bar_x,
+                    y=y,
+                    width=usable_w,
+                    height=bar_h,
+                    paint=ft.Paint(color=THEME.SURFACE_SUBTLE),
+                ),
             )
         )
         shapes.append(
-            cv.Rect(
-                x=bar_x,
-                y=y,
-                width=bar_w,
-                height=bar_h,
-                paint=ft.Paint(color=color),
+            (
+                (cat, "bar"),
+                cv.Rect(
+                    x=bar_x,
+                    y=y,
+                    width=bar_w,
+                    height=bar_h,
+                    paint=ft.Paint(color=color),
+                ),
             )
         )
         shapes.append(
-            cv.Text(
-                12,
-                y + 6,
-                cat,
-                ft.TextStyle(size=13, weight=ft.FontWeight.W_600, color=THEME.TEXT),
+            (
+                (cat, "name"),
+                cv.Text(
+                    12,
+                    y + 6,
+                    cat,
+                    ft.TextStyle(size=13, weight=ft.FontWeight.W_600, color=THEME.TEXT),
+                ),
             )
         )
         shapes.append(
-            cv.Text(
-                bar_x + bar_w + 12,
-                y + 6,
-                fmt_number(abs_amt),
-                ft.TextStyle(size=12, color=color, weight=ft.FontWeight.BOLD),
+            (
+                (cat, "value"),
+                cv.Text(
+                    bar_x + bar_w + 12,
+                    y + 6,
+                    fmt_number(abs_amt),
+                    ft.TextStyle(size=12, color=color, weight=ft.FontWeight.BOLD),
+                ),
             )
         )
 
     canvas_h = max(100, top_pad + len(cat_amounts) * (bar_h + gap))
-    canvas = cv.Canvas(width=560, height=canvas_h, shapes=shapes)
 
     total_abs = sum(abs(v) for v in cat_amounts.values()) or 1
     legend_items = list(cat_amounts.items())[:6]
@@ -500,12 +521,7 @@ def build_category_bar_chart(cat_amounts: dict[str, float]) -> ft.Control:
         ],
         spacing=6,
     )
-
-    return Card(
-        ft.Row([canvas, legend], spacing=20, alignment=ft.MainAxisAlignment.START),
-        title="Category Breakdown",
-        icon=ft.Icons.DONUT_SMALL,
-    )
+    return ChartFrame(shapes, canvas_h, [legend])
 
 
 # ============================================================
@@ -513,7 +529,10 @@ def build_category_bar_chart(cat_amounts: dict[str, float]) -> ft.Control:
 # ============================================================
 
 
-def build_income_expense_line_chart(month_income, month_expense) -> ft.Control:
+MONTHLY_CHART_POINTS = 60
+
+
+def income_expense_chart_frame(month_income, month_expense) -> ChartFrame:
     width = 560
     height = 260
     ml, mb, mt, mr = 55, 42, 24, 20
@@ -528,107 +547,167 @@ def build_income_expense_line_chart(month_income, month_expense) -> ft.Control:
     plot_w = width - ml - mr
     plot_h = height - mt - mb
 
+    # Long histories are reduced to MONTHLY_CHART_POINTS months (LTTB over
+    # both series); kept points stay at their real position on the axis.
+    month_count = len(months)
+    kept = downsample_indices(
+        [
+            [income_map.get(m, 0) for m in months],
+            [expense_map.get(m, 0) for m in months],
+        ],
+        MONTHLY_CHART_POINTS,
+    )
+    month_index = {months[i]: i for i in kept}
+    months = [months[i] for i in kept]
+    show_values = len(months) <= 24
+    label_every = max(1, -(-len(months) // 12))
+
     def x_pos(i):
+        i = month_index[months[i]]
         return ml + (
-            plot_w // 2 if len(months) <= 1 else int(i * (plot_w / (len(months) - 1)))
+            plot_w // 2 if month_count <= 1 else int(i * (plot_w / (month_count - 1)))
         )
 
     def y_pos(val):
         r = val / max_val
         return mt + (plot_h - int(plot_h * r))
 
-    shapes: list[cv.Shape] = []
+    shapes = []
     steps = 5
     for i in range(steps + 1):
         val = max_val * i / steps
         y = y_pos(val)
         shapes.append(
-            cv.Line(
-                x1=ml, y1=y, x2=ml + plot_w, y2=y, paint=ft.Paint(color=THEME.BORDER)
+            (
+                ("grid", i),
+                cv.Line(
+                    x1=ml,
+                    y1=y,
+                    x2=ml + plot_w,
+                    y2=y,
+                    paint=ft.Paint(color=THEME.BORDER),
+                ),
             )
         )
         shapes.append(
-            cv.Text(
-                8,
-                y - 8,
-                f"{val:.0f}",
-                ft.TextStyle(size=11, color=THEME.TEXT_MUTED),
+            (
+                ("grid-label", i),
+                cv.Text(
+                    8,
+                    y - 8,
+                    f"{val:.0f}",
+                    ft.TextStyle(size=11, color=THEME.TEXT_MUTED),
+                ),
             )
         )
 
     shapes.append(
-        cv.Line(
-            x1=ml, y1=mt, x2=ml, y2=mt + plot_h, paint=ft.Paint(color=THEME.TEXT_MUTED)
+        (
+            ("axis", "y"),
+            cv.Line(
+                x1=ml,
+                y1=mt,
+                x2=ml,
+                y2=mt + plot_h,
+                paint=ft.Paint(color=THEME.TEXT_MUTED),
+            ),
         )
     )
     shapes.append(
-        cv.Line(
-            x1=ml,
-            y1=mt + plot_h,
-            x2=ml + plot_w,
-            y2=mt + plot_h,
-            paint=ft.Paint(color=THEME.TEXT_MUTED),
+        (
+            ("axis", "x"),
+            cv.Line(
+                x1=ml,
+                y1=mt + plot_h,
+                x2=ml + plot_w,
+                y2=mt + plot_h,
+                paint=ft.Paint(color=THEME.TEXT_MUTED),
+            ),
         )
     )
 
     for idx, m in enumerate(months):
+        if idx % label_every and idx != len(months) - 1:
+            continue
         x = x_pos(idx)
         shapes.append(
-            cv.Text(
-                x - 26,
-                mt + plot_h + 12,
-                m,
-                ft.TextStyle(size=10, color=THEME.TEXT_MUTED),
+            (
+                ("month", m),
+                cv.Text(
+                    x - 26,
+                    mt + plot_h + 12,
+                    m,
+                    ft.TextStyle(size=10, color=THEME.TEXT_MUTED),
+                ),
             )
         )
 
-    def plot(data_map, color, lift=True):
+    def plot(series, data_map, color, lift=True):
         last = None
         for idx, m in enumerate(months):
             val = data_map.get(m, 0)
             x = x_pos(idx)
             y = y_pos(val)
-            shapes.append(cv.Circle(x=x, y=y, radius=5, paint=ft.Paint(color=color)))
+            shapes.append(
+                (
+                    (series, "point", m),
+                    cv.Circle(x=x, y=y, radius=5, paint=ft.Paint(color=color)),
+                )
+            )
             if last:
                 shapes.append(
-                    cv.Line(
-                        x1=last[0],
-                        y1=last[1],
-                        x2=x,
-                        y2=y,
-                        paint=ft.Paint(color=color, stroke_width=3),
+                    (
+                        (series, "segment", m),
+                        cv.Line(
+                            x1=last[0],
+                            y1=last[1],
+                            x2=x,
+                            y2=y,
+                            paint=ft.Paint(color=color, stroke_width=3),
+                        ),
                     )
                 )
+            if not show_values:
+                last = (x, y)
+                continue
             shapes.append(
-                cv.Text(
-                    x - 16,
-                    y - 26 if lift else y + 10,
-                    f"{val:.0f}",
-                    ft.TextStyle(size=11, weight=ft.FontWeight.BOLD, color=color),
+                (
+                    (series, "label", m),
+                    cv.Text(
+                        x - 16,
+                        y - 26 if lift else y + 10,
+                        f"{val:.0f}",
+                        ft.TextStyle(size=11, weight=ft.FontWeight.BOLD, color=color),
+                    ),
                 )
             )
             last = (x, y)
 
-    plot(income_map, THEME.POSITIVE, lift=True)
-    plot(expense_map, THEME.NEGATIVE, lift=False)
+    plot("income", income_map, THEME.POSITIVE, lift=True)
+    plot("expense", expense_map, THEME.NEGATIVE, lift=False)
 
     lx, ly = ml, mt - 18
     for label, color in [("Income", THEME.POSITIVE), ("Expense", THEME.NEGATIVE)]:
         shapes.append(
-            cv.Rect(x=lx, y=ly, width=18, height=10, paint=ft.Paint(color=color))
+            (
+                ("legend", label, "swatch"),
+                cv.Rect(x=lx, y=ly, width=18, height=10, paint=ft.Paint(color=color)),
+            )
         )
         shapes.append(
-            cv.Text(
-                lx + 26,
-                ly - 4,
-                label,
-                ft.TextStyle(size=12, color=THEME.TEXT),
+            (
+                ("legend", label, "text"),
+                cv.Text(
+                    lx + 26,
+                    ly - 4,
+                    label,
+                    ft.TextStyle(size=12, color=THEME.TEXT),
+                ),
             )
         )
         lx += 110
 
-    canvas = cv.Canvas(width=width, height=height, shapes=shapes)
-    return Card(canvas, title="Income vs Expense (Monthly)", icon=ft.Icons.SHOW_CHART)
+    return ChartFrame(shapes, height)
 
 
 # ============================================================
@@ -636,29 +715,16 @@ def build_income_expense_line_chart(month_income, month_expense) -> ft.Control:
 # ============================================================
 
 
-def build_daily_spend_sparkline(txs: list[dict], days: int = 14) -> ft.Control:
-    if not txs:
-        return Card(
-            empty_state("Daily Spend"),
-            title="Daily Spend (Last 14 days)",
-            icon=ft.Icons.TIMELAPSE,
-        )
-
-    today = datetime.today().date()
-    start = today - timedelta(days=days - 1)
-    daily_exp = defaultdict(float)
-    for t in txs:
-        try:
-            d = datetime.strptime(t["date"], "%Y-%m-%d").date()
-        except Exception:
-            continue
-        if start <= d <= today:
-            amt_conv = float(t["amount_converted"])
-            if amt_conv < 0:
-                daily_exp[d] += abs(amt_conv)
+def daily_spend_chart_frame(series: list | None) -> ChartFrame | None:
+    """
+    series: [(date, spent)] per day, oldest first (see get_timeframe_dataset).
+    """
+    if not series:
+        return None
 
-    ordered = [start + timedelta(days=i) for i in range(days)]
-    vals = [daily_exp.get(d, 0.0) for d in ordered]
+    days = len(series)
+    ordered = [d for d, _ in series]
+    vals = [v for _, v in series]
     max_val = max(vals) or 1
     width, height = 560, 140
     ml, mb, mt, mr = 8, 24, 14, 8
@@ -673,38 +739,54 @@ def build_daily_spend_sparkline(txs: list[dict], days: int = 14) -> ft.Control:
     def y_pos(v):
         return mt + (ph - int(ph * (v / max_val)))
 
-    shapes: list[cv.Shape] = []
+    # Keyed by position rather than date, so the shapes are reused as the
+    # 14-day window slides.
+    shapes = []
     last = None
     for i, v in enumerate(vals):
         x = x_pos(i)
         y = y_pos(v)
         if last:
             shapes.append(
-                cv.Line(
-                    x1=last[0],
-                    y1=last[1],
-                    x2=x,
-                    y2=y,
-                    paint=ft.Paint(color=THEME.AMBER, stroke_width=2),
+                (
+                    ("segment", i),
+                    cv.Line(
+                        x1=last[0],
+                        y1=last[1],
+                        x2=x,
+                        y2=y,
+                        paint=ft.Paint(color=THEME.AMBER, stroke_width=2),
+                    ),
                 )
             )
-        shapes.append(cv.Circle(x=x, y=y, radius=3, paint=ft.Paint(color=THEME.AMBER)))
+        shapes.append(
+            (
+                ("point", i),
+                cv.Circle(x=x, y=y, radius=3, paint=ft.Paint(color=THEME.AMBER)),
+            )
+        )
         last = (x, y)
     shapes.append(
-        cv.Line(
-            x1=ml,
-            y1=mt + ph,
-            x2=ml + pw,
-            y2=mt + ph,
-            paint=ft.Paint(color=THEME.BORDER),
+        (
+            ("baseline",),
+            cv.Line(
+                x1=ml,
+                y1=mt + ph,
+                x2=ml + pw,
+                y2=mt + ph,
+                paint=ft.Paint(color=THEME.BORDER),
+            ),
         )
     )
     shapes.append(
-        cv.Text(
-            ml,
-            mt - 6,
-            f"Max: {fmt_number(max_val, 0)}",
-            ft.TextStyle(size=10, color=THEME.AMBER),
+        (
+            ("max",),
+            cv.Text(
+                ml,
+                mt - 6,
+                f"Max: {fmt_number(max_val, 0)}",
+                ft.TextStyle(size=10, color=THEME.AMBER),
+            ),
         )
     )
     total7 = sum(vals[-7:])
@@ -718,12 +800,116 @@ def build_daily_spend_sparkline(txs: list[dict], days: int = 14) -> ft.Control:
         ],
         spacing=16,
     )
-    canvas = cv.Canvas(width=width, height=height, shapes=shapes)
-    return Card(
-        ft.Column([canvas, footer], spacing=10),
-        title=f"Daily Spend (Last {days} days)",
-        icon=ft.Icons.TIMELAPSE,
+    return ChartFrame(shapes, height, [footer])
+
+
+# ============================================================
+# BALANCE OVER TIME
+# ============================================================
+
+
+BALANCE_CHART_WIDTH, BALANCE_CHART_HEIGHT = 560, 200
+BALANCE_CHART_MARGINS = (55, 28, 16, 12)
+# One point per horizontal pixel of the plot area.
+BALANCE_CHART_POINTS = BALANCE_CHART_WIDTH - 55 - 12
+
+
+def balance_chart_frame(series: list[tuple[str, float]]) -> ChartFrame | None:
+    if len(series) < 2:
+        return None
+
+    ml, mb, mt, mr = BALANCE_CHART_MARGINS
+    pw = BALANCE_CHART_WIDTH - ml - mr
+    ph = BALANCE_CHART_HEIGHT - mt - mb
+    vals = [v for _, v in series]
+    lo, hi = min(vals + [0.0]), max(vals + [0.0])
+    span = (hi - lo) or 1
+    # The series may be downsampled, so place points by date, not position.
+    days = [datetime.strptime(d, "%Y-%m-%d").toordinal() for d, _ in series]
+    day_span = (days[-1] - days[0]) or 1
+
+    def x_pos(i):
+        return ml + int((days[i] - days[0]) * pw / day_span)
+
+    def y_pos(v):
+        return mt + (ph - int(ph * ((v - lo) / span)))
+
+    shapes = []
+    for key, v in (("low", lo), ("high", hi)):
+        y = y_pos(v)
+        shapes.append(
+            (
+                ("grid", key),
+                cv.Line(
+                    x1=ml, y1=y, x2=ml + pw, y2=y, paint=ft.Paint(color=THEME.BORDER)
+                ),
+            )
+        )
+        shapes.append(
+            (
+                ("grid-label", key),
+                cv.Text(
+                    4,
+                    y - 8,
+                    f"{v:,.0f}",
+                    ft.TextStyle(size=10, color=THEME.TEXT_MUTED),
+                ),
+            )
+        )
+    if lo < 0 < hi:
+        y0 = y_pos(0)
+        shapes.append(
+            (
+                ("zero",),
+                cv.Line(
+                    x1=ml,
+                    y1=y0,
+                    x2=ml + pw,
+                    y2=y0,
+                    paint=ft.Paint(color=THEME.NEUTRAL),
+                ),
+            )
+        )
+
+    elements = [cv.Path.MoveTo(x_pos(0), y_pos(vals[0]))]
+    elements += [cv.Path.LineTo(x_pos(i), y_pos(v)) for i, v in enumerate(vals)][1:]
+    shapes.append(
+        (
+            ("line",),
+            cv.Path(
+                elements,
+                paint=ft.Paint(
+                    color=THEME.ACCENT, stroke_width=2, style=ft.PaintingStyle.STROKE
+                ),
+            ),
+        )
     )
+    for key, i in (("start", 0), ("end", len(series) - 1)):
+        shapes.append(
+            (
+                ("date", key),
+                cv.Text(
+                    x_pos(i) - (0 if i == 0 else 60),
+                    mt + ph + 8,
+                    series[i][0],
+                    ft.TextStyle(size=10, color=THEME.TEXT_MUTED),
+                ),
+            )
+        )
+
+    change = vals[-1] - vals[0]
+    footer = ft.Row(
+        [
+            ft.Text(f"Now: {fmt_number(vals[-1])}", size=11, color=THEME.TEXT_MUTED),
+            ft.Text(
+                f"Change: {fmt_number(change)}",
+                size=11,
+                color=THEME.POSITIVE if change >= 0 else THEME.NEGATIVE,
+            ),
+        ],
+        spacing=16,
+    )
+    return ChartFrame(shapes, BALANCE_CHART_HEIGHT, [footer])
 
 
 # ============================================================
@@ -731,11 +917,11 @@ def build_daily_spend_sparkline(txs: list[dict], days: int = 14) -> ft.Control:
 # ============================================================
 
 
-def build_budget_chart(budgets: list[dict], cat_dict: dict[int, str]) -> ft.Control:
+def budget_chart_frame(
+    budgets: list[dict], cat_dict: dict[int, str]
+) -> ChartFrame | None:
     if not budgets:
-        return Card(
-            empty_state("Budgets"), title="Budget Utilization", icon=ft.Icons.DATA_USAGE
-        )
+        return None
 
     base_sym = get_currency_symbol(get_base_currency())
     spent_map = {}
@@ -744,7 +930,7 @@ def build_budget_chart(budgets: list[dict], cat_dict: dict[int, str]) -> ft.Cont
             b["category_id"], b["start_date"], b["end_date"]
         )
 
-    shapes: list[cv.Shape] = []
+    shapes = []
     bar_h = 22
     gap = 18
     bar_x = 200
@@ -757,12 +943,15 @@ def build_budget_chart(budgets: list[dict], cat_dict: dict[int, str]) -> ft.Cont
         pct = min(abs(spent) / amount, 1.0) if amount > 0 else 0
         base_y = top + idx * (bar_h + gap)
         shapes.append(
-            cv.Rect(
-                x=bar_x,
-                y=base_y,
-                width=width_full,
-                height=bar_h,
-                paint=ft.Paint(color=THEME.SURFACE_SUBTLE),
+            (
+                (b["id"], "track"),
+                cv.Rect(
+                    x=bar_x,
+                    y=base_y,
+                    width=width_full,
+                    height=bar_h,
+                    paint=ft.Paint(color=THEME.SURFACE_SUBTLE),
+                ),
             )
         )
         if pct < 0.8:
@@ -772,40 +961,52 @@ def build_budget_chart(budgets: list[dict], cat_dict: dict[int, str]) -> ft.Cont
         else:
             color = THEME.NEGATIVE
         shapes.append(
-            cv.Rect(
-                x=bar_x,
-                y=base_y,
-                width=int(width_full * pct),
-                height=bar_h,
-                paint=ft.Paint(color=color),
+            (
+                (b["id"], "bar"),
+                cv.Rect(
+                    x=bar_x,
+                    y=base_y,
+                    width=int(width_full * pct),
+                    height=bar_h,
+                    paint=ft.Paint(color=color),
+                ),
             )
         )
         shapes.append(
-            cv.Text(
-                20,
-                base_y + 5,
-                cat_dict.get(b["category_id"], "Other"),
-                ft.TextStyle(size=13, weight=ft.FontWeight.W_600, color=THEME.TEXT),
+            (
+                (b["id"], "name"),
+                cv.Text(
+                    20,
+                    base_y + 5,
+                    cat_dict.get(b["category_id"], "Other"),
+                    ft.TextStyle(size=13, weight=ft.FontWeight.W_600, color=THEME.TEXT),
+                ),
             )
         )
         shapes.append(
-            cv.Text(
-                bar_x + 10,
-                base_y + 4,
-                f"{base_sym}{abs(spent):.0f} / {base_sym}{amount:.0f}",
-                ft.TextStyle(
-                    size=11,
-                    weight=ft.FontWeight.W_600,
-                    color=ft.Colors.WHITE if pct > 0.35 else color,
+            (
+                (b["id"], "amount"),
+                cv.Text(
+                    bar_x + 10,
+                    base_y + 4,
+                    f"{base_sym}{abs(spent):.0f} / {base_sym}{amount:.0f}",
+                    ft.TextStyle(
+                        size=11,
+                        weight=ft.FontWeight.W_600,
+                        color=ft.Colors.WHITE if pct > 0.35 else color,
+                    ),
                 ),
             )
         )
         shapes.append(
-            cv.Text(
-                bar_x + width_full + 14,
-                base_y + 4,
-                f"{int(pct * 100)}%",
-                ft.TextStyle(size=11, weight=ft.FontWeight.W_600, color=color),
+            (
+                (b["id"], "percent"),
+                cv.Text(
+                    bar_x + width_full + 14,
+                    base_y + 4,
+                    f"{int(pct * 100)}%",
+                    ft.TextStyle(size=11, weight=ft.FontWeight.W_600, color=color),
+                ),
             )
         )
         if amount > 0:
@@ -814,7 +1015,6 @@ def build_budget_chart(budgets: list[dict], cat_dict: dict[int, str]) -> ft.Cont
             elif pct >= 0.9:
                 alerts.append(("Near Limit", b, color))
     canvas_h = max(120, top + len(budgets) * (bar_h + gap))
-    canvas = cv.Canvas(width=560, height=canvas_h, shapes=shapes)
     alert_controls = []
     for label, b, color in alerts:
         spent = spent_map[b["id"]]
@@ -831,11 +1031,7 @@ def build_budget_chart(budgets: list[dict], cat_dict: dict[int, str]) -> ft.Cont
                 spacing=6,
             )
         )
-    return Card(
-        ft.Column([canvas] + alert_controls, spacing=12),
-        title="Budget Utilization",
-        icon=ft.Icons.DATA_USAGE,
-    )
+    return ChartFrame(shapes, canvas_h, alert_controls)
 
 
 # ============================================================
@@ -1081,73 +1277,118 @@ def build_low_balance_alerts_card() -> ft.Control | None:
 # ============================================================
 
 
-def build_dashboard_content(timeframe_code: str) -> ft.Control:
-    accounts = get_accounts()
-    txs_all = get_transactions_for_analytics()
-    categories = get_categories()
-    cat_map = {c["id"]: c["name"] for c in categories}
-    filtered = filter_transactions_by_timeframe(txs_all, timeframe_code)
+# Sections that only need their own queries: key -> builder(timeframe_code).
+# Chart sections (see new_chart_sections) return a ChartFrame or None.
+INDEPENDENT_SECTIONS = {
+    "alerts": lambda code: build_low_balance_alerts_card(),
+    "accounts": lambda code: build_accounts_section(get_accounts()),
+    "balance": lambda code: balance_chart_frame(
+        balance_series_for_timeframe(code, max_points=BALANCE_CHART_POINTS)
+    ),
+    "upcoming": lambda code: build_upcoming_bills_card(days_ahead=30, limit=7),
+    "recent": lambda code: build_recent_transactions(),
+}
+
+# Sections built from get_timeframe_dataset(): key -> builder(data).
+TIMEFRAME_SECTIONS = {
+    "kpis": lambda d: Card(
+        build_kpi_row(d["kpis"]), title="Key Metrics", icon=ft.Icons.INSIGHTS
+    ),
+    "category": lambda d: category_chart_frame(d["cat_amounts"]),
+    "line": lambda d: income_expense_chart_frame(
+        d["income_series"], d["expense_series"]
+    ),
+    "budgets": lambda d: budget_chart_frame(get_budgets(), d["cat_map"]),
+    "sparkline": lambda d: daily_spend_chart_frame(d["daily_spend"]),
+}
+
+LEFT_SECTIONS = ["accounts", "kpis", "category", "budgets"]
+RIGHT_SECTIONS = ["alerts", "line", "balance", "sparkline", "upcoming", "recent"]
+
+_SECTION_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dashboard")
+
+
+def section_placeholder() -> ft.Control:
+    return Card(
+        ft.Row(
+            [
+                ft.ProgressRing(width=18, height=18, stroke_width=2),
+                ft.Text("Loading...", size=12, color=THEME.TEXT_MUTED),
+            ],
+            spacing=10,
+        ),
+        variant="subtle",
+    )
 
-    cat_amounts = defaultdict(float)
-    for t in filtered:
-        cat_amounts[cat_map.get(t["category_id"], "Other")] += float(
-            t["amount_converted"]
-        )
 
-    month_income = defaultdict(float)
-    month_expense = defaultdict(float)
-    for t in filtered:
-        mk = month_key(t["date"])
-        amt_conv = float(t["amount_converted"])
-        if amt_conv > 0:
-            month_income[mk] += amt_conv
-        else:
-            month_expense[mk] += abs(amt_conv)
-
-    income_series = sorted(month_income.items(), key=lambda x: x[0])
-    expense_series = sorted(month_expense.items(), key=lambda x: x[0])
-    budgets = get_budgets()
-
-    low_balance_card = build_low_balance_alerts_card()
-    kpi_row = build_kpi_row(filtered)
-    accounts_section = build_accounts_section(accounts)
-    category_chart = build_category_bar_chart(dict(cat_amounts))
-    line_chart = build_income_expense_line_chart(income_series, expense_series)
-    budget_chart = build_budget_chart(budgets, cat_map)
-    sparkline = build_daily_spend_sparkline(filtered, 14)
-    recent_section = build_recent_transactions()
-    upcoming_bills_section = build_upcoming_bills_card(days_ahead=30, limit=7)
-    left_col_controls = [
-        accounts_section,
-        Card(kpi_row, title="Key Metrics", icon=ft.Icons.INSIGHTS),
-        category_chart,
-        budget_chart,
-    ]
-    right_col_controls = [
-        line_chart,
-        sparkline,
-        upcoming_bills_section,
-        recent_section,
-    ]
-    if low_balance_card:
-        right_col_controls.insert(0, low_balance_card)
-    left_col = ft.Column(
-        left_col_controls,
-        spacing=24,
-        expand=1,
-    )
-    right_col = ft.Column(
-        right_col_controls,
-        spacing=24,
-        expand=1,
-    )
-    return ft.ResponsiveRow(
+def build_dashboard_layout() -> tuple[ft.Control, dict[str, ft.Container]]:
+    """
+    Returns the two-column layout and the slot container of every section.
+    Slots start with a placeholder and are filled by load_dashboard_sections().
+    """
+    slots = {
+        key: ft.Container(section_placeholder())
+        for key in LEFT_SECTIONS + RIGHT_SECTIONS
+    }
+    slots["alerts"].visible = False
+    left_col = ft.Column([slots[k] for k in LEFT_SECTIONS], spacing=24, expand=1)
+    right_col = ft.Column([slots[k] for k in RIGHT_SECTIONS], spacing=24, expand=1)
+    layout = ft.ResponsiveRow(
         [
             ft.Container(left_col, col={"xs": 12, "md": 6}),
             ft.Container(right_col, col={"xs": 12, "md": 6}),
         ],
         run_spacing=28,
     )
+    return layout, slots
+
+
+def load_dashboard_sections(
+    timeframe_code: str, deliver, is_stale=lambda: False, futures=None
+) -> list[Future]:
+    """
+    Computes every section on the worker pool and calls
+    deliver(key, result) from the worker as soon as each one is ready.
+    result is a control, a ChartFrame / None for chart sections, or None
+    for an alerts card with nothing to show. Sections are skipped once
+    is_stale() returns True; cancel the futures to drop the ones that have
+    not started yet. They are added to futures (a new list by default),
+    which is returned; the timeframe sections join it later, once their
+    shared data is loaded.
+    """
+    if futures is None:
+        futures = []
+
+    def run(key, builder, arg):
+        if is_stale():
+            return
+        try:
+            control = builder(arg)
+        except Exception as ex:
+            print(f"[Dashboard] Section '{key}' failed: {ex}")
+            control = Card(empty_state("Error", f"Could not load: {ex}"))
+        if not is_stale():
+            deliver(key, control)
+
+    def on_shared(shared: Future):
+        if shared.cancelled() or is_stale():
+            return
+        try:
+            data = shared.result()
+        except Exception as ex:
+            print(f"[Dashboard] Loading timeframe data failed: {ex}")
+            for key in TIMEFRAME_SECTIONS:
+                deliver(key, Card(empty_state("Error", f"Could not load: {ex}")))
+            return
+        for key, builder in TIMEFRAME_SECTIONS.items():
+            futures.append(_SECTION_POOL.submit(run, key, builder, data))
+
+    shared = _SECTION_POOL.submit(get_timeframe_dataset, timeframe_code)
+    futures.append(shared)
+    for key, builder in INDEPENDENT_SECTIONS.items():
+        futures.append(_SECTION_POOL.submit(run, key, builder, timeframe_code))
+    shared.add_done_callback(on_shared)
+    return futures
 
 
 # ============================================================
@@ -1167,16 +1408,54 @@ def dashboard_page(page: ft.Page):
         options=[ft.dropdown.Option(k, text=v) for k, v in TIMEFRAME_OPTIONS],
     )
 
-    def clear_caches():
+    layout, slots = build_dashboard_layout()
+    charts = new_chart_sections()
+    content_container.content = layout
+
+    # Each load gets a token; results carrying an older token are dropped.
+    load_token = [0]
+    pending: list[Future] = []
+    ui_lock = threading.Lock()
+
+    def deliver(token: int, key: str, result):
+        with ui_lock:
+            if token != load_token[0]:
+                return
+            if key in charts and (result is None or isinstance(result, ChartFrame)):
+                # Same card as last time; only changed shapes are sent.
+                control = charts[key].render(result)
+            else:
+                control = result
+            slot = slots[key]
+            slot.content = control
+            slot.visible = control is not None
+            slot.opacity = 1
+            if slot.page:
+                slot.update()
+
+    def start_load():
         """
-        Clears cached data to ensure UI reflects new settings if changed.
+        Starts computing every section for the selected timeframe. Sections
+        keep their previous content (dimmed) until the new one arrives, and
+        any work still queued for an older selection is cancelled.
         """
-        from app.services import converter
-
-        converter.get_base_currency.cache_clear()
-        converter.get_conversion_rates.cache_clear()
+        with ui_lock:
+            load_token[0] += 1
+            token = load_token[0]
+            for f in pending:
+                f.cancel()
+            pending.clear()
+            for slot in slots.values():
+                slot.opacity = 0.5
+        load_dashboard_sections(
+            timeframe_dropdown.value,
+            lambda key, result: deliver(token, key, result),
+            is_stale=lambda: token != load_token[0],
+            futures=pending,
+        )
 
-    content_container.content = build_dashboard_content(timeframe_dropdown.value)
+    start_load()
+    get_refresh_scheduler(page).register("dashboard", start_load)
     timestamp_chip = ft.Container(
         ft.Text(
             f"Data as of {datetime.now().strftime('%Y-%m-%d %H:%M')}",
@@ -1210,23 +1489,9 @@ def dashboard_page(page: ft.Page):
             weight=ft.FontWeight.W_600,
         )
 
+    @instrument("dashboard.timeframe_changed")
     def timeframe_changed(e):
-        content_container.content = ft.Container(
-            ft.Row(
-                [
-                    ft.ProgressRing(color=THEME.ACCENT),
-                    ft.Text("Updating...", color=THEME.TEXT_MUTED),
-                ],
-                spacing=14,
-            ),
-            padding=ft.padding.all(30),
-            alignment=ft.alignment.center,
-        )
-        content_container.update()
-
-        clear_caches()
-
-        content_container.content = build_dashboard_content(timeframe_dropdown.value)
+        start_load()
         update_timeframe_label()
         timestamp_chip.content = ft.Text(
             f"Data as of {datetime.now().strftime('%Y-%m-%d %H:%M')}",
@@ -1266,8 +1531,7 @@ def dashboard_page(page: ft.Page):
     )
 
     def on_tab_visible():
-        clear_caches()
-        content_container.content = build_dashboard_content(timeframe_dropdown.value)
+        start_load()
         if content_container.page:
             content_container.page.update()
 
@@ -1276,5 +1540,6 @@ def dashboard_page(page: ft.Page):
         padding=ft.padding.symmetric(horizontal=28, vertical=12),
         bgcolor=THEME.BG,
         expand=True,
+        data=on_tab_visible,
     )
     return root
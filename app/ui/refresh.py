@@ -0,0 +1,156 @@
+"""
+Debounced, coalesced UI refreshes.
+
+Handlers used to re-query, page.update() and show a snackbar (another
+page.update()) one after the other, so a burst of clicks re-ran the same
+queries and pushed several full updates. Now regions are marked dirty by
+the event bus when a write commits (see TOPIC_REGIONS), and handlers only
+queue their message:
+
+    refresh = get_refresh_scheduler(page)
+    refresh.register("transactions", lambda: refresh_transactions(update=False))
+    ...
+    refresh.notify("Transaction added", color)
+
+Regions are "transactions", "accounts", "budgets" and "dashboard", each
+registered by its page. Within REFRESH_WINDOW_MS every dirty region that
+is on screen is refreshed once, the last queued message is shown, and the
+page gets a single update(). Hidden tabs are left alone; main refreshes
+them when they are shown again.
+"""
+
+import threading
+import weakref
+from typing import Callable, Dict, Optional
+
+import flet as ft
+
+from app.events import Change, subscribe
+from app.utils.instrumentation import instrument
+
+# Regions that display data from each event-bus topic.
+TOPIC_REGIONS = {
+    "transactions": ("transactions", "budgets", "dashboard"),
+    "balances": ("accounts", "dashboard"),
+    "accounts": ("accounts", "transactions", "dashboard"),
+    "budgets": ("budgets", "dashboard"),
+    "categories": ("transactions", "budgets", "dashboard"),
+    "recurring": ("transactions", "dashboard"),
+    "rates": ("transactions", "accounts", "budgets", "dashboard"),
+    "currencies": ("transactions", "accounts", "budgets", "dashboard"),
+    "settings": ("transactions", "accounts", "budgets", "dashboard"),
+}
+
+REFRESH_WINDOW_MS = 60
+
+
+class RefreshScheduler:
+    def __init__(self, page: ft.Page, window_ms: int = REFRESH_WINDOW_MS):
+        self.page = page
+        self.window = window_ms / 1000
+        self._lock = threading.Lock()
+        self._regions: Dict[str, Callable[[], None]] = {}
+        self._dirty: set = set()
+        self._message: Optional[tuple] = None
+        self._timer: Optional[threading.Timer] = None
+        self.active_region: Optional[str] = None
+        self.flushes = 0
+        self.requests = 0
+        # Held weakly by the bus, so a closed session's scheduler can go.
+        subscribe("*", self._on_change)
+
+    def _on_change(self, change: Change):
+        regions = TOPIC_REGIONS.get(change.topic)
+        if regions:
+            self.mark_dirty(*regions)
+
+    def register(self, region: str, refresh: Callable[[], None]):
+        """
+        Sets the callable that reloads a region. It should update controls
+        without calling update() itself; the flush does that once.
+        A page built again replaces the previous callable.
+        """
+        with self._lock:
+            self._regions[region] = refresh
+
+    def mark_dirty(self, *regions: str):
+        with self._lock:
+            self._dirty.update(regions)
+            self.requests += 1
+            self._schedule()
+
+    def notify(self, msg: str, color=ft.Colors.BLUE_400, duration=3000):
+        """
+        Queues a snackbar for the next flush. Only the latest one is shown.
+        """
+        with self._lock:
+            self._message = (msg, color, duration)
+            self.requests += 1
+            self._schedule()
+
+    def set_active(self, region: Optional[str]):
+        """
+        Region currently on screen; flushes only refresh that one. None
+        (the default, before any tab is shown) refreshes every dirty region.
+        """
+        with self._lock:
+            self.active_region = region
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @instrument("refresh.flush")
+    def flush(self):
+        """
+        Runs the pending refreshes now (the timer calls this). Instrumented
+        as "refresh.flush": the handlers that queued the work return before
+        it runs, so this is where their refresh and update time shows up.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            dirty, self._dirty = self._dirty, set()
+            message, self._message = self._message, None
+            if self.active_region is not None:
+                dirty &= {self.active_region}
+            refreshers = [fn for r, fn in self._regions.items() if r in dirty]
+            self.flushes += 1
+
+        for refresh in refreshers:
+            try:
+                refresh()
+            except Exception as ex:
+                print(f"[Refresh] Region refresh failed: {ex}")
+
+        if message:
+            msg, color, duration = message
+            self.page.snack_bar = ft.SnackBar(
+                ft.Text(msg), bgcolor=color, duration=duration
+            )
+            self.page.snack_bar.open = True
+        try:
+            self.page.update()
+        except Exception as ex:
+            print(f"[Refresh] page.update failed: {ex}")
+
+
+_schedulers: "weakref.WeakKeyDictionary[ft.Page, RefreshScheduler]" = (
+    weakref.WeakKeyDictionary()
+)
+_schedulers_lock = threading.Lock()
+
+
+def get_refresh_scheduler(page: ft.Page) -> RefreshScheduler:
+    """
+    Returns the scheduler for a page (one per client session).
+    """
+    with _schedulers_lock:
+        scheduler = _schedulers.get(page)
+        if scheduler is None:
+            scheduler = RefreshScheduler(page)
+            _schedulers[page] = scheduler
+        return scheduler
@@ -7,13 +7,14 @@ from decimal import Decimal, InvalidOperation
 
 from app.utils.backup import backup_db, restore_db
 from app.db import settings as db_settings
-from app.db.connection import get_db_path
+from app.db.connection import get_db_path, reset_pool
+from app.db import profiling as sql_profiling
+from app.utils import instrumentation
 from app.services.converter import (
     get_active_currency_codes,
     get_currency_symbol,
-    clear_caches as clear_converter_caches,
 )
-from app.services.api import fetch_latest_rates
+from app.services.api import fetch_latest_rates_async
 from app.utils.recalculate import recalculate_all_conversions
 
 WARN_COLOR = ft.Colors.ORANGE_400
@@ -28,8 +29,7 @@ def _default_backup_name() -> str:
 
 
 def _refresh_all_currency_ui(page: ft.Page):
-    """Clears caches and triggers updates for relevant controls."""
-    clear_converter_caches()
+    """Triggers updates for relevant controls (converter caches clear themselves on commit)."""
     for ctrl in page.controls:
         pass
     page.update()
@@ -124,7 +124,6 @@ def build_manage_currencies_card(page: ft.Page) -> ft.Control:
             add_code_field.value = ""
             add_name_field.value = ""
             add_symbol_field.value = ""
-            clear_converter_caches()
             load_active_currencies()
             _refresh_all_currency_ui(page)
         except ValueError as ve:
@@ -142,7 +141,6 @@ def build_manage_currencies_card(page: ft.Page) -> ft.Control:
         try:
             db_settings.delete_currency(code_to_delete)
             snack(f"Currency '{code_to_delete}' deleted.")
-            clear_converter_caches()
             load_active_currencies()
             _refresh_all_currency_ui(page)
         except ValueError as ve:
@@ -262,17 +260,16 @@ def build_currency_settings_card(page: ft.Page) -> ft.Control:
                     snack(f"Invalid rate: {code}", ERROR_COLOR)
                     return
             db_settings.set_exchange_rates(new_rates)
-            clear_converter_caches()
             snack("Currency rates saved!")
             _refresh_all_currency_ui(page)
         except Exception as ex:
             snack(f"Error saving rates: {ex}", ERROR_COLOR)
 
-    def _fetch_rates_worker():
-        base = base_currency_dd.value
-        progress_ring.visible = True
-        page.update()
-        fetched = fetch_latest_rates(base)
+    def _apply_fetched_rates(base, future):
+        fetched = future.result()
+        if base != base_currency_dd.value:
+            # The base changed while this was in flight; a newer fetch owns the UI.
+            return
         if fetched:
             for code, field in rate_fields.items():
                 if code in fetched:
@@ -286,7 +283,12 @@ def build_currency_settings_card(page: ft.Page) -> ft.Control:
         page.update()
 
     def on_fetch_rates(e):
-        threading.Thread(target=_fetch_rates_worker, daemon=True).start()
+        base = base_currency_dd.value
+        progress_ring.visible = True
+        page.update()
+        fetch_latest_rates_async(base).add_done_callback(
+            lambda f: _apply_fetched_rates(base, f)
+        )
 
     def _recalculate_worker():
         progress_ring.visible = True
@@ -303,8 +305,7 @@ def build_currency_settings_card(page: ft.Page) -> ft.Control:
 
     def on_recalculate(e):
         save_rates(e)
-
-    threading.Thread(target=_recalculate_worker, daemon=True).start()
+        threading.Thread(target=_recalculate_worker, daemon=True).start()
 
     save_btn = ft.ElevatedButton(
         "Save Rates", icon=ft.Icons.SAVE, on_click=save_rates, bgcolor=INFO_COLOR
@@ -364,6 +365,224 @@ def build_currency_settings_card(page: ft.Page) -> ft.Control:
     )
 
 
+# ========== SQL Profiling UI ==========
+def build_sql_profile_card(page: ft.Page) -> ft.Control:
+    def snack(msg: str, color=SUCCESS_COLOR, duration=3000):
+        if not page:
+            return
+        sb = ft.SnackBar(ft.Text(msg), bgcolor=color, duration=duration)
+        page.snack_bar = sb
+        sb.open = True
+        page.update()
+
+    profiler = sql_profiling.get_profiler()
+    enabled_sw = ft.Switch(label="Profile SQL statements", value=profiler is not None)
+    slow_ms_field = ft.TextField(
+        label="Slow query threshold (ms)",
+        value=str(profiler.slow_ms if profiler else sql_profiling.DEFAULT_SLOW_MS),
+        width=220,
+    )
+    report_column = ft.Column(spacing=4)
+
+    def _slow_ms():
+        try:
+            return max(0.0, float(slow_ms_field.value))
+        except (TypeError, ValueError):
+            return None
+
+    def on_toggle(e):
+        if enabled_sw.value:
+            slow_ms = _slow_ms()
+            if slow_ms is None:
+                enabled_sw.value = False
+                snack("Invalid threshold", ERROR_COLOR)
+                return
+            sql_profiling.enable_profiling(
+                slow_ms, os.getenv("FINET_SQL_SLOW_LOG") or None
+            )
+            snack("SQL profiling enabled.", INFO_COLOR)
+        else:
+            sql_profiling.disable_profiling()
+            snack("SQL profiling disabled.", INFO_COLOR)
+
+    def on_threshold(e):
+        active = sql_profiling.get_profiler()
+        slow_ms = _slow_ms()
+        if active and slow_ms is not None:
+            active.slow_ms = slow_ms
+
+    def on_show_report(e):
+        active = sql_profiling.get_profiler()
+        report_column.controls.clear()
+        if active is None:
+            report_column.controls.append(
+                ft.Text("Profiling is off.", color=ft.Colors.GREY_600)
+            )
+        else:
+            for s in sql_profiling.rank(active.snapshot(), "total", 10):
+                report_column.controls.append(
+                    ft.Text(
+                        f"{s['total_ms']:.1f} ms ({s['share']}%), "
+                        f"{s['calls']} calls, p95 {s['p95_ms']:.2f} ms: "
+                        f"{s['sql'][:90]}",
+                        size=12,
+                        font_family="monospace",
+                    )
+                )
+            if active.slow:
+                report_column.controls.append(
+                    ft.Text(
+                        f"{len(active.slow)} slow executions (>= {active.slow_ms} ms)",
+                        size=12,
+                        color=WARN_COLOR,
+                    )
+                )
+        page.update()
+
+    def on_reset(e):
+        active = sql_profiling.get_profiler()
+        if active:
+            active.reset()
+        report_column.controls.clear()
+        page.update()
+
+    enabled_sw.on_change = on_toggle
+    slow_ms_field.on_blur = on_threshold
+    slow_ms_field.on_submit = on_threshold
+
+    return ft.Container(
+        ft.Column(
+            [
+                ft.Text("SQL Profiling", size=16, weight=ft.FontWeight.BOLD),
+                ft.Text(
+                    "Times every statement and logs slow ones. Adds overhead; "
+                    "leave it off unless you are investigating a slowdown.",
+                    size=12,
+                    color=ft.Colors.GREY_600,
+                ),
+                ft.Row([enabled_sw, slow_ms_field], spacing=12),
+                ft.Row(
+                    [
+                        ft.OutlinedButton(
+                            "Show report", icon=ft.Icons.LIST, on_click=on_show_report
+                        ),
+                        ft.TextButton("Reset", on_click=on_reset),
+                    ],
+                    spacing=12,
+                ),
+                report_column,
+            ],
+            spacing=12,
+        ),
+        padding=ft.padding.all(18),
+        bgcolor=ft.Colors.WHITE,
+        border_radius=14,
+        shadow=ft.BoxShadow(
+            spread_radius=1,
+            blur_radius=12,
+            color=ft.Colors.GREY_100,
+            offset=ft.Offset(0, 6),
+        ),
+    )
+
+
+# ========== Handler Latency UI ==========
+def build_latency_card(page: ft.Page) -> ft.Control:
+    def snack(msg: str, color=SUCCESS_COLOR, duration=3000):
+        if not page:
+            return
+        sb = ft.SnackBar(ft.Text(msg), bgcolor=color, duration=duration)
+        page.snack_bar = sb
+        sb.open = True
+        page.update()
+
+    enabled_sw = ft.Switch(
+        label="Record handler latency", value=instrumentation.is_enabled()
+    )
+    report_column = ft.Column(spacing=4)
+
+    def on_toggle(e):
+        if enabled_sw.value:
+            instrumentation.enable_instrumentation()
+            snack("Handler latency recording enabled.", INFO_COLOR)
+        else:
+            instrumentation.disable_instrumentation()
+            snack("Handler latency recording disabled.", INFO_COLOR)
+
+    def on_show(e):
+        report_column.controls.clear()
+        handlers = instrumentation.snapshot()
+        if not handlers:
+            report_column.controls.append(
+                ft.Text("Nothing recorded yet.", color=ft.Colors.GREY_600)
+            )
+        for h in handlers:
+            report_column.controls.append(
+                ft.Text(
+                    f"{h['handler']}: {h['calls']} calls, p50 {h['p50_ms']:.1f} ms, "
+                    f"p95 {h['p95_ms']:.1f} ms (db {h['mean_db_ms']:.1f} / "
+                    f"update {h['mean_update_ms']:.1f} / "
+                    f"compute {h['mean_compute_ms']:.1f} ms mean)",
+                    size=12,
+                    font_family="monospace",
+                )
+            )
+        page.update()
+
+    def on_export(e):
+        ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        try:
+            path = instrumentation.export(f"./latency-{ts}.json")
+            snack(f"Latency stats exported to {path}")
+        except OSError as ex:
+            snack(f"Export failed: {ex}", ERROR_COLOR)
+
+    def on_reset(e):
+        instrumentation.reset()
+        report_column.controls.clear()
+        page.update()
+
+    enabled_sw.on_change = on_toggle
+
+    return ft.Container(
+        ft.Column(
+            [
+                ft.Text("Handler Latency", size=16, weight=ft.FontWeight.BOLD),
+                ft.Text(
+                    "Times UI actions split into database, page update and "
+                    "Python work. Also turns on SQL profiling.",
+                    size=12,
+                    color=ft.Colors.GREY_600,
+                ),
+                enabled_sw,
+                ft.Row(
+                    [
+                        ft.OutlinedButton(
+                            "Show", icon=ft.Icons.TIMER, on_click=on_show
+                        ),
+                        ft.OutlinedButton(
+                            "Export", icon=ft.Icons.SAVE_ALT, on_click=on_export
+                        ),
+                        ft.TextButton("Reset", on_click=on_reset),
+                    ],
+                    spacing=12,
+                ),
+                report_column,
+            ],
+            spacing=12,
+        ),
+        padding=ft.padding.all(18),
+        bgcolor=ft.Colors.WHITE,
+        border_radius=14,
+        shadow=ft.BoxShadow(
+            spread_radius=1,
+            blur_radius=12,
+            color=ft.Colors.GREY_100,
+            offset=ft.Offset(0, 6),
+        ),
+    )
+
+
 # ========== Main Settings Page Function ==========
 
 
@@ -464,6 +683,7 @@ def settings_page(page: ft.Page) -> ft.Control:
             page.update()
 
             restore_db(in_path, db_path, passphrase=passph, overwrite=True)
+            reset_pool()
             notify(f"Restore completed to: {db_path}", ft.Colors.GREEN_400)
         except Exception as ex:
             try:
@@ -548,6 +768,8 @@ def settings_page(page: ft.Page) -> ft.Control:
 
     manage_currencies_card = build_manage_currencies_card(page)
     currency_card = build_currency_settings_card(page)
+    sql_profile_card = build_sql_profile_card(page)
+    latency_card = build_latency_card(page)
     backup_card = ft.Container(
         ft.Column(
             [
@@ -602,7 +824,14 @@ def settings_page(page: ft.Page) -> ft.Control:
     )
 
     page_controls = ft.Column(
-        [manage_currencies_card, currency_card, backup_card, restore_card],
+        [
+            manage_currencies_card,
+            currency_card,
+            backup_card,
+            restore_card,
+            sql_profile_card,
+            latency_card,
+        ],
         spacing=16,
         scroll="auto",
         expand=True,
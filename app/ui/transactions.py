@@ -6,10 +6,12 @@ import traceback
 
 from app.db.transactions import (
     add_transaction,
+    add_transactions_bulk,
     get_recent_transactions,
     delete_transaction,
 )
 from app.db.accounts import get_accounts, increment_account_balance
+from app.db.connection import unit_of_work
 from app.db.categories import (
     get_categories,
     add_category,
@@ -28,6 +30,8 @@ from app.ui.util import (
 
 # --- FIX: Moved this import to the top ---
 from app.services.converter import get_active_currency_codes
+from app.ui.refresh import get_refresh_scheduler
+from app.utils.instrumentation import instrument
 # --- END FIX ---
 
 ERROR_COLOR = ft.Colors.RED_400
@@ -175,6 +179,8 @@ def import_from_csv(path, page, notify):
 
         print(f"[Import CSV] Read {len(processed_rows)} rows from file.")
 
+        account_ids = {a.id for a in get_accounts()}
+        records = []
         for row in processed_rows:
             cat_name = row.get("category", "").strip().lower()
             category = cat_map_by_name.get(cat_name)
@@ -195,6 +201,8 @@ def import_from_csv(path, page, notify):
                 if not acc_id_str:
                     raise ValueError("Missing account_id/account column")
                 acc_id = int(acc_id_str.strip())
+                if acc_id not in account_ids:
+                    raise ValueError(f"Unknown account_id {acc_id}")
                 currency = row.get("currency", "").strip().upper()
                 if not currency:
                     raise ValueError("Missing currency column")
@@ -203,20 +211,23 @@ def import_from_csv(path, page, notify):
                     raise ValueError("Missing date column")
                 datetime.date.fromisoformat(date_str)
 
-                add_transaction(
-                    date_str,
-                    amt,
-                    cat_id,
-                    acc_id,
-                    row.get("notes", "").strip(),
-                    currency,
+                records.append(
+                    {
+                        "date": date_str,
+                        "amount": amt,
+                        "category_id": cat_id,
+                        "account_id": acc_id,
+                        "notes": (row.get("notes") or "").strip(),
+                        "currency": currency,
+                    }
                 )
-                increment_account_balance(acc_id, currency, amt)
-                imported += 1
             except Exception as row_ex:
                 print(f"[Import CSV] Skipping row due to error: {row_ex} | Row: {row}")
                 skipped += 1
 
+        if records:
+            imported = len(add_transactions_bulk(records, adjust_balances=True))
+
         print(f"[Import CSV] Processed: {imported} imported, {skipped} skipped.")
         notify(f"Import complete: {imported} added, {skipped} skipped.", UX.ACCENT)
 
@@ -914,7 +925,7 @@ def transactions_page(page: ft.Page, file_picker: ft.FilePicker):
             border=ft.border.only(left=ft.BorderSide(5, color)),
         )
 
-    def refresh_transactions():
+    def refresh_transactions(update: bool = True):
         txs = get_recent_transactions()
         transaction_list.controls.clear()
         if not txs:
@@ -929,9 +940,12 @@ def transactions_page(page: ft.Page, file_picker: ft.FilePicker):
         else:
             for tx in txs:
                 transaction_list.controls.append(build_transaction_card(tx))
-        if transaction_list.page:
+        if update and transaction_list.page:
             transaction_list.update()
 
+    refresh = get_refresh_scheduler(page)
+    refresh.register("transactions", lambda: refresh_transactions(update=False))
+
     # ------------------ Refresh Function ------------------
     def refresh_page_data():
         nonlocal accounts
@@ -965,6 +979,7 @@ def transactions_page(page: ft.Page, file_picker: ft.FilePicker):
         selected_date_value[0] = datetime.date.today().isoformat()
         selected_date_display.value = selected_date_value[0]
 
+    @instrument("transactions.add_tx")
     def add_tx(e):
         if not category_field.value:
             notify("Select a category", UX.WARN)
@@ -1041,34 +1056,37 @@ def transactions_page(page: ft.Page, file_picker: ft.FilePicker):
             )
 
             newly = generate_due_transactions()
-            refresh_transactions()
             reset_form()
-            page.update()
-            notify(
+            refresh.notify(
                 f"Recurring pattern created (generated {newly} occurrence{'s' if newly != 1 else ''})",
                 UX.POSITIVE,
             )
             return
 
-        add_transaction(
-            date_iso,
-            signed_amount,
-            category_id,
-            account_id,
-            notes_field.value.strip(),
-            currency,
-        )
-        increment_account_balance(account_id, currency, signed_amount)
+        with unit_of_work():
+            tx_id = add_transaction(
+                date_iso,
+                signed_amount,
+                category_id,
+                account_id,
+                notes_field.value.strip(),
+                currency,
+            )
+            increment_account_balance(
+                account_id,
+                currency,
+                signed_amount,
+                kind="transaction",
+                effective_date=date_iso,
+                transaction_id=tx_id,
+            )
 
-        refresh_transactions()
         reset_form()
-        page.update()
-        notify("Transaction added", UX.POSITIVE)
+        refresh.notify("Transaction added", UX.POSITIVE)
 
     def delete_tx(txid: int):
         delete_transaction(txid)
-        refresh_transactions()
-        notify("Transaction deleted", UX.NEGATIVE)
+        refresh.notify("Transaction deleted", UX.NEGATIVE)
 
     add_tx_btn = ft.ElevatedButton(
         "Add Transaction",
@@ -1274,6 +1292,11 @@ def transactions_page(page: ft.Page, file_picker: ft.FilePicker):
     refresh_category_list()
     selected_date_display.value = selected_date_value[0]
 
+    def on_tab_visible():
+        refresh_categories_main()
+        refresh_transactions()
+        refresh_page_data()
+
     # ---------- Root Layout ----------
     root = ft.Container(
         content=ft.Row(
@@ -1297,6 +1320,7 @@ def transactions_page(page: ft.Page, file_picker: ft.FilePicker):
         ),
         expand=True,
         bgcolor=UX.BG,
+        data=on_tab_visible,
     )
 
     return root
@@ -0,0 +1,301 @@
+"""
+Historical exchange-rate backfill.
+
+Loads daily rates into rate_history, either from a provider that has
+history or from a local dump, one chunk per transaction. Each chunk
+commits together with the job's progress, so an interrupted run picks up
+after the last committed chunk when started again with the same
+arguments; rows that are already stored are not written twice. A provider
+run without --end is keyed without it and runs through today, so resuming
+it on a later day continues the same job instead of starting over.
+
+Usage examples (CLI):
+    python -m app.utils.backfill --db-path ./app/assets/finet.db provider --start 2015-01-01
+    python -m app.utils.backfill --db-path ./app/assets/finet.db provider --provider fixture --start 2024-01-01 --currencies USD,GBP
+    python -m app.utils.backfill --db-path ./app/assets/finet.db file ./rates.csv --base EUR
+    python -m app.utils.backfill --db-path ./app/assets/finet.db status
+
+Files are either CSV with date,currency,rate columns (optional base and
+source columns), or JSON shaped {"base": "EUR", "rates": {date: {code:
+rate}}} or a list of {"date", "currency", "rate", "base"} objects.
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import time
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.db import settings as db_settings
+from app.db.connection import get_db_connection, init_db
+from app.db.rate_history import (
+    RateRow,
+    count_rate_history,
+    get_backfill_job,
+    list_backfill_jobs,
+    save_backfill_progress,
+    store_rate_history,
+)
+from app.services.rate_providers import PROVIDERS, FixtureProvider, RateProvider
+
+# Days per provider request / per committed chunk.
+DEFAULT_CHUNK_DAYS = 366
+
+
+def _today() -> datetime.date:
+    """
+    The default end of a provider run; tests replace it to change the day.
+    """
+    return datetime.date.today()
+
+
+def _day(value: str) -> datetime.date:
+    return datetime.date.fromisoformat(value[:10])
+
+
+def _windows(
+    start: datetime.date, end: datetime.date, days: int
+) -> Iterator[Tuple[datetime.date, datetime.date]]:
+    while start <= end:
+        stop = min(start + datetime.timedelta(days=days - 1), end)
+        yield start, stop
+        start = stop + datetime.timedelta(days=1)
+
+
+def _run_job(
+    job: str,
+    source: str,
+    start: str,
+    end: str,
+    chunks: Iterable[Tuple[str, List[RateRow]]],
+) -> dict:
+    """
+    Stores (done_through, rows) chunks in order, one transaction each.
+    """
+    started = time.perf_counter()
+    written = read = committed = 0
+    for done_through, rows in chunks:
+        conn = get_db_connection()
+        try:
+            n = store_rate_history(conn, rows)
+            save_backfill_progress(conn, job, source, start, end, done_through, n)
+            conn.commit()
+        finally:
+            conn.close()
+        read += len(rows)
+        written += n
+        committed += 1
+        print(f"[Backfill] {job}: through {done_through}, {n}/{len(rows)} rows new")
+    return {
+        "job": job,
+        "chunks": committed,
+        "rows_read": read,
+        "rows_written": written,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _resume_from(job: str, start: str, end: str) -> Optional[datetime.date]:
+    """
+    First day still to do for job, or None if it already covered end.
+    """
+    state = get_backfill_job(job)
+    if not state or not state["done_through"]:
+        return _day(start)
+    if state["done_through"] >= end:
+        return None
+    resumed = _day(state["done_through"]) + datetime.timedelta(days=1)
+    print(f"[Backfill] {job}: resuming from {resumed}")
+    return max(resumed, _day(start))
+
+
+def backfill_from_provider(
+    provider: RateProvider,
+    start: str,
+    end: Optional[str] = None,
+    base: Optional[str] = None,
+    currencies: Optional[Sequence[str]] = None,
+    job: Optional[str] = None,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+) -> dict:
+    """
+    Pulls start..end (end defaults to today) from provider for the active
+    currencies (or the given ones) against base (the app's base currency
+    by default). Raises ValueError for a provider without history.
+    """
+    if not provider.supports_history:
+        raise ValueError(f"{provider.name} has no historical rates")
+    base = (base or db_settings.get_base_currency()).upper()
+    if currencies is None:
+        currencies = [c["code"] for c in db_settings.get_active_currencies()]
+    currencies = sorted({c.upper() for c in currencies} - {base})
+    if not job:
+        # An open-ended run is keyed without its end, which moves every day.
+        job = f"{provider.name}:{base}:{start}" + (f":{end}" if end else "")
+    end = end or _today().isoformat()
+
+    first = _resume_from(job, start, end)
+    if first is None:
+        print(f"[Backfill] {job}: already complete")
+        return {"job": job, "chunks": 0, "rows_read": 0, "rows_written": 0}
+
+    def chunks():
+        for lo, hi in _windows(first, _day(end), chunk_days):
+            history = provider.fetch_history(
+                base, lo.isoformat(), hi.isoformat(), currencies
+            )
+            rows = [
+                (base, ccy, date, float(rate), provider.name)
+                for date, day in history.items()
+                for ccy, rate in day.items()
+                if ccy in currencies and rate
+            ]
+            yield hi.isoformat(), rows
+
+    return _run_job(job, provider.name, start, end, chunks())
+
+
+def read_rate_file(path: str, base: Optional[str] = None) -> List[RateRow]:
+    """
+    Parses a CSV or JSON dump into rate rows sorted by date. base is used
+    for entries that do not name their own.
+    """
+    source = f"file:{os.path.basename(path)}"
+    rows: List[RateRow] = []
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            file_base = (data.get("base") or base or "").upper()
+            for date, day in data["rates"].items():
+                for ccy, rate in day.items():
+                    rows.append(
+                        (file_base, ccy.upper(), date[:10], float(rate), source)
+                    )
+        else:
+            for item in data:
+                rows.append(
+                    (
+                        (item.get("base") or base or "").upper(),
+                        item["currency"].upper(),
+                        item["date"][:10],
+                        float(item["rate"]),
+                        item.get("source") or source,
+                    )
+                )
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for item in csv.DictReader(f):
+                rows.append(
+                    (
+                        (item.get("base") or base or "").upper(),
+                        item["currency"].strip().upper(),
+                        item["date"].strip()[:10],
+                        float(item["rate"]),
+                        item.get("source") or source,
+                    )
+                )
+
+    if any(not r[0] for r in rows):
+        raise ValueError(f"{path}: rows without a base currency (pass --base)")
+    rows.sort(key=lambda r: r[2])
+    return rows
+
+
+def backfill_from_file(
+    path: str,
+    base: Optional[str] = None,
+    job: Optional[str] = None,
+    chunk_days: int = DEFAULT_CHUNK_DAYS,
+) -> dict:
+    rows = read_rate_file(path, base)
+    if not rows:
+        return {"job": job, "chunks": 0, "rows_read": 0, "rows_written": 0}
+    start, end = rows[0][2], rows[-1][2]
+    job = job or f"file:{os.path.abspath(path)}"
+
+    first = _resume_from(job, start, end)
+    if first is None:
+        print(f"[Backfill] {job}: already complete")
+        return {"job": job, "chunks": 0, "rows_read": 0, "rows_written": 0}
+
+    def chunks():
+        i = 0
+        for lo, hi in _windows(first, _day(end), chunk_days):
+            lo_s, hi_s = lo.isoformat(), hi.isoformat()
+            while i < len(rows) and rows[i][2] < lo_s:
+                i += 1
+            j = i
+            while j < len(rows) and rows[j][2] <= hi_s:
+                j += 1
+            yield hi_s, rows[i:j]
+            i = j
+
+    return _run_job(job, f"file:{os.path.basename(path)}", start, end, chunks())
+
+
+def _provider(name: str, fixture: Optional[str]) -> RateProvider:
+    if name == FixtureProvider.name:
+        return FixtureProvider(fixture)
+    return PROVIDERS[name]()
+
+
+def _cli():
+    parser = argparse.ArgumentParser(
+        prog="finet-backfill", description="Load historical exchange rates"
+    )
+    parser.add_argument("--db-path", required=True)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_prov = sub.add_parser("provider", help="Pull history from a rate provider")
+    p_prov.add_argument(
+        "--provider",
+        choices=sorted(n for n, p in PROVIDERS.items() if p.supports_history),
+        default="frankfurter",
+    )
+    p_prov.add_argument(
+        "--fixture", default=None, help="JSON file for --provider fixture"
+    )
+    p_prov.add_argument("--start", required=True)
+    p_prov.add_argument("--end", default=None)
+    p_prov.add_argument("--base", default=None)
+    p_prov.add_argument("--currencies", default=None, help="Comma-separated codes")
+    p_prov.add_argument("--chunk-days", type=int, default=DEFAULT_CHUNK_DAYS)
+
+    p_file = sub.add_parser("file", help="Import a CSV or JSON rate dump")
+    p_file.add_argument("path")
+    p_file.add_argument("--base", default=None)
+    p_file.add_argument("--chunk-days", type=int, default=DEFAULT_CHUNK_DAYS)
+
+    sub.add_parser("status", help="Show backfill jobs")
+
+    args = parser.parse_args()
+    init_db(args.db_path)
+
+    if args.cmd == "provider":
+        currencies = args.currencies.split(",") if args.currencies else None
+        result = backfill_from_provider(
+            _provider(args.provider, args.fixture),
+            args.start,
+            args.end,
+            base=args.base,
+            currencies=currencies,
+            chunk_days=args.chunk_days,
+        )
+        print(json.dumps(result, indent=2))
+    elif args.cmd == "file":
+        result = backfill_from_file(args.path, args.base, chunk_days=args.chunk_days)
+        print(json.dumps(result, indent=2))
+    elif args.cmd == "status":
+        for job in list_backfill_jobs():
+            print(
+                f"{job['job']}: {job['start_date']}..{job['end_date']}, "
+                f"done through {job['done_through']}, {job['rows_written']} rows"
+            )
+        print(f"{count_rate_history()} rows in rate_history")
+
+
+if __name__ == "__main__":
+    _cli()
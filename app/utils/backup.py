@@ -1,11 +1,3 @@
-import os
-import shutil
-import tempfile
-import argparse
-from typing import Optional
-
-from .crypto import encrypt_file, decrypt_file, is_encrypted_file
-
 """
 Utilities to backup and restore the local database file.
 
@@ -17,6 +9,29 @@ Usage examples (CLI):
     python -m app.utils.backup restore --in ./backups/backup.db.enc --db-path ./data/finet.db --passphrase "s3cret"
 """
 
+import os
+import shutil
+import sqlite3
+import tempfile
+import argparse
+import threading
+import time
+from typing import Optional
+
+from .crypto import encrypt_file, decrypt_file, is_encrypted_file
+
+_last_backup_lock = threading.Lock()
+_last_backup: Optional[dict] = None
+
+
+def get_last_backup() -> Optional[dict]:
+    """
+    The last backup made by this process: path, finished_at (Unix time),
+    size_bytes and seconds. None if there was none.
+    """
+    with _last_backup_lock:
+        return dict(_last_backup) if _last_backup else None
+
 
 def backup_db(
     db_path: str,
@@ -33,6 +48,7 @@ def backup_db(
         raise FileExistsError(
             f"Output path exists: {out_path} (set overwrite=True to replace)"
         )
+    started = time.time()
 
     if passphrase:
         with tempfile.NamedTemporaryFile(delete=False) as tf:
@@ -48,6 +64,15 @@ def backup_db(
     else:
         shutil.copy2(db_path, out_path)
 
+    global _last_backup
+    with _last_backup_lock:
+        _last_backup = {
+            "path": out_path,
+            "finished_at": time.time(),
+            "size_bytes": os.path.getsize(out_path),
+            "seconds": time.time() - started,
+        }
+
 
 def restore_db(
     in_path: str, db_path: str, passphrase: Optional[str] = None, overwrite: bool = True
@@ -55,6 +80,7 @@ def restore_db(
     """
     Restore a backup file (optionally encrypted) into db_path.
     If encrypted, pass the passphrase used during backup.
+    The restored ledger gets a new id, so caches of the old file are dropped.
     """
     if not os.path.exists(in_path):
         raise FileNotFoundError(f"Backup file does not exist: {in_path}")
@@ -79,6 +105,28 @@ def restore_db(
         if is_encrypted_file(in_path):
             raise ValueError("Input appears encrypted but no passphrase provided.")
         shutil.copy2(in_path, db_path)
+    _renew_ledger_id(db_path)
+
+
+def _renew_ledger_id(db_path: str):
+    """
+    Gives a restored database a new ledger id. Its rows can differ from what
+    caches kept outside the database (the analytics column file) were built
+    from, even where the ids line up again, so those must not match it.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        has_meta = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ledger_meta'"
+        ).fetchone()
+        if has_meta:
+            conn.execute(
+                "UPDATE ledger_meta SET value = lower(hex(randomblob(16)))"
+                " WHERE key = 'ledger_id'"
+            )
+            conn.commit()
+    finally:
+        conn.close()
 
 
 def _cli():
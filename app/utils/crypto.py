@@ -8,6 +8,7 @@ from cryptography.fernet import Fernet
 
 SALT_SIZE = 16
 KDF_ITERATIONS = 390_000
+SQLITE_HEADER = b"SQLite format 3\x00"
 
 
 def _derive_key(
@@ -76,10 +77,13 @@ def decrypt_file(in_path: str, out_path: str, passphrase: str) -> None:
 def is_encrypted_file(path: str) -> bool:
     """
     Heuristic: check file size and salt presence. If file is at least SALT_SIZE bytes -> True.
-    This is only a minor helper; in production you may want a file header/magic.
+    Plain SQLite files are recognised by their header and are never encrypted.
     """
     try:
         size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if f.read(len(SQLITE_HEADER)) == SQLITE_HEADER:
+                return False
         return size > SALT_SIZE
     except Exception:
         return False
@@ -0,0 +1,364 @@
+"""
+Streaming transaction export for feeding a warehouse.
+
+Rows are read in one read transaction and written as they arrive, so an
+export never holds the ledger in memory. Each row carries the account
+and category names and the converted amount alongside the raw columns.
+
+Formats:
+    ndjson     one JSON object per line (gzip-compressed for a .gz path)
+    parquet    columnar, zstd-compressed, in row groups of row_group_size
+               rows (needs pyarrow)
+
+With partition_by ("year", "month" or "day") the output is a directory of
+Hive-style partitions named after the granularity (month=2024-05/,
+day=2024-05-31/...) holding part-<first id>.<ext>; without it the output
+is a single file. Dates that are not valid YYYY-MM-DD dates are exported
+as null (rows without one go to the __HIVE_DEFAULT_PARTITION__ partition)
+and the run warns how many transactions that affected.
+
+A named cursor makes the export incremental: the run only writes rows
+with an id above the cursor's, then moves the cursor. Every run writes
+new files: a part file per partition, or <stem>.part-<first id><ext>
+next to the given path without partition_by. Files are written under a
+temporary name and renamed once complete, and the cursor only moves
+after that, so a failed run can simply be repeated. Edits and
+deletes of rows that were already exported are not replayed; the run
+warns when there were any (ledger_meta's tx_generation moved) and
+full=True re-exports everything (into a fresh output location).
+
+Usage examples (CLI):
+    python -m app.utils.export --db-path ./app/assets/finet.db ndjson ./out/transactions.ndjson.gz
+    python -m app.utils.export --db-path ./app/assets/finet.db parquet ./warehouse/transactions --partition-by month --cursor nightly
+    python -m app.utils.export --db-path ./app/assets/finet.db cursors
+"""
+
+import argparse
+import gzip
+import json
+import os
+from itertools import groupby
+from typing import Iterator, List, Optional, Sequence
+
+from app.db import exports as db_exports
+from app.db.connection import get_db_connection, init_db
+from app.db.settings import get_base_currency
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: pip install finet[export]
+    pa = None
+
+FORMATS = ("ndjson", "parquet")
+PARTITIONS = {"year": 4, "month": 7, "day": 10}
+DEFAULT_ROW_GROUP_SIZE = 100_000
+FETCH_SIZE = 5000
+
+COLUMNS = (
+    "id",
+    "date",
+    "amount",
+    "currency",
+    "amount_converted",
+    "base_currency",
+    "category_id",
+    "category",
+    "category_type",
+    "account_id",
+    "account",
+    "notes",
+    "recurring_id",
+    "occurrence_date",
+)
+
+# NULL unless the column starts with a real YYYY-MM-DD date (julianday()
+# rolls e.g. 2024-02-30 over to March, so the round trip rejects it).
+_VALID_DATE = (
+    "CASE WHEN date(julianday(substr({0}, 1, 10))) = substr({0}, 1, 10)"
+    " THEN substr({0}, 1, 10) END"
+)
+
+_EXPORT_SQL = f"""
+    SELECT t.id, {_VALID_DATE.format("t.date")}, t.amount, t.currency,
+           t.amount_converted, ?, t.category_id, c.name, c.type, t.account_id,
+           a.name, t.notes, t.recurring_id, {_VALID_DATE.format("t.occurrence_date")}
+    FROM transactions t
+    LEFT JOIN categories c ON t.category_id = c.id
+    LEFT JOIN accounts a ON t.account_id = a.id
+    WHERE t.id > ?
+"""
+
+
+def _parquet_schema():
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("date", pa.date32()),
+            ("amount", pa.float64()),
+            ("currency", pa.string()),
+            ("amount_converted", pa.float64()),
+            ("base_currency", pa.string()),
+            ("category_id", pa.int64()),
+            ("category", pa.string()),
+            ("category_type", pa.string()),
+            ("account_id", pa.int64()),
+            ("account", pa.string()),
+            ("notes", pa.string()),
+            ("recurring_id", pa.int64()),
+            ("occurrence_date", pa.date32()),
+        ]
+    )
+
+
+class _NdjsonWriter:
+    def __init__(self, path: str, row_group_size: int):
+        if path.endswith(".gz"):
+            self._f = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, rows: Sequence[tuple]):
+        dumps = json.dumps
+        self._f.writelines(
+            dumps(dict(zip(COLUMNS, row)), separators=(",", ":")) + "\n" for row in rows
+        )
+
+    def close(self):
+        self._f.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path: str, row_group_size: int):
+        self._schema = _parquet_schema()
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+        self._size = row_group_size
+        self._pending: List[tuple] = []
+
+    def _flush(self, rows: List[tuple]):
+        columns = list(zip(*rows))
+        arrays = []
+        for field, values in zip(self._schema, columns):
+            if pa.types.is_date32(field.type):
+                # ISO date strings; cast() parses them without Python objects.
+                arrays.append(pa.array(values, pa.string()).cast(field.type))
+            else:
+                arrays.append(pa.array(values, field.type))
+        self._writer.write_table(
+            pa.Table.from_arrays(arrays, schema=self._schema),
+            row_group_size=self._size,
+        )
+
+    def write(self, rows: Sequence[tuple]):
+        self._pending.extend(rows)
+        while len(self._pending) >= self._size:
+            self._flush(self._pending[: self._size])
+            del self._pending[: self._size]
+
+    def close(self):
+        if self._pending:
+            self._flush(self._pending)
+            self._pending = []
+        self._writer.close()
+
+
+_WRITERS = {
+    "ndjson": (_NdjsonWriter, ".ndjson"),
+    "parquet": (_ParquetWriter, ".parquet"),
+}
+
+# Partition for rows without a valid date, as Hive and Arrow name it.
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _run_path(out: str, first_id: int) -> str:
+    """
+    out with the run's first id inserted before the extension, e.g.
+    transactions.ndjson.gz -> transactions.part-000000000001.ndjson.gz.
+    """
+    root, ext = os.path.splitext(out)
+    if ext == ".gz":
+        root, inner = os.path.splitext(root)
+        ext = inner + ext
+    return f"{root}.part-{first_id:012d}{ext}"
+
+
+def _tmp_path(path: str) -> str:
+    # Hidden, so warehouse readers skip it, and keeps the extension the
+    # writer goes by (.gz).
+    head, tail = os.path.split(path)
+    return os.path.join(head, f".tmp-{tail}")
+
+
+def _stream(conn, after_id: int, ordered_by_date: bool) -> Iterator[List[tuple]]:
+    # Column 2 is the validated date, so invalid dates group together.
+    order = "2, t.id" if ordered_by_date else "t.id"
+    cur = conn.execute(
+        _EXPORT_SQL + f" ORDER BY {order}", (get_base_currency(), after_id)
+    )
+    cur.row_factory = None
+    while True:
+        rows = cur.fetchmany(FETCH_SIZE)
+        if not rows:
+            return
+        yield rows
+
+
+def export_transactions(
+    out: str,
+    fmt: str = "ndjson",
+    partition_by: Optional[str] = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    cursor: Optional[str] = None,
+    full: bool = False,
+) -> dict:
+    """
+    Writes transactions to out (a file, or a directory with partition_by)
+    and returns {"rows", "files", "last_id"}. With cursor, only rows
+    newer than that cursor's last run are written (all rows with full)
+    and the cursor is moved past them; without partition_by they go to
+    their own file next to out (see _run_path).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if partition_by is not None and partition_by not in PARTITIONS:
+        raise ValueError(f"partition_by must be one of {', '.join(PARTITIONS)}")
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError(
+            "pyarrow is not installed; install finet[export] for Parquet output"
+        )
+    writer_cls, ext = _WRITERS[fmt]
+
+    after_id = 0
+    saved = db_exports.get_export_cursor(cursor) if cursor else None
+    if saved and not full:
+        after_id = saved["last_id"]
+
+    conn = get_db_connection()
+    written = []  # (tmp path, final path)
+    writer = None
+    rows_out, last_id, undated = 0, after_id, 0
+    try:
+        # One read transaction, so the rows and the generation agree.
+        conn.execute("BEGIN")
+        generation = db_exports.get_tx_generation(conn)
+        if saved and not full and saved["tx_generation"] != generation:
+            print(
+                f"[Export] Transactions were edited or deleted since cursor "
+                f"'{cursor}' last ran; those changes are not in this incremental "
+                f"export (re-run with full=True / --full to rewrite everything)"
+            )
+
+        key_len = PARTITIONS.get(partition_by)
+        current_key = None
+        for rows in _stream(conn, after_id, key_len is not None):
+            if key_len is None:
+                groups = [(None, rows)]
+            else:
+                groups = groupby(rows, key=lambda r: r[1] and r[1][:key_len])
+            for key, group in groups:
+                if writer is None or key != current_key:
+                    if writer is not None:
+                        writer.close()
+                    current_key = key
+                    if key_len is not None:
+                        path = os.path.join(
+                            out,
+                            f"{partition_by}={key or NULL_PARTITION}",
+                            f"part-{after_id + 1:012d}{ext}",
+                        )
+                    elif cursor:
+                        path = _run_path(out, after_id + 1)
+                    else:
+                        path = out
+                    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                    tmp = _tmp_path(path)
+                    written.append((tmp, path))
+                    writer = writer_cls(tmp, row_group_size)
+                writer.write(list(group))
+            rows_out += len(rows)
+            undated += sum(1 for r in rows if r[1] is None)
+            last_id = max(last_id, max(r[0] for r in rows))
+        if writer is not None:
+            writer.close()
+            writer = None
+        conn.rollback()
+    except BaseException:
+        if writer is not None:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        for tmp, _ in written:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+    finally:
+        conn.close()
+
+    for tmp, final in written:
+        os.replace(tmp, final)
+    if cursor:
+        db_exports.save_export_cursor(cursor, fmt, last_id, generation, rows_out)
+
+    files = [final for _, final in written]
+    if undated:
+        print(
+            f"[Export] Warning: {undated} transaction(s) have no valid date; "
+            f"exported with a null date"
+        )
+    print(
+        f"[Export] {rows_out} transactions -> {len(files)} {fmt} file(s)"
+        + (f", cursor '{cursor}' at id {last_id}" if cursor else "")
+    )
+    return {"rows": rows_out, "files": files, "last_id": last_id}
+
+
+def _cli():
+    parser = argparse.ArgumentParser(
+        description="Stream transactions to NDJSON or Parquet."
+    )
+    parser.add_argument("--db-path", required=True, help="Path to finet.db")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for fmt in FORMATS:
+        p = sub.add_parser(fmt, help=f"Export as {fmt}")
+        p.add_argument("out", help="Output file, or directory with --partition-by")
+        p.add_argument("--partition-by", choices=list(PARTITIONS))
+        p.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+        p.add_argument("--cursor", help="Name of an incremental export cursor")
+        p.add_argument(
+            "--full", action="store_true", help="Ignore the cursor's position"
+        )
+
+    sub.add_parser("cursors", help="List export cursors")
+    p = sub.add_parser("reset-cursor", help="Forget an export cursor")
+    p.add_argument("name")
+
+    args = parser.parse_args()
+    init_db(args.db_path)
+
+    if args.command == "cursors":
+        for c in db_exports.list_export_cursors():
+            print(
+                f"{c['name']:<20} {c['format']:<8} last_id={c['last_id']:<10} "
+                f"rows={c['rows_exported']:<10} {c['updated_at']}"
+            )
+    elif args.command == "reset-cursor":
+        if db_exports.delete_export_cursor(args.name):
+            print(f"[Export] Cursor '{args.name}' removed")
+        else:
+            print(f"[Export] No cursor named '{args.name}'")
+    else:
+        export_transactions(
+            args.out,
+            fmt=args.command,
+            partition_by=args.partition_by,
+            row_group_size=args.row_group_size,
+            cursor=args.cursor,
+            full=args.full,
+        )
+
+
+if __name__ == "__main__":
+    _cli()
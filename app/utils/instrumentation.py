@@ -0,0 +1,282 @@
+"""
+Latency instrumentation for UI event handlers.
+
+Handlers decorated with @instrument("area.handler") record their wall time
+split into:
+    db       time in SQL statements (from the SQL profiler, which is
+             switched on together with the instrumentation)
+    update   time in page.update() / control.update(), i.e. diffing and
+             serialising controls to the client (see instrument_page)
+    compute  everything else (Python work in the handler)
+
+Only the handler's own thread is measured; work it hands to a background
+thread is not part of its time. Handlers that queue their refresh with
+app.ui.refresh return before it runs; that time is recorded once per
+flush under "refresh.flush". The last WINDOW calls per handler are
+kept in memory, with a histogram of wall times, and can be exported as
+JSON or shown from the Handler Latency card in Settings.
+
+Off by default, when the decorator costs one flag check. Enable it with
+enable_instrumentation() or FINET_INSTRUMENT=1 (FINET_INSTRUMENT_OUT saves
+the stats on exit).
+
+Usage (CLI):
+    python -m app.utils.instrumentation report latency.json
+"""
+
+import argparse
+import atexit
+import datetime
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from app.db import profiling
+
+# Upper bounds (ms) of the wall-time histogram buckets; the last is open.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+WINDOW = 500
+# Handlers slower than this are printed.
+SLOW_HANDLER_MS = 250.0
+
+_enabled = False
+# True when enable_instrumentation() turned the SQL profiler on itself.
+_owns_profiler = False
+_stats_lock = threading.Lock()
+_local = threading.local()
+
+
+class HandlerStats:
+    __slots__ = ("calls", "errors", "samples")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        # (wall_ms, db_ms, update_ms) per call.
+        self.samples: deque = deque(maxlen=WINDOW)
+
+
+_stats: Dict[str, HandlerStats] = {}
+
+
+def _update_ms() -> float:
+    return getattr(_local, "update_ms", 0.0)
+
+
+def _record(name: str, wall: float, db: float, update: float, failed: bool):
+    with _stats_lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = HandlerStats()
+        stats.calls += 1
+        stats.errors += failed
+        stats.samples.append((wall, db, update))
+    if wall >= SLOW_HANDLER_MS:
+        print(
+            f"[UI] Slow handler {name}: {wall:.1f} ms "
+            f"(db {db:.1f}, update {update:.1f}, compute {wall - db - update:.1f})"
+        )
+
+
+def instrument(name: Optional[str] = None):
+    """
+    Decorator recording each call of the handler under name (default:
+    module.function). Nested instrumented calls are counted in both.
+    """
+
+    def decorate(fn: Callable):
+        label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            db0, update0 = profiling.thread_db_ms(), _update_ms()
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                wall = (time.perf_counter() - start) * 1000
+                db = profiling.thread_db_ms() - db0
+                update = _update_ms() - update0
+                _record(label, wall, db, update, failed)
+
+        return wrapper
+
+    return decorate
+
+
+def instrument_page(page):
+    """
+    Times page.update() on this page. Control.update() goes through
+    page.update() as well, so that is covered too.
+    """
+    if getattr(page, "_instrumented_update", False):
+        return
+    original = page.update
+
+    def update(*controls):
+        if not _enabled:
+            return original(*controls)
+        start = time.perf_counter()
+        try:
+            return original(*controls)
+        finally:
+            _local.update_ms = _update_ms() + (time.perf_counter() - start) * 1000
+
+    page.update = update
+    page._instrumented_update = True
+
+
+def enable_instrumentation():
+    """
+    Starts recording. Turns the SQL profiler on as well (DB time comes
+    from it) unless it is already running.
+    """
+    global _enabled, _owns_profiler
+    if profiling.get_profiler() is None:
+        profiling.enable_profiling()
+        _owns_profiler = True
+    _enabled = True
+
+
+def disable_instrumentation():
+    global _enabled, _owns_profiler
+    _enabled = False
+    if _owns_profiler:
+        profiling.disable_profiling()
+        _owns_profiler = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _histogram(values: List[float]) -> Dict[str, int]:
+    counts = {f"<={b}": 0 for b in BUCKETS_MS}
+    counts[f">{BUCKETS_MS[-1]}"] = 0
+    for v in values:
+        for b in BUCKETS_MS:
+            if v <= b:
+                counts[f"<={b}"] += 1
+                break
+        else:
+            counts[f">{BUCKETS_MS[-1]}"] += 1
+    return counts
+
+
+def snapshot() -> List[dict]:
+    """
+    One dict per handler over its current window: calls and errors (all
+    time), p50/p95/max wall ms, mean db/update/compute ms and the wall-time
+    histogram. Sorted by p95, slowest first.
+    """
+    with _stats_lock:
+        items = [(n, s.calls, s.errors, list(s.samples)) for n, s in _stats.items()]
+    out = []
+    for name, calls, errors, samples in items:
+        wall = [s[0] for s in samples]
+        n = len(samples) or 1
+        db = sum(s[1] for s in samples) / n
+        update = sum(s[2] for s in samples) / n
+        out.append(
+            {
+                "handler": name,
+                "calls": calls,
+                "errors": errors,
+                "window": len(samples),
+                "p50_ms": round(_percentile(wall, 50), 3),
+                "p95_ms": round(_percentile(wall, 95), 3),
+                "max_ms": round(max(wall, default=0.0), 3),
+                "mean_db_ms": round(db, 3),
+                "mean_update_ms": round(update, 3),
+                "mean_compute_ms": round(sum(wall) / n - db - update, 3),
+                "histogram": _histogram(wall),
+            }
+        )
+    out.sort(key=lambda r: r["p95_ms"], reverse=True)
+    return out
+
+
+def export(path: str) -> str:
+    data = {
+        "saved_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "window": WINDOW,
+        "buckets_ms": list(BUCKETS_MS),
+        "handlers": snapshot(),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def format_report(handlers: List[dict]) -> str:
+    lines = [
+        f"{'handler':<32} {'calls':>6} {'p50':>8} {'p95':>8} {'max':>8} "
+        f"{'db':>7} {'update':>7} {'compute':>8}"
+    ]
+    for h in handlers:
+        lines.append(
+            f"{h['handler'][:32]:<32} {h['calls']:>6} {h['p50_ms']:>8.1f} "
+            f"{h['p95_ms']:>8.1f} {h['max_ms']:>8.1f} {h['mean_db_ms']:>7.1f} "
+            f"{h['mean_update_ms']:>7.1f} {h['mean_compute_ms']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def enable_from_env():
+    """
+    Turns instrumentation on when FINET_INSTRUMENT is set (startup calls
+    this); FINET_INSTRUMENT_OUT exports the stats on exit.
+    """
+    if os.getenv("FINET_INSTRUMENT", "") in ("", "0"):
+        return
+    enable_instrumentation()
+    out = os.getenv("FINET_INSTRUMENT_OUT")
+    if out:
+        atexit.register(export, out)
+
+
+def _cli():
+    parser = argparse.ArgumentParser(
+        prog="finet-latency", description="UI handler latency reports"
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_rep = sub.add_parser("report", help="Print an exported latency file")
+    p_rep.add_argument("path")
+    p_rep.add_argument(
+        "--histograms", action="store_true", help="Also print wall-time histograms"
+    )
+    args = parser.parse_args()
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    print(format_report(data["handlers"]))
+    if args.histograms:
+        for h in data["handlers"]:
+            buckets = ", ".join(f"{k}: {v}" for k, v in h["histogram"].items() if v)
+            print(f"\n{h['handler']}: {buckets}")
+
+
+if __name__ == "__main__":
+    _cli()
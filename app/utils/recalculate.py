@@ -1,21 +1,36 @@
-from app.db.connection import get_db_connection
-from app.services.converter import get_conversion_rates, convert_to_base
+from app.db.connection import get_db_connection, queue_change
+from app.db.rate_history import load_rate_series
+from app.services.converter import (
+    get_base_currency,
+    get_conversion_rates,
+    convert_to_base,
+)
 
 
-def recalculate_all_conversions() -> (int, int): # type: ignore
+def recalculate_all_conversions(use_history: bool = False) -> (int, int): # type: ignore
     """
     Updates all historical transactions and recurring patterns with
     the latest exchange rates saved in the settings.
+    With use_history=True transactions are converted with the rate of
+    their own date from rate_history (see app.utils.backfill), falling
+    back to the latest rates where the history has no entry.
 
     Returns: (transactions_updated, recurring_updated)
     """
     conn = get_db_connection()
     rates = get_conversion_rates()
+    history = load_rate_series(get_base_currency()) if use_history else None
 
-    tx_rows = conn.execute("SELECT id, amount, currency FROM transactions").fetchall()
+    tx_rows = conn.execute(
+        "SELECT id, date, amount, currency FROM transactions"
+    ).fetchall()
     tx_to_update = []
     for row in tx_rows:
-        converted_amount = convert_to_base(row["amount"], row["currency"], rates)
+        rate = history.rate_on(row["currency"], row["date"]) if history else None
+        if rate:
+            converted_amount = row["amount"] / rate
+        else:
+            converted_amount = convert_to_base(row["amount"], row["currency"], rates)
         tx_to_update.append((converted_amount, row["id"]))
 
     conn.executemany(
@@ -35,6 +50,8 @@ def recalculate_all_conversions() -> (int, int): # type: ignore
         rec_to_update,
     )
 
+    queue_change(conn, "transactions", "update", [r[1] for r in tx_to_update])
+    queue_change(conn, "recurring", "update", [r[1] for r in rec_to_update])
     conn.commit()
     conn.close()
 
@@ -0,0 +1,72 @@
+"""
+Throughput of add_transactions_bulk on a fresh database.
+
+Usage:
+    python -m benchmarks.bulk_insert --rows 200000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from app.db.accounts import add_account, add_account_balance
+from app.db.connection import init_db
+from app.db.transactions import add_transactions_bulk
+
+CURRENCIES = ["EUR", "USD", "GBP"]
+
+
+def run(rows: int, batch_size: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(os.path.join(tmp, "bench.db"))
+        account_ids = []
+        for i in range(5):
+            acc_id = add_account(f"Account {i}", "Bank")
+            for ccy in CURRENCIES:
+                add_account_balance(acc_id, ccy, 0.0)
+            account_ids.append(acc_id)
+
+        records = [
+            (
+                f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                round(rng.uniform(-200, 200), 2),
+                None,
+                rng.choice(account_ids),
+                "",
+                rng.choice(CURRENCIES),
+            )
+            for _ in range(rows)
+        ]
+
+        start = time.perf_counter()
+        ids = add_transactions_bulk(
+            records, adjust_balances=True, batch_size=batch_size
+        )
+        elapsed = time.perf_counter() - start
+
+    assert len(ids) == rows
+    return {
+        "rows": rows,
+        "batch_size": batch_size,
+        "seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed) if elapsed else None,
+    }
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Bulk insert throughput")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    result = run(args.rows, args.batch_size)
+    print(
+        f"[bench] {result['rows']} rows in {result['seconds']}s "
+        f"({result['rows_per_second']} rows/s, batch {result['batch_size']})"
+    )
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,111 @@
+"""
+Commits (and therefore journal fsyncs) per UI action, with and without
+unit_of_work(). Each action replays the DAO calls its UI handler makes.
+
+Usage:
+    python -m benchmarks.commits_per_action --repeat 50
+"""
+
+import argparse
+import contextlib
+import datetime
+import os
+import tempfile
+import time
+
+from app.db import recurring
+from app.db.accounts import (
+    add_account,
+    add_account_balance,
+    increment_account_balance,
+    set_account_balance_threshold,
+)
+from app.db.categories import add_category, get_category_id_by_name
+from app.db.connection import get_connection_stats, init_db, unit_of_work
+from app.db.transactions import add_transaction
+
+
+def _action_add_transaction(acc_id, cat_id):
+    add_transaction("2024-05-01", -12.5, cat_id, acc_id, "bench", "EUR")
+    increment_account_balance(acc_id, "EUR", -12.5)
+
+
+def _action_transfer(acc_id, other_id):
+    add_account_balance(acc_id, "EUR", -10.0)
+    add_account_balance(other_id, "EUR", 10.0)
+
+
+def _action_create_account():
+    acc_id = add_account("Bench", "Bank", "")
+    for ccy in ("EUR", "USD"):
+        add_account_balance(acc_id, ccy, 100.0)
+        set_account_balance_threshold(acc_id, ccy, 10.0)
+
+
+def _action_recurring_catch_up(acc_id, cat_id, days=30):
+    start = datetime.date.today() - datetime.timedelta(days=days - 1)
+    recurring.create_recurring(
+        acc_id, cat_id, -1.0, "EUR", "daily", start.isoformat(), None
+    )
+    recs = recurring.list_recurring(active_only=True)
+    return recurring._generate_for(recs, datetime.date.today())
+
+
+def _measure(action, use_uow: bool, repeat: int) -> dict:
+    before = get_connection_stats()["commits"]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ctx = unit_of_work() if use_uow else contextlib.nullcontext()
+        with ctx:
+            action()
+    elapsed = time.perf_counter() - start
+    commits = get_connection_stats()["commits"] - before
+    return {
+        "commits_per_action": round(commits / repeat, 2),
+        "ms_per_action": round(elapsed * 1000 / repeat, 3),
+    }
+
+
+def run(repeat: int = 50) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(os.path.join(tmp, "bench.db"))
+        add_category("Bench", "Other", "expense")
+        cat_id = get_category_id_by_name("Bench")
+        acc_id = add_account("Main", "Bank", "")
+        other_id = add_account("Savings", "Bank", "")
+        for a in (acc_id, other_id):
+            add_account_balance(a, "EUR", 1000.0)
+
+        actions = {
+            "add_transaction": lambda: _action_add_transaction(acc_id, cat_id),
+            "transfer": lambda: _action_transfer(acc_id, other_id),
+            "create_account": _action_create_account,
+            "recurring_catch_up_30d": lambda: _action_recurring_catch_up(
+                acc_id, cat_id
+            ),
+        }
+        for name, action in actions.items():
+            n = repeat if name != "recurring_catch_up_30d" else max(1, repeat // 10)
+            results[name] = {
+                "separate_commits": _measure(action, False, n),
+                "unit_of_work": _measure(action, True, n),
+            }
+    return results
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Commits per UI action")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    for name, res in run(args.repeat).items():
+        sep, uow = res["separate_commits"], res["unit_of_work"]
+        print(
+            f"[bench] {name:<24} commits {sep['commits_per_action']:>6} -> "
+            f"{uow['commits_per_action']:<6} ms {sep['ms_per_action']:>8} -> "
+            f"{uow['ms_per_action']}"
+        )
+
+
+if __name__ == "__main__":
+    _cli()
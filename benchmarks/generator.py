@@ -0,0 +1,146 @@
+"""
+Deterministic synthetic ledgers for benchmarks.
+
+The same LedgerSpec (including its seed and anchor date) always produces
+the same accounts, categories, transactions, budgets and recurring
+patterns, so timings from different commits are comparable. Dates are
+laid out backwards from the anchor rather than from today; pass the
+anchor as `today` to recurring generation to keep that deterministic too.
+"""
+
+import datetime
+import random
+from dataclasses import asdict, dataclass
+
+from app.db import recurring
+from app.db.accounts import add_account, add_account_balance
+from app.db.budgets import add_budget
+from app.db.categories import add_category, get_categories
+from app.db.connection import init_db, unit_of_work
+from app.db.transactions import add_transactions_bulk
+
+ACCOUNT_TYPES = ["Bank", "Cash", "Credit Card", "Savings"]
+NOTES = ["", "", "groceries", "rent", "salary", "coffee", "fuel", "gift"]
+
+
+@dataclass(frozen=True)
+class LedgerSpec:
+    accounts: int = 5
+    categories: int = 20
+    transactions: int = 10_000
+    recurring: int = 20
+    budgets: int = 10
+    currencies: tuple = ("EUR", "USD", "GBP")
+    days: int = 730
+    anchor: str = "2025-06-30"
+    seed: int = 42
+
+    def as_dict(self) -> dict:
+        # Lists, so the spec survives a JSON round trip unchanged.
+        return {**asdict(self), "currencies": list(self.currencies)}
+
+
+SIZES = {
+    "small": LedgerSpec(),
+    "medium": LedgerSpec(
+        accounts=10, categories=40, transactions=100_000, recurring=50, days=1825
+    ),
+    "large": LedgerSpec(
+        accounts=20,
+        categories=60,
+        transactions=500_000,
+        recurring=100,
+        budgets=30,
+        days=3650,
+    ),
+}
+
+
+def generate_ledger(db_path: str, spec: LedgerSpec) -> dict:
+    """
+    Creates db_path and fills it according to spec. Returns counts of what
+    was created.
+    """
+    rng = random.Random(spec.seed)
+    anchor = datetime.date.fromisoformat(spec.anchor)
+    init_db(db_path)
+
+    existing = {c["name"] for c in get_categories()}
+    for i in range(spec.categories):
+        name = f"Category {i:03d}"
+        if name not in existing:
+            add_category(name, "Other", "income" if i % 5 == 0 else "expense")
+    categories = [(c["id"], c["type"]) for c in get_categories()]
+
+    with unit_of_work():
+        account_ids = []
+        for i in range(spec.accounts):
+            acc_id = add_account(f"Account {i:03d}", ACCOUNT_TYPES[i % 4], "")
+            for ccy in spec.currencies:
+                add_account_balance(
+                    acc_id,
+                    ccy,
+                    round(rng.uniform(500, 5000), 2),
+                    kind="opening",
+                    effective_date=(
+                        anchor - datetime.timedelta(days=spec.days)
+                    ).isoformat(),
+                )
+            account_ids.append(acc_id)
+
+    records = []
+    for _ in range(spec.transactions):
+        cat_id, cat_type = rng.choice(categories)
+        amount = round(rng.lognormvariate(3, 1), 2)
+        day = anchor - datetime.timedelta(days=rng.randrange(spec.days))
+        records.append(
+            (
+                day.isoformat(),
+                amount if cat_type == "income" else -amount,
+                cat_id,
+                rng.choice(account_ids),
+                rng.choice(NOTES),
+                rng.choice(spec.currencies),
+            )
+        )
+    # Roughly chronological, like real data.
+    records.sort(key=lambda r: r[0])
+    add_transactions_bulk(records, adjust_balances=True)
+
+    with unit_of_work():
+        for i in range(spec.budgets):
+            cat_id, _ = categories[i % len(categories)]
+            add_budget(
+                cat_id,
+                "monthly",
+                round(rng.uniform(100, 1000), 2),
+                (anchor - datetime.timedelta(days=365)).isoformat(),
+                (anchor + datetime.timedelta(days=365)).isoformat(),
+            )
+
+    frequencies = ["daily", "weekly", "monthly", "monthly", "yearly"]
+    with unit_of_work():
+        for i in range(spec.recurring):
+            cat_id, cat_type = rng.choice(categories)
+            amount = round(rng.uniform(5, 500), 2)
+            # Patterns start within the last year but have generated nothing
+            # yet, so generate_due_transactions(anchor) has a backlog.
+            start = anchor - datetime.timedelta(days=rng.randrange(1, 365))
+            recurring.create_recurring(
+                rng.choice(account_ids),
+                cat_id,
+                amount if cat_type == "income" else -amount,
+                rng.choice(spec.currencies),
+                frequencies[i % len(frequencies)],
+                start.isoformat(),
+                None,
+                notes=f"Recurring {i:03d}",
+            )
+
+    return {
+        "accounts": len(account_ids),
+        "categories": len(categories),
+        "transactions": len(records),
+        "budgets": spec.budgets,
+        "recurring": spec.recurring,
+    }
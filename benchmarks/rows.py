@@ -0,0 +1,183 @@
+"""
+Row materialisation benchmark.
+
+Fetches the same rows through each way the DAOs have built (or build)
+result objects and reports time and memory per 100k rows:
+
+    row_dict           sqlite3.Row, then dict(row)           (old analytics)
+    legacy_from_row    sqlite3.Row, then the old Transaction.from_row
+    slots_from_row     sqlite3.Row, then the slotted Transaction.from_row
+    slots_factory      Transaction.row_factory straight from the tuple
+    dict_factory       dict(zip(columns, tuple))             (analytics)
+    tuples             plain tuples, no row_factory          (as_tuples=True)
+
+"retained" is what the fetched list still holds once the cursor is done
+(tracemalloc, measured in a separate run from the timings); "peak" is the
+high-water mark during the fetch.
+
+Usage:
+    python -m benchmarks.rows --rows 100000 --repeat 5 --out rows.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from app.db.connection import get_db_connection, reset_pool
+from app.db.transactions import ANALYTICS_COLUMNS, _analytics_dict
+from app.models import TRANSACTION_COLUMNS_SQL, Transaction
+from benchmarks.generator import LedgerSpec, generate_ledger
+
+_TX_SQL = f"""
+    SELECT {TRANSACTION_COLUMNS_SQL}
+    FROM transactions t
+    LEFT JOIN categories c ON t.category_id = c.id
+    ORDER BY t.date DESC, t.id DESC
+"""
+_TX_STAR_SQL = """
+    SELECT t.*, c.name AS category_name, c.icon AS category_icon
+    FROM transactions t
+    LEFT JOIN categories c ON t.category_id = c.id
+    ORDER BY t.date DESC, t.id DESC
+"""
+_ANALYTICS_SQL = (
+    f"SELECT {', '.join(ANALYTICS_COLUMNS)} FROM transactions ORDER BY date, id"
+)
+
+
+@dataclass
+class _LegacyTransaction:
+    """
+    Transaction as it was before the slotted models, for comparison.
+    """
+
+    id: int
+    date: str
+    amount: float
+    category_id: int | None
+    account_id: int | None
+    notes: str | None
+    currency: str
+    category_name: str | None = None
+    category_icon: str | None = None
+    recurring_id: int | None = None
+    occurrence_date: str | None = None
+
+    @classmethod
+    def from_row(cls, row):
+        def _get(r, key):
+            try:
+                return r[key]
+            except Exception:
+                return None
+
+        return cls(
+            id=_get(row, "id"),
+            date=_get(row, "date"),
+            amount=_get(row, "amount"),
+            category_id=_get(row, "category_id"),
+            account_id=_get(row, "account_id"),
+            notes=_get(row, "notes"),
+            currency=_get(row, "currency"),
+            category_name=_get(row, "category_name"),
+            category_icon=_get(row, "category_icon"),
+            recurring_id=_get(row, "recurring_id"),
+            occurrence_date=_get(row, "occurrence_date"),
+        )
+
+
+def _fetch(sql: str, row_factory="row"):
+    conn = get_db_connection()
+    try:
+        cur = conn.execute(sql)
+        if row_factory != "row":
+            cur.row_factory = row_factory
+        return cur.fetchall()
+    finally:
+        conn.close()
+
+
+APPROACHES: Dict[str, Callable[[], list]] = {
+    "row_dict": lambda: [dict(r) for r in _fetch(_ANALYTICS_SQL)],
+    "legacy_from_row": lambda: [
+        _LegacyTransaction.from_row(r) for r in _fetch(_TX_STAR_SQL)
+    ],
+    "slots_from_row": lambda: [Transaction.from_row(r) for r in _fetch(_TX_STAR_SQL)],
+    "slots_factory": lambda: _fetch(_TX_SQL, Transaction.row_factory),
+    "dict_factory": lambda: _fetch(_ANALYTICS_SQL, _analytics_dict),
+    "tuples": lambda: _fetch(_ANALYTICS_SQL, None),
+}
+
+
+def _measure(fn: Callable[[], list], repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = fn()
+        runs.append((time.perf_counter() - t0) * 1000)
+        n = len(rows)
+        del rows
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    rows = fn()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return {
+        "rows": n,
+        "median_ms": statistics.median(runs),
+        "retained_bytes": after - before,
+        "peak_bytes": peak - before,
+    }
+
+
+def run(rows: int, repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "rows.db")
+        generate_ledger(db_path, LedgerSpec(transactions=rows, recurring=0))
+        for name, fn in APPROACHES.items():
+            m = _measure(fn, repeat)
+            scale = 100_000 / m["rows"]
+            results[name] = {
+                "rows": m["rows"],
+                "ms_per_100k": round(m["median_ms"] * scale, 2),
+                "retained_mb_per_100k": round(m["retained_bytes"] * scale / 2**20, 2),
+                "peak_mb_per_100k": round(m["peak_bytes"] * scale / 2**20, 2),
+                "bytes_per_row": round(m["retained_bytes"] / m["rows"], 1),
+            }
+            r = results[name]
+            print(
+                f"[bench] {name:<16} {r['ms_per_100k']:>9.1f} ms "
+                f"{r['retained_mb_per_100k']:>8.2f} MB retained "
+                f"{r['peak_mb_per_100k']:>8.2f} MB peak "
+                f"({r['bytes_per_row']:.0f} B/row)"
+            )
+        reset_pool()
+    return results
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Row materialisation benchmark")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"rows": args.rows, "results": results}, f, indent=2)
+        print(f"[bench] Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    _cli()
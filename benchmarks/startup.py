@@ -0,0 +1,152 @@
+"""
+Startup cost of the desktop/web app, measured in fresh interpreters.
+
+- import: `python -X importtime -c "import app.main"`, total and the slowest
+  modules by self time. The eager variant also imports every tab module,
+  which is what app.main used to do.
+- time to shell: wall time of a child process that imports app.main and runs
+  initialize() against a copy of a seeded database, i.e. everything main()
+  does before the first page.update(), minus the Flet client handshake.
+  Measured with the recurring catch-up deferred (current behaviour) and
+  run inline (previous behaviour).
+
+Usage:
+    python -m benchmarks.startup --repeat 5 --recurring-days 365
+"""
+
+import argparse
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.db import recurring
+from app.db.accounts import add_account, add_account_balance
+from app.db.categories import add_category, get_category_id_by_name
+from app.db.connection import init_db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EAGER_IMPORTS = (
+    "import app.main, app.ui.dashboard, app.ui.transactions, "
+    "app.ui.accounts, app.ui.budgets, app.ui.settings"
+)
+
+SHELL_SCRIPT = """
+import sys
+import app.main
+from app.startup import initialize
+initialize(sys.argv[1], run_recurring=sys.argv[2] == "1")
+"""
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """
+    Parses -X importtime output into (module, self_us, cumulative_us).
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:") :].split("|")
+        # Nesting is shown as extra indentation after the first space.
+        rows.append((name[1:].rstrip(), int(self_us), int(cum_us)))
+    return rows
+
+
+def measure_import(code: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env=_env(),
+        cwd=ROOT,
+        check=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    top_level = [r for r in rows if not r[0].startswith(" ")]
+    return {
+        "total_ms": round(sum(r[2] for r in top_level) / 1000, 1),
+        "slowest": [
+            (name.strip(), round(self_us / 1000, 1))
+            for name, self_us, _ in sorted(rows, key=lambda r: -r[1])[:8]
+        ],
+    }
+
+
+def seed_database(path: str, recurring_days: int):
+    init_db(path)
+    add_category("Bench", "Other", "expense")
+    cat_id = get_category_id_by_name("Bench")
+    acc_id = add_account("Bench", "Bank", "")
+    add_account_balance(acc_id, "EUR", 1000.0)
+    if recurring_days:
+        start = datetime.date.today() - datetime.timedelta(days=recurring_days - 1)
+        recurring.create_recurring(
+            acc_id, cat_id, -1.0, "EUR", "daily", start.isoformat(), None
+        )
+
+
+def measure_shell(seed_path: str, run_recurring: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "startup.db")
+        with open(seed_path, "rb") as src, open(db, "wb") as dst:
+            dst.write(src.read())
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", SHELL_SCRIPT, db, "1" if run_recurring else "0"],
+            capture_output=True,
+            env=_env(),
+            cwd=ROOT,
+            check=True,
+        )
+        return (time.perf_counter() - start) * 1000
+
+
+def run(repeat: int = 5, recurring_days: int = 365) -> dict:
+    lazy = [measure_import("import app.main") for _ in range(repeat)]
+    eager = [measure_import(EAGER_IMPORTS) for _ in range(repeat)]
+    with tempfile.TemporaryDirectory() as tmp:
+        seed = os.path.join(tmp, "seed.db")
+        seed_database(seed, recurring_days)
+        deferred = [measure_shell(seed, False) for _ in range(repeat)]
+        inline = [measure_shell(seed, True) for _ in range(repeat)]
+    return {
+        "import_ms": min(r["total_ms"] for r in lazy),
+        "import_eager_ms": min(r["total_ms"] for r in eager),
+        "slowest_imports": min(lazy, key=lambda r: r["total_ms"])["slowest"],
+        "time_to_shell_ms": round(min(deferred), 1),
+        "time_to_shell_inline_recurring_ms": round(min(inline), 1),
+        "recurring_days": recurring_days,
+    }
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Startup time budget")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--recurring-days", type=int, default=365)
+    args = parser.parse_args()
+    r = run(args.repeat, args.recurring_days)
+    print(
+        f"[bench] import app.main {r['import_ms']} ms "
+        f"(eager tab imports {r['import_eager_ms']} ms)"
+    )
+    for name, ms in r["slowest_imports"]:
+        print(f"[bench]   {name:<40} {ms} ms self")
+    print(
+        f"[bench] time to shell {r['time_to_shell_ms']} ms "
+        f"(inline recurring catch-up, {r['recurring_days']} days: "
+        f"{r['time_to_shell_inline_recurring_ms']} ms)"
+    )
+
+
+if __name__ == "__main__":
+    _cli()
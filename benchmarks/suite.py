@@ -0,0 +1,335 @@
+"""
+Reproducible benchmark suite.
+
+A ledger is generated once per run from a LedgerSpec (see
+benchmarks.generator) and copied for every repetition, so each scenario
+starts from the same database with cold caches. Only the scenario body is
+timed; copying and opening the database is not.
+
+Scenarios:
+    init_db               schema check / upgrade of an existing ledger
+    generate_recurring    generate_due_transactions(today=anchor)
+    dashboard_data        datasets, balance series and DAO reads behind
+                          the dashboard (no controls)
+    dashboard_sections    load_dashboard_sections("ALL") until every
+                          section is delivered (data plus control building)
+    import_csv            import_from_csv of a generated CSV
+    export_csv            export_to_csv
+    recalculate           recalculate_all_conversions
+    backup                backup_db to a plain copy
+
+The dashboard scenarios use the "ALL" timeframe: the ledger is laid out
+around a fixed anchor date, so relative timeframes (30D, YTD) would depend
+on the day the suite runs. For the same reason analytics' "today" is
+pinned to the anchor while scenarios run, so the "ALL" balance series ends
+on the anchor instead of growing by a day every day.
+
+Usage:
+    python -m benchmarks.suite --size small --repeat 5 --out bench.json
+    python -m benchmarks.suite --size small --baseline bench.json --threshold 0.1
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+from unittest import mock
+
+from app.db.accounts import get_accounts, get_low_balance_alerts
+from app.db.budgets import get_budgets
+from app.db.connection import get_db_path, init_db, reset_pool
+from app.db.recurring import generate_due_transactions, get_upcoming_recurring
+from app.db.transactions import get_recent_transactions
+from app.services import analytics
+from app.services.analytics import balance_series_for_timeframe, get_timeframe_dataset
+from app.ui.dashboard import (
+    INDEPENDENT_SECTIONS,
+    TIMEFRAME_SECTIONS,
+    load_dashboard_sections,
+)
+from app.ui.transactions import export_to_csv, import_from_csv
+from app.utils.backup import backup_db
+from app.utils.recalculate import recalculate_all_conversions
+from benchmarks.generator import SIZES, LedgerSpec, generate_ledger
+
+SCENARIOS: Dict[str, Callable] = {}
+
+
+def scenario(name: str):
+    """
+    Registers fn(ctx) as a scenario. ctx holds db_path, tmp (a scratch
+    directory), csv_path and spec.
+    """
+
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+
+    return register
+
+
+def _quiet(*args, **kwargs):
+    pass
+
+
+@scenario("init_db")
+def _init_db(ctx):
+    init_db(ctx["db_path"])
+
+
+@scenario("generate_recurring")
+def _generate_recurring(ctx):
+    ctx["result"] = generate_due_transactions(
+        today=datetime.date.fromisoformat(ctx["spec"].anchor)
+    )
+
+
+@scenario("dashboard_data")
+def _dashboard_data(ctx):
+    get_timeframe_dataset("ALL")
+    balance_series_for_timeframe("ALL", max_points=500)
+    get_accounts()
+    get_low_balance_alerts()
+    get_budgets()
+    get_upcoming_recurring(days_ahead=30)
+    get_recent_transactions(8)
+
+
+@scenario("dashboard_sections")
+def _dashboard_sections(ctx):
+    expected = len(INDEPENDENT_SECTIONS) + len(TIMEFRAME_SECTIONS)
+    delivered = []
+    done = threading.Event()
+
+    def deliver(key, result):
+        delivered.append(key)
+        if len(delivered) == expected:
+            done.set()
+
+    load_dashboard_sections("ALL", deliver)
+    if not done.wait(timeout=120):
+        raise TimeoutError(f"Only {len(delivered)}/{expected} sections delivered")
+
+
+@scenario("import_csv")
+def _import_csv(ctx):
+    import_from_csv(ctx["csv_path"], None, _quiet)
+
+
+@scenario("export_csv")
+def _export_csv(ctx):
+    export_to_csv(os.path.join(ctx["tmp"], "export.csv"), None, _quiet)
+
+
+@scenario("recalculate")
+def _recalculate(ctx):
+    recalculate_all_conversions()
+
+
+@scenario("backup")
+def _backup(ctx):
+    backup_db(get_db_path(), os.path.join(ctx["tmp"], "backup.db"), overwrite=True)
+
+
+def _write_import_csv(path: str, rows: int, spec: LedgerSpec):
+    rng = random.Random(spec.seed + 1)
+    anchor = datetime.date.fromisoformat(spec.anchor)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("date,amount,category,account_id,notes,currency\n")
+        for _ in range(rows):
+            day = anchor - datetime.timedelta(days=rng.randrange(spec.days))
+            f.write(
+                f"{day.isoformat()},{-round(rng.uniform(1, 200), 2)},"
+                f"Category {rng.randrange(spec.categories):03d},"
+                f"{rng.randrange(1, spec.accounts + 1)},imported,"
+                f"{rng.choice(spec.currencies)}\n"
+            )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _summarise(runs_ms: list) -> dict:
+    return {
+        "runs_ms": [round(r, 3) for r in runs_ms],
+        "min_ms": round(min(runs_ms), 3),
+        "median_ms": round(statistics.median(runs_ms), 3),
+        "mean_ms": round(statistics.fmean(runs_ms), 3),
+        "stdev_ms": round(statistics.stdev(runs_ms), 3) if len(runs_ms) > 1 else 0.0,
+    }
+
+
+def run(
+    spec: LedgerSpec,
+    repeat: int = 5,
+    only: Optional[list] = None,
+    import_rows: int = 5000,
+) -> dict:
+    names = only or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        template = os.path.join(tmp, "template.db")
+        started = time.perf_counter()
+        counts = generate_ledger(template, spec)
+        generate_s = time.perf_counter() - started
+        csv_path = os.path.join(tmp, "import.csv")
+        _write_import_csv(csv_path, import_rows, spec)
+
+        work = os.path.join(tmp, "work.db")
+        anchor = datetime.date.fromisoformat(spec.anchor)
+        with mock.patch.object(analytics, "_today", lambda: anchor):
+            for name in names:
+                fn = SCENARIOS[name]
+                runs = []
+                for _ in range(repeat):
+                    reset_pool()
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(work + suffix):
+                            os.remove(work + suffix)
+                    shutil.copy(template, work)
+                    # Opens the copy and publishes a reset, which drops caches.
+                    init_db(work)
+                    ctx = {
+                        "db_path": work,
+                        "tmp": tmp,
+                        "csv_path": csv_path,
+                        "spec": spec,
+                    }
+                    t0 = time.perf_counter()
+                    fn(ctx)
+                    runs.append((time.perf_counter() - t0) * 1000)
+                results[name] = _summarise(runs)
+                print(f"[bench] {name}: median {results[name]['median_ms']:.1f} ms")
+
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "spec": spec.as_dict(),
+            "ledger": counts,
+            "generate_seconds": round(generate_s, 3),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.10) -> list:
+    """
+    Median-to-median comparison per scenario. A scenario is a regression
+    when it got slower by more than threshold (0.10 = 10%).
+    """
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            rows.append({"scenario": name, "status": "new"})
+            continue
+        ratio = cur["median_ms"] / base["median_ms"] if base["median_ms"] else None
+        if ratio is None:
+            status = "n/a"
+        elif ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "same"
+        rows.append(
+            {
+                "scenario": name,
+                "baseline_ms": base["median_ms"],
+                "current_ms": cur["median_ms"],
+                "ratio": round(ratio, 3) if ratio else None,
+                "status": status,
+            }
+        )
+    if baseline.get("meta", {}).get("spec") != current["meta"]["spec"]:
+        print("[bench] Warning: baseline was run with a different ledger spec")
+    return rows
+
+
+def _print_comparison(rows: list):
+    print(f"{'scenario':<20} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for r in rows:
+        if r["status"] == "new":
+            print(f"{r['scenario']:<20} {'-':>10} {'-':>10} {'-':>7}  new")
+            continue
+        print(
+            f"{r['scenario']:<20} {r['baseline_ms']:>10.1f} {r['current_ms']:>10.1f} "
+            f"{r['ratio'] or 0:>7.3f}  {r['status']}"
+        )
+
+
+def _cli():
+    parser = argparse.ArgumentParser(description="Finet benchmark suite")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small")
+    parser.add_argument("--transactions", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default=None, help="Comma-separated scenarios")
+    parser.add_argument("--import-rows", type=int, default=5000)
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 if any scenario regressed",
+    )
+    args = parser.parse_args()
+
+    spec = SIZES[args.size]
+    overrides = {}
+    if args.transactions is not None:
+        overrides["transactions"] = args.transactions
+    if args.seed is not None:
+        overrides["seed"] = args.seed
+    if overrides:
+        spec = LedgerSpec(**{**spec.as_dict(), **overrides})
+
+    only = args.only.split(",") if args.only else None
+    result = run(spec, args.repeat, only, args.import_rows)
+    result["meta"]["size"] = args.size
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"[bench] Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(result, baseline, args.threshold)
+        _print_comparison(rows)
+        if args.fail_on_regression and any(r["status"] == "regression" for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,16 @@
+import pytest
+
+from app.db.connection import init_db, reset_pool
+
+
+@pytest.fixture
+def db(tmp_path):
+    """
+    A freshly initialised database in a temporary directory. init_db()
+    publishes a reset on every topic, so caches keyed on topic generations
+    (and the analytics snapshot) start from this database.
+    """
+    path = str(tmp_path / "finet.db")
+    init_db(path)
+    yield path
+    reset_pool()
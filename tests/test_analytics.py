@@ -0,0 +1,18 @@
+import datetime
+
+from app.db.accounts import add_account, add_account_balance
+from app.services import analytics
+
+
+def test_all_balance_series_ends_on_pinned_today(db, monkeypatch):
+    pinned = datetime.date(2025, 6, 30)
+    monkeypatch.setattr(analytics, "_today", lambda: pinned)
+    account = add_account("Checking", "bank")
+    add_account_balance(account, "EUR", 100.0, effective_date="2025-06-01")
+    add_account_balance(account, "EUR", -40.0, effective_date="2025-06-10")
+
+    series = analytics.balance_series_for_timeframe("ALL")
+
+    assert series[0] == ("2025-06-01", 100.0)
+    assert series[-1] == ("2025-06-30", 60.0)
+    assert len(series) == 30
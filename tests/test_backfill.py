@@ -0,0 +1,61 @@
+import datetime
+
+import pytest
+
+from app.db.rate_history import count_rate_history, get_backfill_job
+from app.services.rate_providers import FixtureProvider
+from app.utils import backfill
+
+
+class _FailingProvider(FixtureProvider):
+    """
+    Fixture history that raises on the given call, like a dropped connection.
+    """
+
+    def __init__(self, fail_on_call):
+        super().__init__()
+        self.fail_on_call = fail_on_call
+        self.calls = []
+
+    def fetch_history(self, base_currency, start, end, currencies=None):
+        self.calls.append((start, end))
+        if len(self.calls) == self.fail_on_call:
+            raise ConnectionError("connection dropped")
+        return super().fetch_history(base_currency, start, end, currencies)
+
+
+def _set_today(monkeypatch, day):
+    monkeypatch.setattr(backfill, "_today", lambda: day)
+
+
+def test_open_ended_run_resumes_on_a_later_day(db, monkeypatch):
+    kwargs = dict(base="EUR", currencies=["USD", "GBP"], chunk_days=10)
+
+    _set_today(monkeypatch, datetime.date(2024, 1, 30))
+    with pytest.raises(ConnectionError):
+        backfill.backfill_from_provider(
+            _FailingProvider(fail_on_call=2), "2024-01-01", **kwargs
+        )
+    assert count_rate_history() == 2 * 10
+
+    _set_today(monkeypatch, datetime.date(2024, 1, 31))
+    provider = _FailingProvider(fail_on_call=None)
+    result = backfill.backfill_from_provider(provider, "2024-01-01", **kwargs)
+
+    assert result["job"] == "fixture:EUR:2024-01-01"
+    assert provider.calls[0] == ("2024-01-11", "2024-01-20")
+    assert result["rows_written"] == 2 * 21
+    assert count_rate_history() == 2 * 31
+    job = get_backfill_job(result["job"])
+    assert job["end_date"] == job["done_through"] == "2024-01-31"
+
+
+def test_explicit_end_is_part_of_the_job(db):
+    result = backfill.backfill_from_provider(
+        FixtureProvider(), "2024-01-01", "2024-01-05", base="EUR", currencies=["USD"]
+    )
+    assert result["job"] == "fixture:EUR:2024-01-01:2024-01-05"
+    again = backfill.backfill_from_provider(
+        FixtureProvider(), "2024-01-01", "2024-01-05", base="EUR", currencies=["USD"]
+    )
+    assert again["chunks"] == 0
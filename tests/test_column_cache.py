@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.db.connection import get_db_connection, init_db, reset_pool
+from app.db.transactions import add_transaction, delete_transaction
+from app.services import snapshot
+from app.services.column_cache import ColumnFile
+from app.utils.backup import backup_db, restore_db
+
+DTYPES = [("id", "i8"), ("amount", "f8")]
+STAMP = ("a" * 32, 0)
+
+
+def _arrays(ids):
+    return [np.array(ids, dtype="i8"), np.array(ids, dtype="f8") / 2]
+
+
+def test_write_then_open(tmp_path):
+    path = str(tmp_path / "c.columns")
+    ColumnFile(path, DTYPES).write(_arrays([1, 2, 3]), 3, STAMP)
+
+    views, hwm = ColumnFile(path, DTYPES).open(STAMP, max_id=3)
+
+    assert hwm == 3
+    assert views[0].tolist() == [1, 2, 3]
+    assert views[1].tolist() == [0.5, 1.0, 1.5]
+    assert not views[0].flags.writeable
+
+
+@pytest.mark.parametrize(
+    "stamp, max_id",
+    [(("b" * 32, 0), 3), (("a" * 32, 1), 3), (STAMP, 2)],
+)
+def test_open_rejects_other_ledgers_and_rolled_back_files(tmp_path, stamp, max_id):
+    path = str(tmp_path / "c.columns")
+    ColumnFile(path, DTYPES).write(_arrays([1, 2, 3]), 3, STAMP)
+    assert ColumnFile(path, DTYPES).open(stamp, max_id) is None
+
+
+def test_open_rejects_missing_truncated_and_foreign_files(tmp_path):
+    path = str(tmp_path / "c.columns")
+    assert ColumnFile(path, DTYPES).open(STAMP, 3) is None
+    ColumnFile(path, DTYPES).write(_arrays([1, 2, 3]), 3, STAMP)
+    assert ColumnFile(path, [("id", "i8")]).open(STAMP, 3) is None
+    with open(path, "r+b") as f:
+        f.truncate(200)
+    assert ColumnFile(path, DTYPES).open(STAMP, 3) is None
+
+
+def test_append_keeps_earlier_views(tmp_path):
+    path = str(tmp_path / "c.columns")
+    file = ColumnFile(path, DTYPES)
+    before = file.write(_arrays([1, 2]), 2, STAMP)
+
+    after = file.append(_arrays([5, 6]), 6, STAMP)
+
+    assert before[0].tolist() == [1, 2]
+    assert after[0].tolist() == [1, 2, 5, 6]
+    views, hwm = ColumnFile(path, DTYPES).open(STAMP, max_id=6)
+    assert (views[0].tolist(), hwm) == ([1, 2, 5, 6], 6)
+    # Other stamps and overflowing appends are left to a rewrite.
+    assert file.append(_arrays([7]), 7, ("b" * 32, 0)) is None
+    assert file.append(_arrays(range(8, 2000)), 2000, STAMP) is None
+
+
+def _snapshot_ids():
+    snapshot._snapshot = None
+    return snapshot.get_snapshot().columns().id.tolist()
+
+
+def test_snapshot_uses_and_refreshes_the_file(db):
+    ids = [add_transaction(f"2025-01-0{i}", -i, None, None, "", "EUR") for i in (1, 2)]
+    assert _snapshot_ids() == ids
+    assert os.path.exists(db + ".columns")
+
+    # Rows added while no snapshot is running are topped up on load.
+    reset_pool()
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO transactions (date, amount, amount_converted, currency)"
+        " VALUES ('2025-01-03', -3, -3, 'EUR')"
+    )
+    conn.commit()
+    conn.close()
+    assert _snapshot_ids() == ids + [ids[-1] + 1]
+
+    # A delete moves the ledger stamp, so the file is rebuilt.
+    delete_transaction(ids[0])
+    init_db(db)
+    assert _snapshot_ids() == [ids[1], ids[-1] + 1]
+
+
+def test_restoring_an_older_backup_rebuilds_the_file(db, tmp_path):
+    first = add_transaction("2025-01-01", -1, None, None, "", "EUR")
+    backup = str(tmp_path / "backup.db")
+    backup_db(db, backup)
+    add_transaction("2025-01-02", -2, None, None, "", "EUR")
+    add_transaction("2025-01-03", -3, None, None, "", "EUR")
+    _snapshot_ids()
+
+    # Restore, then write past the cached high-water mark with other rows.
+    for _ in range(2):
+        restore_db(backup, db)
+        reset_pool()
+        ids = [first] + [
+            add_transaction("2025-02-01", -50, None, None, "", "EUR") for _ in range(3)
+        ]
+        cols = snapshot.get_snapshot().columns()
+        assert cols.id.tolist() == ids
+        assert cols.amount.tolist() == [-1, -50, -50, -50]
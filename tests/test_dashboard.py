@@ -0,0 +1,32 @@
+import threading
+import time
+
+from app.ui.dashboard import (
+    INDEPENDENT_SECTIONS,
+    TIMEFRAME_SECTIONS,
+    load_dashboard_sections,
+)
+
+
+def test_timeframe_section_futures_are_tracked(db):
+    expected = len(INDEPENDENT_SECTIONS) + len(TIMEFRAME_SECTIONS)
+    delivered = []
+    done = threading.Event()
+
+    def deliver(key, result):
+        delivered.append(key)
+        if len(delivered) == expected:
+            done.set()
+
+    futures = []
+    returned = load_dashboard_sections("ALL", deliver, futures=futures)
+
+    assert done.wait(timeout=30)
+    assert returned is futures
+    # The shared dataset plus one future per section; the last append can
+    # trail its section's delivery slightly.
+    deadline = time.monotonic() + 5
+    while len(futures) < 1 + expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(futures) == 1 + expected
+    assert sorted(delivered) == sorted([*INDEPENDENT_SECTIONS, *TIMEFRAME_SECTIONS])
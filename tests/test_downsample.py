@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from app.services.downsample import (
+    downsample,
+    downsample_indices,
+    lttb_indices,
+    min_max_indices,
+)
+
+
+def test_lttb_keeps_endpoints_and_threshold():
+    rng = random.Random(3)
+    values = [rng.uniform(-10, 10) for _ in range(500)]
+    idx = lttb_indices(values, 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 499
+    assert idx == sorted(set(idx))
+
+
+def test_lttb_keeps_a_lone_spike():
+    values = [0.0] * 300
+    values[137] = 100.0
+    assert 137 in lttb_indices(values, 20)
+
+
+def test_min_max_picks_the_extremes_of_each_bucket():
+    values = [0.0] * 100
+    values[10], values[30] = 5.0, -5.0  # bucket 0..49
+    values[60], values[90] = -7.0, 7.0  # bucket 50..99
+    assert min_max_indices(values, 2) == [0, 10, 30, 60, 90, 99]
+
+
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+@pytest.mark.parametrize("count", [1, 2, 4, 7])
+@pytest.mark.parametrize("max_points", [0, 1, 2, 3, 6, 11, 40])
+def test_downsample_indices_never_exceeds_max_points(method, count, max_points):
+    rng = random.Random(count * 100 + max_points)
+    series = [[rng.uniform(0, 1) for _ in range(100)] for _ in range(count)]
+    idx = downsample_indices(series, max_points, method)
+    assert len(idx) <= max_points
+    if max_points >= 2:
+        assert idx[0] == 0 and idx[-1] == 99
+
+
+def test_downsample_keeps_labels():
+    points = [(f"d{i}", float(i % 7)) for i in range(200)]
+    kept = downsample(points, 30)
+    assert len(kept) <= 30
+    assert kept[0] == points[0] and kept[-1] == points[-1]
+    assert all(p in points for p in kept)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        downsample_indices([[1.0] * 10], 5, "median")
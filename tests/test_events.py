@@ -0,0 +1,96 @@
+import gc
+
+from app.db.accounts import add_account
+from app.db.connection import get_db_connection, queue_change
+from app.events import Change, EventBus, coalesce, subscribe
+
+
+def test_subscribers_get_their_topics_and_wildcard():
+    bus = EventBus()
+    accounts, everything = [], []
+    bus.subscribe("accounts", accounts.append)
+    unsubscribe = bus.subscribe("*", everything.append)
+
+    bus.publish([Change("accounts", "insert", (1,)), Change("budgets", "delete")])
+    unsubscribe()
+    bus.publish([Change("accounts", "update", (1,))])
+
+    assert [c.op for c in accounts] == ["insert", "update"]
+    assert [c.topic for c in everything] == ["accounts", "budgets"]
+
+
+def test_generations_count_per_topic():
+    bus = EventBus()
+    bus.publish([Change("accounts", "insert"), Change("accounts", "update")])
+    bus.publish([Change("rates", "update")])
+    assert bus.generation("accounts", "rates", "budgets") == (2, 1, 0)
+
+
+def test_bound_methods_are_held_weakly():
+    class Listener:
+        def __init__(self):
+            self.seen = []
+
+        def on_change(self, change):
+            self.seen.append(change)
+
+    bus = EventBus()
+    listener = Listener()
+    bus.subscribe("accounts", listener.on_change)
+    bus.publish([Change("accounts", "insert")])
+    assert len(listener.seen) == 1
+
+    del listener
+    gc.collect()
+    bus.publish([Change("accounts", "insert")])
+    assert bus._subscribers["accounts"] == []
+
+
+def test_failing_subscriber_does_not_stop_others():
+    bus = EventBus()
+    seen = []
+
+    def broken(change):
+        raise RuntimeError("boom")
+
+    bus.subscribe("accounts", broken)
+    bus.subscribe("accounts", seen.append)
+    bus.publish([Change("accounts", "insert")])
+    assert len(seen) == 1
+
+
+def test_coalesce_merges_keys_per_topic_and_op():
+    merged = coalesce(
+        [
+            Change("accounts", "update", (1, 2)),
+            Change("balances", "update", ((1, "EUR"),)),
+            Change("accounts", "update", (2, 3)),
+            Change("accounts", "delete", (4,)),
+        ]
+    )
+    assert merged == [
+        Change("accounts", "update", (1, 2, 3)),
+        Change("balances", "update", ((1, "EUR"),)),
+        Change("accounts", "delete", (4,)),
+    ]
+
+
+def test_changes_are_published_on_commit_only(db):
+    seen = []
+    unsubscribe = subscribe("budgets", seen.append)
+    try:
+        conn = get_db_connection()
+        queue_change(conn, "budgets", "insert", (1,))
+        conn.rollback()
+        conn.commit()
+        assert seen == []
+        queue_change(conn, "budgets", "insert", (2,))
+        conn.execute("DELETE FROM budgets")
+        assert seen == []
+        conn.commit()
+        conn.close()
+        assert seen == [Change("budgets", "insert", (2,))]
+        add_account("Checking", "bank")
+        assert len(seen) == 1
+    finally:
+        unsubscribe()
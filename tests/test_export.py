@@ -0,0 +1,96 @@
+import datetime
+import gzip
+import json
+import os
+
+import pytest
+
+from app.db.connection import get_db_connection
+from app.db.exports import get_export_cursor
+from app.db.transactions import add_transaction
+from app.utils.export import export_transactions
+
+
+def _add(date, amount=-10.0):
+    return add_transaction(date, amount, None, None, "", "EUR")
+
+
+def _add_raw_date(date):
+    conn = get_db_connection()
+    cur = conn.execute(
+        "INSERT INTO transactions (date, amount, amount_converted, currency)"
+        " VALUES (?, -1.0, -1.0, 'EUR')",
+        (date,),
+    )
+    conn.commit()
+    conn.close()
+    return cur.lastrowid
+
+
+def _read_ndjson(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_cursor_runs_write_separate_files(db, tmp_path):
+    out = str(tmp_path / "transactions.ndjson.gz")
+    first = [_add("2025-01-05"), _add("2025-02-10")]
+    run1 = export_transactions(out, "ndjson", cursor="nightly")
+    second = [_add("2025-03-01")]
+    run2 = export_transactions(out, "ndjson", cursor="nightly")
+    run3 = export_transactions(out, "ndjson", cursor="nightly")
+
+    assert run1["files"] == [str(tmp_path / "transactions.part-000000000001.ndjson.gz")]
+    assert run2["files"] == [
+        str(tmp_path / f"transactions.part-{first[-1] + 1:012d}.ndjson.gz")
+    ]
+    assert run3 == {"rows": 0, "files": [], "last_id": second[-1]}
+    assert [r["id"] for r in _read_ndjson(run1["files"][0])] == first
+    assert [r["id"] for r in _read_ndjson(run2["files"][0])] == second
+    cursor = get_export_cursor("nightly")
+    assert cursor["last_id"] == second[-1]
+    assert cursor["rows_exported"] == 3
+
+
+def test_without_cursor_writes_the_given_file(db, tmp_path):
+    out = str(tmp_path / "transactions.ndjson.gz")
+    _add("2025-01-05")
+    assert export_transactions(out, "ndjson")["files"] == [out]
+
+
+def test_invalid_dates_export_as_null(db, tmp_path, capsys):
+    good = _add("2025-01-05")
+    bad = [_add_raw_date("31/12/2024"), _add_raw_date("2024-02-30")]
+    out = str(tmp_path / "out")
+
+    result = export_transactions(out, "ndjson", partition_by="month")
+
+    assert sorted(os.path.relpath(f, out) for f in result["files"]) == [
+        os.path.join("month=2025-01", "part-000000000001.ndjson"),
+        os.path.join("month=__HIVE_DEFAULT_PARTITION__", "part-000000000001.ndjson"),
+    ]
+    rows = {}
+    for path in result["files"]:
+        with open(path, encoding="utf-8") as f:
+            rows.update((r["id"], r["date"]) for r in map(json.loads, f))
+    assert rows == {good: "2025-01-05", bad[0]: None, bad[1]: None}
+    assert "2 transaction(s) have no valid date" in capsys.readouterr().out
+
+
+def test_parquet_with_invalid_dates(db, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    _add("2025-01-05")
+    _add_raw_date("not a date")
+    out = str(tmp_path / "out")
+
+    result = export_transactions(out, "parquet", partition_by="year", cursor="wh")
+
+    assert result["rows"] == 2
+    dates = {}
+    for path in result["files"]:
+        partition = os.path.basename(os.path.dirname(path))
+        dates[partition] = pq.read_table(path).column("date").to_pylist()
+    assert dates == {
+        "year=2025": [datetime.date(2025, 1, 5)],
+        "year=__HIVE_DEFAULT_PARTITION__": [None],
+    }
@@ -0,0 +1,113 @@
+import datetime
+import random
+
+import pytest
+
+from app.db.accounts import (
+    add_account,
+    add_account_balance,
+    set_account_balance_threshold,
+)
+from app.db.categories import add_category, get_category_id_by_name
+from app.db.connection import get_db_connection
+from app.db.recurring import create_recurring, generate_due_transactions
+from app.services import forecast
+
+START = datetime.date(2025, 1, 15)
+FREQUENCIES = ("daily", "weekly", "custom_interval", "monthly", "yearly", "once")
+
+
+def _random_pattern(rng, key):
+    first = START + datetime.timedelta(days=rng.randrange(-40, 400))
+    end = None
+    if rng.random() < 0.4:
+        end = (first + datetime.timedelta(days=rng.randrange(0, 500))).isoformat()
+    dom = rng.choice([None, None, 1, 15, 28, 29, 30, 31])
+    if rng.random() < 0.3:
+        # Month ends and leap days exercise the day clamping.
+        first = rng.choice(
+            [datetime.date(2024, 2, 29), datetime.date(2025, 1, 31), first]
+        )
+    return (
+        *key,
+        round(rng.uniform(-200, 200), 2),
+        rng.choice(FREQUENCIES),
+        rng.choice([None, 1, 2, 3, 5]),
+        dom,
+        first.isoformat(),
+        end,
+    )
+
+
+def test_numpy_and_python_projections_agree():
+    pytest.importorskip("numpy")
+    rng = random.Random(1)
+    balances = [(1, "Checking", "EUR", 100.0, 0.0), (2, "Savings", "USD", 5.0, None)]
+    keys = [(b[0], b[2]) for b in balances]
+    for trial in range(20):
+        patterns = [_random_pattern(rng, rng.choice(keys)) for _ in range(40)]
+        days = rng.choice([1, 30, 365, 800])
+        fast, fast_count = forecast._project_numpy(balances, patterns, START, days)
+        slow, slow_count = forecast._project_python(balances, patterns, START, days)
+        assert fast_count == slow_count, trial
+        for a, b in zip(fast, slow):
+            assert a == pytest.approx(b), trial
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_forecast_matches_generated_transactions(db, monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(forecast, "np", None)
+    forecast._forecast.cache_clear()
+    account = add_account("Checking", "bank")
+    add_account_balance(account, "EUR", 1000.0, effective_date="2025-01-01")
+    set_account_balance_threshold(account, "EUR", 500.0)
+    add_category("Bills")
+    category = get_category_id_by_name("Bills")
+    create_recurring(
+        account, category, -400.0, "EUR", "monthly", "2025-01-01", None, day_of_month=31
+    )
+    create_recurring(
+        account, category, 150.0, "EUR", "weekly", "2025-01-20", None, interval=2
+    )
+    create_recurring(
+        account, category, -30.0, "EUR", "daily", "2025-02-01", "2025-02-10"
+    )
+    create_recurring(account, category, -99.0, "EUR", "once", "2025-03-01", None)
+    days = 120
+
+    result = forecast.forecast_balances(days, today=START)
+    (projected,) = result["accounts"]
+
+    last = START + datetime.timedelta(days=days - 1)
+    assert generate_due_transactions(today=last) == result["occurrences"]
+    conn = get_db_connection()
+    rows = conn.execute(
+        "SELECT date, SUM(amount) FROM transactions GROUP BY date"
+    ).fetchall()
+    conn.close()
+    daily = [0.0] * days
+    for date, amount in rows:
+        offset = (datetime.date.fromisoformat(date) - START).days
+        daily[max(offset, 0)] += amount
+    expected, running = [], 1000.0
+    for delta in daily:
+        running += delta
+        expected.append(running)
+
+    assert projected["daily"] == pytest.approx(expected)
+    assert projected["end_balance"] == pytest.approx(expected[-1])
+    first_breach = next(i for i, v in enumerate(expected) if v < 500.0)
+    assert (
+        projected["breach_date"]
+        == (START + datetime.timedelta(days=first_breach)).isoformat()
+    )
+
+
+def test_horizon_is_bounded(db):
+    with pytest.raises(ValueError):
+        forecast.forecast_balances(0)
+    with pytest.raises(ValueError):
+        forecast.forecast_balances(forecast.MAX_HORIZON_DAYS + 1)
@@ -0,0 +1,76 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from app.db.accounts import add_account, add_account_balance
+from app.db.connection import get_db_connection, init_db
+from app.db.frames import READ_DTYPES, read_transactions_df, write_transactions_df
+from app.db.transactions import add_transactions_bulk
+
+RECORDS = [
+    {"date": "2025-01-05", "amount": -12.5, "currency": "EUR", "notes": "a"},
+    {"date": "2025-01-05", "amount": 100.0, "currency": "USD"},
+    {"date": "2025-02-01", "amount": -3.0, "currency": "EUR", "recurring_id": None},
+    {"date": "2025-02-03", "amount": -7.0, "currency": "XXX"},
+]
+
+
+def _state():
+    conn = get_db_connection()
+    txs = conn.execute(
+        "SELECT date, amount, amount_converted, category_id, account_id, notes,"
+        " currency, recurring_id, occurrence_date FROM transactions ORDER BY id"
+    ).fetchall()
+    balances = conn.execute(
+        "SELECT account_id, currency, balance FROM account_balances ORDER BY 1, 2"
+    ).fetchall()
+    events = conn.execute(
+        "SELECT account_id, currency, effective_date, SUM(delta) FROM balance_events"
+        " GROUP BY 1, 2, 3 ORDER BY 1, 2, 3"
+    ).fetchall()
+    conn.close()
+    return [[tuple(r) for r in rows] for rows in (txs, balances, events)]
+
+
+def _with_accounts():
+    account = add_account("Checking", "bank")
+    add_account_balance(account, "EUR", 50.0, effective_date="2025-01-01")
+    add_account_balance(account, "USD", 0.0, effective_date="2025-01-01")
+    return [{**r, "account_id": account} for r in RECORDS]
+
+
+def test_writer_matches_bulk_insert(db, tmp_path):
+    records = _with_accounts()
+    ids = add_transactions_bulk(records, adjust_balances=True)
+    bulk = _state()
+
+    init_db(str(tmp_path / "other.db"))
+    records = _with_accounts()
+    df = pd.DataFrame(records)
+    df["date"] = pd.to_datetime(df["date"])
+    df.index = [10, 20, 30, 40]
+
+    assert write_transactions_df(df, adjust_balances=True) == ids
+    assert _state() == bulk
+
+
+def test_writer_requires_columns(db):
+    with pytest.raises(ValueError, match="currency"):
+        write_transactions_df(pd.DataFrame({"date": ["2025-01-01"], "amount": [1]}))
+    assert (
+        write_transactions_df(pd.DataFrame(columns=["date", "amount", "currency"]))
+        == []
+    )
+
+
+def test_read_round_trip(db):
+    records = _with_accounts()
+    write_transactions_df(pd.DataFrame(records))
+
+    df = read_transactions_df(start="2025-01-05", end="2025-02-01", currencies=["EUR"])
+
+    assert {c: str(t) for c, t in df.dtypes.items()} == READ_DTYPES
+    assert df["amount"].tolist() == [-12.5, -3.0]
+    assert df["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-01-05", "2025-02-01"]
+    assert df["recurring_id"].isna().all()
+    assert read_transactions_df(account_ids=[]).empty
@@ -0,0 +1,100 @@
+import datetime
+import random
+
+import pytest
+
+from app.db import ledger
+from app.db.accounts import add_account, add_account_balance, increment_account_balance
+from app.db.connection import get_db_connection
+
+START = datetime.date(2025, 1, 1)
+
+
+def _expected(events, as_of):
+    return sum(delta for day, delta in events if day <= as_of)
+
+
+@pytest.fixture
+def account(db, monkeypatch):
+    # Snapshot often so queries mix snapshots, tails and late events.
+    monkeypatch.setattr(ledger, "SNAPSHOT_EVERY", 4)
+    return add_account("Checking", "bank")
+
+
+def _random_events(account, n=60, seed=7):
+    rng = random.Random(seed)
+    events = []
+    for _ in range(n):
+        day = (START + datetime.timedelta(days=rng.randrange(60))).isoformat()
+        delta = round(rng.uniform(-50, 100), 2)
+        add_account_balance(account, "EUR", delta, effective_date=day)
+        events.append((day, delta))
+    return events
+
+
+def test_balance_as_of_matches_event_sum(account):
+    events = _random_events(account)
+    # Snapshots dated in the middle, then more back-dated events after them.
+    ledger.take_snapshots(as_of="2025-01-20")
+    events += _random_events(account, n=20, seed=8)
+
+    for offset in range(-1, 62, 5):
+        as_of = (START + datetime.timedelta(days=offset)).isoformat()
+        assert ledger.get_balance(account, "EUR", as_of) == pytest.approx(
+            _expected(events, as_of)
+        )
+    assert ledger.get_balance(account, "EUR") == pytest.approx(
+        sum(d for _, d in events)
+    )
+
+
+def test_snapshots_are_taken_as_the_tail_grows(account):
+    _random_events(account, n=10)
+    conn = get_db_connection()
+    count = conn.execute("SELECT COUNT(*) FROM balance_snapshots").fetchone()[0]
+    conn.close()
+    assert count >= 2
+
+
+def test_reconcile_reports_and_fixes_drift(account):
+    events = _random_events(account, n=10)
+    assert ledger.reconcile_balances() == []
+
+    conn = get_db_connection()
+    conn.execute("UPDATE account_balances SET balance = balance + 1")
+    conn.commit()
+    conn.close()
+
+    (drift,) = ledger.reconcile_balances(fix=True)
+    assert drift["account_id"] == account
+    assert ledger.reconcile_balances() == []
+    assert ledger.get_balance(account, "EUR") == pytest.approx(
+        sum(d for _, d in events)
+    )
+
+
+def test_increment_without_balance_row_records_nothing(account):
+    increment_account_balance(account, "USD", 10.0)
+    assert ledger.list_balance_events(account) == []
+
+
+def test_balance_history_has_one_row_per_day(account):
+    events = _random_events(account, n=30)
+    other = add_account("Savings", "bank")
+    add_account_balance(other, "USD", 500.0, effective_date="2025-01-10")
+
+    rows = ledger.get_balance_history("2024-12-30", "2025-03-05", account_id=account)
+
+    days = [r["date"] for r in rows]
+    assert days[0] == "2024-12-30" and days[-1] == "2025-03-05"
+    assert len(days) == len(set(days)) == 66
+    for r in rows:
+        assert r["balance"] == pytest.approx(_expected(events, r["date"]))
+
+
+def test_balance_history_follows_new_events(account):
+    add_account_balance(account, "EUR", 10.0, effective_date="2025-01-01")
+    assert ledger.get_balance_history("2025-01-01", "2025-01-02")[-1]["balance"] == 10
+    add_account_balance(account, "EUR", 5.0, effective_date="2025-01-02")
+    assert ledger.get_balance_history("2025-01-01", "2025-01-02")[-1]["balance"] == 15
+    assert ledger.get_first_event_date() == "2025-01-01"
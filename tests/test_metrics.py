@@ -0,0 +1,7 @@
+from app.services import metrics
+
+
+def test_collect_reports_caches(db):
+    text = metrics.collect()
+    assert 'finet_cache_hits_total{cache="forecast"}' in text
+    assert "finet_table_rows" in text
@@ -0,0 +1,17 @@
+from app.db.connection import get_db_connection
+from app.db.profiling import disable_profiling, enable_profiling
+
+
+def test_statements_without_a_rowcount_count_no_rows(db):
+    profiler = enable_profiling()
+    try:
+        conn = get_db_connection()
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.commit()
+        conn.close()
+    finally:
+        disable_profiling()
+    rows = {s["sql"]: s["rows"] for s in profiler.snapshot()}
+    assert rows["CREATE TABLE t (x INTEGER)"] == 0
+    assert rows["INSERT INTO t VALUES (1)"] == 1
@@ -0,0 +1,62 @@
+import urllib.error
+
+import pytest
+
+from app.db.rate_history import count_rate_history
+from app.services import rate_providers
+from app.services.rate_providers import (
+    ERApiProvider,
+    FixtureProvider,
+    HttpCache,
+    RateProvider,
+)
+from app.utils.backfill import backfill_from_provider
+
+
+def test_base_provider_is_abstract():
+    with pytest.raises(TypeError):
+        RateProvider()
+
+
+def test_backfill_needs_a_provider_with_history(db, tmp_path):
+    provider = ERApiProvider(HttpCache(cache_dir=str(tmp_path)))
+    assert not provider.supports_history
+    assert provider.fetch_history("EUR", "2025-01-01", "2025-01-02") == {}
+    with pytest.raises(ValueError):
+        backfill_from_provider(provider, "2025-01-01", "2025-01-02")
+
+
+def test_backfill_from_fixture(db):
+    result = backfill_from_provider(
+        FixtureProvider(), "2025-01-01", "2025-01-03", base="EUR", currencies=["USD"]
+    )
+    assert result["rows_written"] == 3
+    assert count_rate_history() == 3
+
+
+def _failing_cache(tmp_path, monkeypatch, error):
+    calls = []
+
+    def urlopen(req, timeout):
+        calls.append(req.full_url)
+        raise error
+
+    monkeypatch.setattr(rate_providers.urllib.request, "urlopen", urlopen)
+    monkeypatch.setattr(rate_providers.time, "sleep", lambda seconds: None)
+    return HttpCache(cache_dir=str(tmp_path), retries=2), calls
+
+
+@pytest.mark.parametrize(
+    "error",
+    [TimeoutError("timed out"), urllib.error.URLError(TimeoutError("timed out"))],
+)
+def test_timeouts_are_not_retried(tmp_path, monkeypatch, error):
+    cache, calls = _failing_cache(tmp_path, monkeypatch, error)
+    assert cache.get_json("https://example.invalid/rates") is None
+    assert len(calls) == 1
+
+
+def test_connection_errors_are_retried(tmp_path, monkeypatch):
+    cache, calls = _failing_cache(tmp_path, monkeypatch, ConnectionResetError())
+    assert cache.get_json("https://example.invalid/rates") is None
+    assert len(calls) == 3
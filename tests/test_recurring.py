@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+
+from app.db import recurring
+from app.db.accounts import add_account
+from app.db.categories import add_category, get_category_id_by_name
+from app.db.connection import get_connection_stats, get_db_connection
+from app.db.recurring import create_recurring, generate_due_transactions, get_recurring
+
+TODAY = datetime.date(2025, 1, 10)
+
+
+@pytest.fixture
+def patterns(db):
+    account = add_account("Checking", "bank")
+    add_category("Rent")
+    category = get_category_id_by_name("Rent")
+    return [
+        create_recurring(account, category, -5.0, "EUR", "daily", "2025-01-01", None),
+        create_recurring(account, category, -9.0, "EUR", "daily", "2025-01-06", None),
+    ]
+
+
+def _generated():
+    conn = get_db_connection()
+    rows = conn.execute(
+        "SELECT recurring_id, COUNT(*) FROM transactions GROUP BY recurring_id"
+    ).fetchall()
+    conn.close()
+    return dict(tuple(r) for r in rows)
+
+
+def test_catch_up_commits_once_per_pattern(patterns):
+    commits = get_connection_stats()["commits"]
+    assert generate_due_transactions(today=TODAY) == 10 + 5
+    assert get_connection_stats()["commits"] == commits + len(patterns)
+    assert _generated() == {patterns[0]: 10, patterns[1]: 5}
+
+
+def test_failed_pattern_keeps_the_ones_before_it(patterns, monkeypatch):
+    add_transaction = recurring.add_transaction
+
+    def failing(**kwargs):
+        if kwargs["recurring_id"] == patterns[1] and kwargs["date"] == "2025-01-08":
+            raise RuntimeError("disk full")
+        return add_transaction(**kwargs)
+
+    monkeypatch.setattr(recurring, "add_transaction", failing)
+    with pytest.raises(RuntimeError):
+        generate_due_transactions(today=TODAY)
+
+    assert _generated() == {patterns[0]: 10}
+    assert get_recurring(patterns[0])["next_occurrence"] == "2025-01-11"
+    assert get_recurring(patterns[1])["next_occurrence"] == "2025-01-06"
+
+    monkeypatch.setattr(recurring, "add_transaction", add_transaction)
+    assert generate_due_transactions(today=TODAY) == 5
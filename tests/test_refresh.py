@@ -0,0 +1,42 @@
+import time
+
+from app.ui.refresh import RefreshScheduler
+from app.utils import instrumentation
+
+
+class _Page:
+    snack_bar = None
+
+    def __init__(self):
+        self.updates = 0
+
+    def update(self, *controls):
+        time.sleep(0.01)
+        self.updates += 1
+
+
+def test_flush_coalesces_and_is_instrumented():
+    page = _Page()
+    instrumentation.instrument_page(page)
+    scheduler = RefreshScheduler(page, window_ms=10_000)
+    refreshed = []
+    scheduler.register("accounts", lambda: refreshed.append("accounts"))
+    scheduler.register("budgets", lambda: refreshed.append("budgets"))
+
+    instrumentation.enable_instrumentation()
+    try:
+        instrumentation.reset()
+        scheduler.mark_dirty("accounts")
+        scheduler.mark_dirty("accounts")
+        scheduler.notify("Saved")
+        scheduler.flush()
+        stats = {s["handler"]: s for s in instrumentation.snapshot()}
+    finally:
+        instrumentation.disable_instrumentation()
+        instrumentation.reset()
+
+    assert refreshed == ["accounts"]
+    assert page.updates == 1
+    assert page.snack_bar.open
+    assert stats["refresh.flush"]["calls"] == 1
+    assert stats["refresh.flush"]["mean_update_ms"] >= 10
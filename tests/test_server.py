@@ -0,0 +1,78 @@
+import pytest
+
+from app.db.accounts import add_account
+from app.db.budgets import get_budgets
+from app.db.categories import add_category, get_category_id_by_name
+from app.db.transactions import get_transactions_for_analytics
+from app.services.server import (
+    HTTPError,
+    _add_budgets_bulk,
+    _add_transaction_record,
+    _add_transactions_bulk,
+)
+
+
+def _record(account_id, **fields):
+    return {"amount": -5, "account_id": account_id, "currency": "eur", **fields}
+
+
+def test_add_transaction_normalises_dates(db):
+    account = add_account("Checking", "bank")
+    _add_transaction_record(
+        _record(account, date="20250105", occurrence_date="2025-01-01")
+    )
+    (row,) = get_transactions_for_analytics()
+    assert row["date"] == "2025-01-05"
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"date": "05/01/2025"},
+        {"date": "2025-02-30"},
+        {"date": "2025-01-05", "occurrence_date": "soon"},
+    ],
+)
+def test_invalid_dates_are_rejected(db, fields):
+    account = add_account("Checking", "bank")
+    with pytest.raises(HTTPError) as e:
+        _add_transaction_record(_record(account, **fields))
+    assert e.value.status == 400
+    with pytest.raises(HTTPError) as e:
+        _add_transactions_bulk(
+            [_record(account, date="2025-01-05"), _record(account, **fields)],
+            adjust_balances=True,
+        )
+    assert e.value.status == 400
+    assert e.value.message.startswith("Item 1:")
+    assert get_transactions_for_analytics() == []
+
+
+def _budget(category_id, **fields):
+    return {
+        "category_id": category_id,
+        "period": "monthly",
+        "amount": 100,
+        "start_date": "2025-01-01",
+        "end_date": "2025-12-31",
+        **fields,
+    }
+
+
+def test_budget_batch_with_a_bad_item_adds_nothing(db):
+    add_category("Food")
+    category = get_category_id_by_name("Food")
+    items = [
+        _budget(category),
+        _budget(category, end_date="2025-13-01"),
+        _budget(category),
+    ]
+    with pytest.raises(HTTPError) as e:
+        _add_budgets_bulk(items)
+    assert e.value.status == 400
+    assert e.value.message.startswith("Item 1:")
+    assert get_budgets() == []
+
+    assert _add_budgets_bulk([_budget(category, start_date="20250201")]) == 1
+    (budget,) = get_budgets()
+    assert budget["start_date"] == "2025-02-01"
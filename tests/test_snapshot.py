@@ -0,0 +1,47 @@
+import datetime
+
+import pytest
+
+from app.db.connection import get_db_connection, queue_change
+from app.db.transactions import add_transaction
+from app.services import analytics
+
+np = pytest.importorskip("numpy")
+
+TODAY = datetime.date(2025, 6, 30)
+
+
+def _insert_raw(date):
+    conn = get_db_connection()
+    cur = conn.execute(
+        "INSERT INTO transactions (date, amount, amount_converted, currency)"
+        " VALUES (?, -5.0, -5.0, 'EUR')",
+        (date,),
+    )
+    queue_change(conn, "transactions", "insert", (cur.lastrowid,))
+    conn.commit()
+    conn.close()
+
+
+def _dataset(monkeypatch, code, numpy_analytics):
+    monkeypatch.setenv("FINET_NUMPY_ANALYTICS", "1" if numpy_analytics else "0")
+    analytics._timeframe_dataset.cache_clear()
+    return analytics.get_timeframe_dataset(code)
+
+
+def test_rows_with_invalid_dates_are_skipped(db, monkeypatch):
+    monkeypatch.setattr(analytics, "_today", lambda: TODAY)
+    add_transaction("2025-06-20", -12.5, None, None, "", "EUR")
+    add_transaction("2025-06-25", 100.0, None, None, "", "EUR")
+    _insert_raw("31/12/2024")
+    _insert_raw("")
+    _insert_raw("not a date")
+    add_transaction("2025-06-28", -7.5, None, None, "", "EUR")
+
+    columnar = _dataset(monkeypatch, "ALL", True)
+    assert columnar["kpis"]["count"] == 3
+    assert columnar["income_series"] == [("2025-06", 100.0)]
+    assert columnar["expense_series"] == [("2025-06", 20.0)]
+
+    # The row path drops unparseable dates from dated timeframes too.
+    assert _dataset(monkeypatch, "30D", True) == _dataset(monkeypatch, "30D", False)
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+
+def _modules_loaded_by(statement):
+    out = subprocess.run(
+        [sys.executable, "-c", f"{statement}; import sys; print(*sys.modules)"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return set(out.split())
+
+
+def test_startup_does_not_import_metrics_stack():
+    loaded = _modules_loaded_by("import app.startup")
+    assert "app.services.metrics" not in loaded
+    assert "app.services.analytics" not in loaded
+    assert "app.services.forecast" not in loaded
+
+
+def test_connection_does_not_import_rate_providers():
+    assert "app.services.rate_providers" not in _modules_loaded_by(
+        "import app.db.connection"
+    )
@@ -0,0 +1,88 @@
+from app.db import ledger
+from app.db.accounts import add_account, add_account_balance, get_account_balances
+from app.db.connection import get_db_connection
+from app.db.transactions import add_transactions_bulk
+from app.services.converter import convert_to_base
+
+
+def _stored(ids):
+    conn = get_db_connection()
+    rows = conn.execute(
+        "SELECT id, date, amount, amount_converted, account_id, currency, notes"
+        " FROM transactions ORDER BY id"
+    ).fetchall()
+    conn.close()
+    return {row["id"]: dict(row) for row in rows if row["id"] in ids}
+
+
+def _balances(account):
+    return {b["currency"]: b["balance"] for b in get_account_balances(account)}
+
+
+def test_ids_follow_record_order(db):
+    account = add_account("Checking", "bank")
+    records = [
+        ("2025-01-03", -10.0, None, account, "first", "EUR"),
+        {"date": "2025-01-01", "amount": 20.0, "currency": "USD", "notes": "second"},
+        ("2025-01-02", 0, None, None, "third", "USD"),
+    ]
+
+    ids = add_transactions_bulk(records, batch_size=2)
+
+    assert ids == sorted(ids) and len(set(ids)) == 3
+    stored = _stored(ids)
+    assert [stored[i]["notes"] for i in ids] == ["first", "second", "third"]
+    assert stored[ids[0]]["amount_converted"] == -10.0
+    assert stored[ids[1]]["amount_converted"] == convert_to_base(20.0, "USD")
+    assert stored[ids[1]]["account_id"] is None
+    assert stored[ids[2]]["amount_converted"] == 0.0
+    # Balances are left alone unless asked for.
+    assert get_account_balances(account) == []
+
+
+def test_adjust_balances_moves_balances_and_records_events(db):
+    account = add_account("Checking", "bank")
+    add_account_balance(account, "EUR", 100.0, effective_date="2025-01-01")
+    add_account_balance(account, "USD", 0.0, effective_date="2025-01-01")
+
+    add_transactions_bulk(
+        [
+            ("2025-01-05", -30.0, None, account, "", "EUR"),
+            ("2025-01-05", -20.0, None, account, "", "EUR"),
+            ("2025-01-09", 15.0, None, account, "", "USD"),
+            ("2025-01-10", 5.0, None, account, "", "EUR"),
+        ],
+        adjust_balances=True,
+    )
+
+    assert _balances(account) == {"EUR": 55.0, "USD": 15.0}
+    assert ledger.get_balance(account, "EUR", "2025-01-05") == 50.0
+    assert ledger.get_balance(account, "EUR", "2025-01-10") == 55.0
+
+
+def test_adjust_balances_skips_missing_balance_rows(db):
+    account = add_account("Checking", "bank")
+    add_account_balance(account, "EUR", 10.0, effective_date="2025-01-01")
+    conn = get_db_connection()
+    events_before = conn.execute("SELECT MAX(id) FROM balance_events").fetchone()[0]
+    conn.close()
+
+    ids = add_transactions_bulk(
+        [
+            ("2025-01-02", 7.0, None, account, "", "EUR"),
+            ("2025-01-02", 9.0, None, account, "", "GBP"),
+            ("2025-01-02", 4.0, None, None, "", "EUR"),
+        ],
+        adjust_balances=True,
+    )
+
+    assert len(_stored(ids)) == 3
+    assert _balances(account) == {"EUR": 17.0}
+    conn = get_db_connection()
+    events = conn.execute(
+        "SELECT account_id, currency, delta FROM balance_events WHERE id > ?"
+        " ORDER BY id",
+        (events_before,),
+    ).fetchall()
+    conn.close()
+    assert [tuple(e) for e in events] == [(account, "EUR", 7.0)]
@@ -0,0 +1,75 @@
+import pytest
+
+from app.db.accounts import add_account, get_accounts, increment_account_balance
+from app.db.connection import get_connection_stats, unit_of_work
+from app.db.settings import add_currency
+from app.db.transactions import add_transaction, get_transactions_for_analytics
+from app.events import subscribe
+
+
+@pytest.fixture
+def published(db):
+    changes = []
+    unsubscribe = subscribe("*", changes.append)
+    yield changes
+    unsubscribe()
+
+
+def _account_with_transaction():
+    account = add_account("Checking", "bank")
+    add_transaction("2025-01-05", -5.0, None, account, "", "EUR")
+    increment_account_balance(account, "EUR", -5.0, kind="transaction")
+    return account
+
+
+def test_commits_once_and_publishes_after_commit(published):
+    commits = get_connection_stats()["commits"]
+    with unit_of_work():
+        _account_with_transaction()
+        assert published == []
+    assert get_connection_stats()["commits"] == commits + 1
+    assert {c.topic for c in published} >= {"accounts", "transactions"}
+    assert len(get_transactions_for_analytics()) == 1
+
+
+def test_error_rolls_back_everything(published):
+    with pytest.raises(KeyError):
+        with unit_of_work():
+            _account_with_transaction()
+            raise KeyError("boom")
+    assert get_accounts() == []
+    assert get_transactions_for_analytics() == []
+    assert published == []
+
+
+def test_nested_dao_rollback_fails_the_unit(published):
+    with pytest.raises(ValueError):
+        with unit_of_work():
+            _account_with_transaction()
+            add_currency("EUR", "Euro", "€")  # duplicate: rolls back
+    assert get_accounts() == []
+    assert get_transactions_for_analytics() == []
+    assert published == []
+
+
+def test_caught_nested_rollback_still_fails_the_unit(published):
+    with pytest.raises(RuntimeError):
+        with unit_of_work():
+            _account_with_transaction()
+            try:
+                add_currency("EUR", "Euro", "€")
+            except ValueError:
+                pass
+            add_transaction("2025-01-06", -1.0, None, None, "", "EUR")
+    assert get_accounts() == []
+    assert get_transactions_for_analytics() == []
+    assert published == []
+
+
+def test_nested_blocks_join_the_outer_one(published):
+    with pytest.raises(KeyError):
+        with unit_of_work():
+            with unit_of_work():
+                _account_with_transaction()
+            raise KeyError("boom")
+    assert get_accounts() == []